@@ -1,16 +1,38 @@
 """API server entry point."""
 
 from pathlib import Path
+from typing import Optional
 
 from connexion import FlaskApp  # type: ignore
 from foca import Foca  # type: ignore
 
 from pro_tes.ga4gh.tes.service_info import ServiceInfo
+from pro_tes.utils.background import start_periodic_job
+from pro_tes.utils.cache import finished_task_cache
+from pro_tes.utils.compression import LogCompressor
+from pro_tes.utils.health import TesHealth
+from pro_tes.utils.indexes import (
+    TASKS_INDEXES,
+    TES_LOAD_INDEXES,
+    ensure_indexes,
+)
+from pro_tes.utils.load import TesLoad
+from pro_tes.utils.metrics import get_metrics
+from pro_tes.utils.migrations import migrate_tag_list, migrate_timestamps
+from pro_tes.utils.pagination import task_count_cache
+from pro_tes.utils.retention import TaskArchiver
+from pro_tes.utils.routing_cache import routing_cache
+from pro_tes.utils.service_info import TesServiceInfoCache
+from pro_tes.utils.topology import TesTopology
 
 
 def init_app() -> FlaskApp:
     """Initialize FOCA application.
 
+    Only sets up the application and its in-memory caches, so that it can be
+    called in each server process. One-off startup work and background jobs
+    are run via `init_services()`.
+
     Returns:
         FOCA application.
     """
@@ -18,10 +40,108 @@ def init_app() -> FlaskApp:
         config_file=Path(__file__).resolve().parent / "config.yaml",
     )
     app = foca.create_app()
+    task_distribution_config: dict = (
+        getattr(app.app.config.foca, "task_distribution", None) or {}
+    )
+    routing_cache.configure(
+        **((task_distribution_config.get("distance") or {}).get("cache") or {})
+    )
+    get_task_config: dict = (
+        app.app.config.foca.controllers.get("get_task") or {}
+    )
+    finished_task_cache.configure(**(get_task_config.get("cache") or {}))
+    count_config: dict = (
+        app.app.config.foca.controllers["list_tasks"].get("count") or {}
+    )
+    task_count_cache.configure(
+        max_entries=count_config.get("max_entries", 1024),
+        ttl=count_config.get("ttl", 30),
+    )
+    # fail early on invalid compression config
+    offload_config: dict = app.app.config.foca.storeLogs.get("offload") or {}
+    if offload_config.get("compression") is not None:
+        LogCompressor(**offload_config["compression"])
+    metrics_path: Optional[str] = (
+        app.app.config.foca.controllers.get("metrics") or {}
+    ).get("path")
+    if metrics_path:
+        app.app.add_url_rule(
+            metrics_path, endpoint="metrics", view_func=get_metrics
+        )
+    return app
+
+
+def init_services(app: FlaskApp) -> None:
+    """Run startup work and start background jobs.
+
+    Manages database indexes, migrates task documents, initializes service
+    info and in-flight task counters, and starts the background jobs
+    refreshing TES instance information and archiving finished tasks. Must
+    only be called in a single process, cf. `services.py`.
+
+    Args:
+        app: FOCA application.
+    """
+    retention_config: dict = (
+        getattr(app.app.config.foca, "retention", None) or {}
+    )
     with app.app.app_context():
+        tasks_collection = (
+            app.app.config.foca.db.dbs["taskStore"].collections["tasks"].client
+        )
+        ensure_indexes(collection=tasks_collection, indexes=TASKS_INDEXES)
+        ensure_indexes(
+            collection=tasks_collection.database["tes_load"],
+            indexes=TES_LOAD_INDEXES,
+        )
+        migrate_tag_list(collection=tasks_collection)
+        migrate_timestamps(collection=tasks_collection)
+        archiver = TaskArchiver(
+            collection=tasks_collection,
+            archive=tasks_collection.database["tasks_archive"],
+            blobs=tasks_collection.database["task_blobs"],
+            max_age=retention_config.get("max_age"),
+            batch_size=retention_config.get("batch_size", 1000),
+            ttl=retention_config.get("ttl"),
+        )
+        archiver.ensure_indexes()
         service_info = ServiceInfo()
         service_info.init_service_info_from_config()
-    return app
+        TesLoad(collection=tasks_collection).rebuild()
+    start_periodic_job(
+        app=app.app,
+        func=lambda: TesTopology().refresh(),
+        interval=(app.app.config.foca.tes.get("topology") or {}).get(
+            "refresh_interval"
+        ),
+        name="tes_topology",
+        run_immediately=True,
+    )
+    start_periodic_job(
+        app=app.app,
+        func=lambda: TesServiceInfoCache().refresh(),
+        interval=(app.app.config.foca.tes.get("service_info") or {}).get(
+            "refresh_interval"
+        ),
+        name="tes_service_info",
+        run_immediately=True,
+    )
+    start_periodic_job(
+        app=app.app,
+        func=lambda: TesHealth().probe(),
+        interval=(app.app.config.foca.tes.get("health") or {}).get("interval"),
+        name="tes_health",
+    )
+    start_periodic_job(
+        app=app.app,
+        func=archiver.run,
+        interval=(
+            retention_config.get("interval")
+            if archiver.max_age is not None
+            else None
+        ),
+        name="task_retention",
+    )
 
 
 def run_app(app: FlaskApp) -> None:
@@ -31,4 +151,5 @@ def run_app(app: FlaskApp) -> None:
 
 if __name__ == "__main__":
     my_app = init_app()
+    init_services(my_app)
     run_app(my_app)
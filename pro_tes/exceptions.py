@@ -37,6 +37,10 @@ class InvalidMiddleware(MiddlewareException):
     """Raised when a middleware is invalid."""
 
 
+class MiddlewareTimeout(MiddlewareException):
+    """Raised when a middleware exceeds its time budget."""
+
+
 exceptions = {
     Exception: {
         "message": "An unexpected error occurred.",
@@ -94,4 +98,8 @@ exceptions = {
         "message": "Middleware is invalid.",
         "code": "500",
     },
+    MiddlewareTimeout: {
+        "message": "Middleware exceeded its time budget.",
+        "code": "500",
+    },
 }
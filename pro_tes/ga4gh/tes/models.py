@@ -114,12 +114,12 @@ class TesExecutor(CustomBaseModel):
 
 
 class TesExecutorLog(CustomBaseModel):
-    start_time: Optional[str] = Field(
+    start_time: Optional[datetime] = Field(
         None,
         description="Time the executor started, in RFC 3339 format.",
         example="2020-10-02T10:00:00-05:00",
     )
-    end_time: Optional[str] = Field(
+    end_time: Optional[datetime] = Field(
         None,
         description="Time the executor ended, in RFC 3339 format.",
         example="2020-10-02T11:00:00-05:00",
@@ -471,12 +471,12 @@ class TesTaskLog(CustomBaseModel):
         ),
         example={"host": "worker-001", "slurmm_id": 123456},
     )
-    start_time: Optional[str] = Field(
+    start_time: Optional[datetime] = Field(
         None,
         description="When the task started, in RFC 3339 format.",
         example="2020-10-02T10:00:00-05:00",
     )
-    end_time: Optional[str] = Field(
+    end_time: Optional[datetime] = Field(
         None,
         description="When the task ended, in RFC 3339 format.",
         example="2020-10-02T11:00:00-05:00",
@@ -609,7 +609,7 @@ class TesTask(CustomBaseModel):
             "        retried, an entry will be appended to this list."
         ),
     )
-    creation_time: Optional[str] = Field(
+    creation_time: Optional[datetime] = Field(
         None,
         description=(
             "Date + time the task was created, in RFC 3339 format.\n          "
@@ -688,6 +688,55 @@ class TesEndpoint(CustomBaseModel):
     base_path: str = ""
 
 
+class TaskTag(CustomBaseModel):
+    """Create model instance for a task tag, as indexed for filtering.
+
+    Args:
+        key: Tag key.
+        value: Tag value.
+
+    Attributes:
+        key: Tag key.
+        value: Tag value.
+    """
+
+    key: str
+    value: str = ""
+
+    @classmethod
+    def from_tags(cls, tags: Optional[dict[str, str]]) -> list["TaskTag"]:
+        """Create task tags from a TES task tags object.
+
+        Args:
+            tags: Tags of a TES task, as key-value pairs.
+
+        Returns:
+            List of task tags.
+        """
+        return [
+            cls(key=key, value=value or "")
+            for key, value in (tags or {}).items()
+        ]
+
+
+class BlobReference(CustomBaseModel):
+    """Create model instance for a reference to a field value stored as blob.
+
+    Args:
+        path: Dot-separated path of the field within the task document; list
+            elements are referenced by index.
+        id: Blob identifier.
+
+    Attributes:
+        path: Dot-separated path of the field within the task document; list
+            elements are referenced by index.
+        id: Blob identifier.
+    """
+
+    path: str
+    id: str
+
+
 class DbDocument(CustomBaseModel):
     """Create model instance for task request database document.
 
@@ -698,6 +747,14 @@ class DbDocument(CustomBaseModel):
         worker_id: Identifier of worker task.
         basic_auth: Basic authentication credentials.
         tes_endpoint: External TES endpoint.
+        in_flight: Whether the task is counted as in flight at the external
+            TES endpoint.
+        tag_list: Tags of the task as a list, for indexed filtering.
+        version: Version of the document; incremented whenever the task is
+            updated.
+        blobs: References to field values stored outside of the document.
+        finalized: Whether the document is not updated anymore, i.e., the
+            final state and logs of the task are stored.
 
     Attributes:
         task: Information about task.
@@ -706,6 +763,14 @@ class DbDocument(CustomBaseModel):
         worker_id: Identifier of worker task.
         basic_auth: Basic authentication credentials.
         tes_endpoint: External TES endpoint.
+        in_flight: Whether the task is counted as in flight at the external
+            TES endpoint.
+        tag_list: Tags of the task as a list, for indexed filtering.
+        version: Version of the document; incremented whenever the task is
+            updated.
+        blobs: References to field values stored outside of the document.
+        finalized: Whether the document is not updated anymore, i.e., the
+            final state and logs of the task are stored.
     """
 
     task: TesTask = TesTask()
@@ -714,6 +779,11 @@ class DbDocument(CustomBaseModel):
     worker_id: str = ""
     basic_auth: BasicAuth = BasicAuth()
     tes_endpoint: TesEndpoint = TesEndpoint()
+    in_flight: bool = False
+    tag_list: list[TaskTag] = []
+    version: int = 0
+    blobs: list[BlobReference] = []
+    finalized: bool = False
 
     class Config:
         """Pydantic configuration for model."""
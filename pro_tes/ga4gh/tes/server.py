@@ -1,8 +1,10 @@
 """Controllers for GA4GH TES API endpoints."""
 
 import logging
+from typing import Union
 
 from connexion import request  # type: ignore
+from flask import Response
 from foca.utils.logging import log_traffic  # type: ignore
 
 from pro_tes.ga4gh.tes.service_info import ServiceInfo
@@ -61,13 +63,20 @@ def GetServiceInfo(*args, **kwargs) -> dict:
 
 # GET /tasks/{id}
 @log_traffic
-def GetTask(id, *args, **kwargs) -> dict:  # pylint: disable=redefined-builtin
+def GetTask(
+    id, *args, **kwargs  # pylint: disable=redefined-builtin
+) -> Union[dict, Response]:
     """Get info for individual task.
 
     Args:
         id: Task identifier.
         *args: Variable length argument list.
         **kwargs: Arbitrary keyword arguments.
+
+    Returns:
+        Task or, if the task was not modified since the version identified by
+            the `If-None-Match` request header, an empty response with status
+            code 304.
     """
     task_runs = TaskRuns()
     response = task_runs.get_task(id=id, **kwargs)
@@ -3,12 +3,11 @@
 from copy import deepcopy
 from datetime import datetime
 import logging
-from typing import Optional, Sequence
+from typing import Optional, Sequence, Union
 
 from bson.objectid import ObjectId  # type: ignore
 from celery import uuid
-from dateutil.parser import parse as parse_time
-from flask import current_app, request
+from flask import after_this_request, current_app, request, Response
 from foca.models.config import Config  # type: ignore
 from foca.utils.misc import generate_id  # type: ignore
 from pymongo.collection import Collection  # type: ignore
@@ -25,6 +24,7 @@ from pro_tes.exceptions import (
 from pro_tes.ga4gh.tes.models import (
     BasicAuth,
     DbDocument,
+    TaskTag,
     TesEndpoint,
     TesState,
     TesTask,
@@ -33,10 +33,35 @@ from pro_tes.ga4gh.tes.models import (
 )
 from pro_tes.ga4gh.tes.states import States
 from pro_tes.middleware.middleware_handler import MiddlewareHandler
+from pro_tes.plugins.middlewares.task_distribution.scoring import (
+    TaskDistributionScoring,
+    get_weights,
+)
+from pro_tes.plugins.middlewares.task_distribution.sticky import (
+    TaskDistributionSticky,
+)
 from pro_tes.tasks.track_task_progress import task__track_task_progress
+from pro_tes.utils.blobs import TaskBlobStore
+from pro_tes.utils.cache import finished_task_cache
 from pro_tes.utils.db import DbDocumentConnector
+from pro_tes.utils.health import TesHealth
+from pro_tes.utils.latency import TesLatency, create_tes_client
+from pro_tes.utils.load import TesLoad
+from pro_tes.utils.metrics import StageTimer, metrics
 from pro_tes.utils.misc import strip_auth
 from pro_tes.utils.models import TaskModelConverter
+from pro_tes.utils.pagination import (
+    decode_page_token,
+    encode_page_token,
+    get_filter_hash,
+    get_task_count,
+)
+from pro_tes.utils.sticky import StickyRoutes
+from pro_tes.utils.timestamps import (
+    now,
+    render_task_timestamps,
+    to_datetime,
+)
 
 # pragma pylint: disable=invalid-name,redefined-builtin,unused-argument
 # pragma pylint: disable=too-many-locals
@@ -51,6 +76,9 @@ class TaskRuns:
     Attributes:
         foca_config: FOCA configuration.
         db_client: Database collection storing task objects.
+        latency: Recorder for latencies of calls to TES instances.
+        archive: Database collection storing archived tasks.
+        blob_store: Store for large task fields.
         document: Document to be inserted into the collection. Note that it is
             built up iteratively.
     """
@@ -62,31 +90,68 @@ class TaskRuns:
             self.foca_config.db.dbs["taskStore"].collections["tasks"].client
         )
         self.store_logs = self.foca_config.storeLogs["execution_trace"]
+        self.latency: TesLatency = TesLatency(
+            collection=self.db_client.database["tes_latencies"],
+            window=self.foca_config.tes.get("latency_window", 100),
+        )
+        self.archive: Collection = self.db_client.database["tasks_archive"]
+        self.blob_store: TaskBlobStore = TaskBlobStore(
+            collection=self.db_client.database["task_blobs"],
+            **(self.foca_config.storeLogs.get("offload") or {}),
+        )
 
-    def create_task(  # pylint: disable=too-many-statements,too-many-branches
-        self, **kwargs
-    ) -> dict:
+    def create_task(self, **kwargs) -> dict:
         """Start task.
 
+        The duration of each stage, i.e., parsing, applying middlewares,
+        validation, database writes and each call to a TES instance, is
+        recorded in histogram `create_task_duration_seconds` and logged at
+        debug level.
+
+        Args:
+            **kwargs: Additional keyword arguments passed along with request.
+
+        Returns:
+            Task identifier.
+        """
+        timer = StageTimer("create_task_duration_seconds")
+        try:
+            return self._create_task(timer=timer, **kwargs)
+        finally:
+            logger.debug(f"Task creation timings: {timer}")
+
+    def _create_task(  # pylint: disable=too-many-statements,too-many-branches
+        self, timer: StageTimer, **kwargs
+    ) -> dict:
+        """Start task, timing each stage.
+
         Args:
+            timer: Timer to record durations of stages with.
             **kwargs: Additional keyword arguments passed along with request.
 
         Returns:
             Task identifier.
         """
         # create task document
-        start_time = datetime.now().strftime("%m-%d-%Y %H:%M:%S")
+        start_time = now()
         db_document: DbDocument = DbDocument()
         db_document.basic_auth = self.parse_basic_auth(request.authorization)
         assert request.json is not None
-        payload_original: dict = deepcopy(request.json)
-        db_document.task_original = TesTask(**payload_original)
+        with timer.stage("parse"):
+            payload_original: dict = deepcopy(request.json)
+            db_document.task_original = TesTask(**payload_original)
 
         # apply middlewares
         mw_handler = MiddlewareHandler()
-        mw_handler.set_middlewares(paths=current_app.config.foca.middlewares)
+        mw_handler.set_config(config=current_app.config.foca.middlewares)
         logger.debug(f"Middlewares registered: {mw_handler.middlewares}")
-        request_modified = mw_handler.apply_middlewares(request=request)
+        with timer.stage("middlewares"):
+            request_modified = mw_handler.apply_middlewares(request=request)
+        sticky_routes: Optional[StickyRoutes] = (
+            StickyRoutes.from_config()
+            if self._uses_sticky_routes(mw_handler=mw_handler)
+            else None
+        )
 
         # update task document
         assert request_modified.json is not None
@@ -96,12 +161,13 @@ class TaskRuns:
         db_document.task = TesTask(**payload)
 
         # create database document
-        db_document = self._update_task(
-            payload=payload,
-            db_document=db_document,
-            start_time=start_time,
-            **kwargs,
-        )
+        with timer.stage("db_insert"):
+            db_document = self._update_task(
+                payload=payload,
+                db_document=db_document,
+                start_time=start_time,
+                **kwargs,
+            )
         db_connector = DbDocumentConnector(
             collection=self.db_client,
             worker_id=db_document.worker_id,
@@ -114,10 +180,15 @@ class TaskRuns:
 
         # validate request
         payload = self._sanitize_request(payload=payload)
+        assert db_document.task.id is not None
         try:
-            payload_marshalled = tes.Task(**payload)
+            with timer.stage("validation"):
+                payload_marshalled = tes.Task(**payload)
         except TypeError as exc:
-            db_connector.update_task_state(state=TesState.SYSTEM_ERROR.value)
+            db_connector.update_task_state(
+                state=TesState.SYSTEM_ERROR.value,
+                finalized=True,
+            )
             raise BadRequest(
                 f"Task '{db_document.task.id}' could not be "
                 f"validated. Original error message: '{type(exc).__name__}: "
@@ -125,20 +196,35 @@ class TaskRuns:
             ) from exc
 
         # relay request
+        with timer.stage("health_filter"):
+            tes_urls = TesHealth().filter_healthy(tes_urls=tes_urls)
         logger.info(
             "Attempting to forward the task request to any of the known TES"
             f" instances, in the following order: {tes_urls}"
         )
+        load = TesLoad(collection=self.db_client)
+        quotas: dict = self.foca_config.tes.get("quotas") or {}
         for tes_url in tes_urls:
+            quota: Optional[int] = quotas.get(tes_url)
+            if (
+                quota is not None
+                and load.get_in_flight(hosts=[tes_url])[tes_url] >= quota
+            ):
+                self._log_quota_exceeded(
+                    task_id=db_document.task.id,
+                    host=tes_url,
+                )
+                continue
             db_document.tes_endpoint = TesEndpoint(host=tes_url)
             url: str = (
                 f"{db_document.tes_endpoint.host.rstrip('/')}/"
                 f"{db_document.tes_endpoint.base_path.lstrip('/')}"
             )
             try:
-                cli = tes.HTTPClient(
-                    url,
-                    timeout=5,
+                cli = create_tes_client(
+                    url=url,
+                    host=tes_url,
+                    latency=self.latency,
                     user=db_document.basic_auth.username,
                     password=db_document.basic_auth.password,
                 )
@@ -180,7 +266,8 @@ class TaskRuns:
 
             is_funnel = False
             try:
-                response = cli.get_service_info()
+                with timer.stage("remote_get_service_info"):
+                    response = cli.get_service_info()
                 if response.name == "Funnel":
                     is_funnel = True
             except requests.exceptions.HTTPError:
@@ -194,15 +281,29 @@ class TaskRuns:
                     outputs = strip_none_items(payload_marshalled.outputs)
                     payload_marshalled.outputs = remove_auth(outputs)
 
+            with timer.stage("db_reserve"):
+                reserved = load.reserve(host=tes_url, quota=quota)
+            if not reserved:
+                self._log_quota_exceeded(
+                    task_id=db_document.task.id,
+                    host=tes_url,
+                )
+                continue
+            time_submitted = now()
             try:
-                remote_task_id = cli.create_task(payload_marshalled)
+                with timer.stage("remote_create_task"):
+                    remote_task_id = cli.create_task(payload_marshalled)
             except requests.HTTPError as exc:
+                load.cancel_reservation(host=tes_url)
                 logger.warning(
                     f"Task '{db_document.task.id}' could not be sent to TES"
                     f" endpoint hosted at: {url}. Original error message:"
                     f" '{type(exc).__name__}: {exc}'"
                 )
                 continue
+            except Exception:
+                load.cancel_reservation(host=tes_url)
+                raise
 
             logger.info(
                 f"Task '{db_document.task.id}' successfully forwarded to TES"
@@ -210,7 +311,8 @@ class TaskRuns:
                 f" {remote_task_id}"
             )
             try:
-                task: Task = cli.get_task(remote_task_id)
+                with timer.stage("remote_get_task"):
+                    task: Task = cli.get_task(remote_task_id)
                 task_model_converter = TaskModelConverter(task=task)
                 task_converted: TesTask = task_model_converter.convert_task()
                 db_document.task.state = task_converted.state
@@ -229,25 +331,43 @@ class TaskRuns:
                     f"Original error message:'{type(exc).__name__}: {exc}'"
                 )
             # update task_logs, tes_endpoint and task in db
-            db_document = self._update_doc_in_db(
-                db_connector=db_connector,
-                tes_url=tes_url,
-                remote_task_id=remote_task_id,
-            )
-            task__track_task_progress.apply_async(
-                None,
-                {
-                    "worker_id": db_document.worker_id,
-                    "remote_host": db_document.tes_endpoint.host,
-                    "remote_base_path": db_document.tes_endpoint.base_path,
-                    "remote_task_id": remote_task_id,
-                    "user": db_document.basic_auth.username,
-                    "password": db_document.basic_auth.password,
-                },
-            )
+            with timer.stage("db_update"):
+                db_document = self._update_doc_in_db(
+                    db_connector=db_connector,
+                    tes_url=tes_url,
+                    remote_task_id=remote_task_id,
+                )
+                load.acquire(
+                    worker_id=db_document.worker_id,
+                    host=tes_url,
+                    reserved=True,
+                )
+                if sticky_routes is not None:
+                    sticky_routes.remember(
+                        tags=db_document.task.tags,
+                        host=tes_url,
+                    )
+            with timer.stage("enqueue_tracking"):
+                task__track_task_progress.apply_async(
+                    None,
+                    {
+                        "worker_id": db_document.worker_id,
+                        "remote_host": db_document.tes_endpoint.host,
+                        "remote_base_path": (
+                            db_document.tes_endpoint.base_path
+                        ),
+                        "remote_task_id": remote_task_id,
+                        "user": db_document.basic_auth.username,
+                        "password": db_document.basic_auth.password,
+                        "time_submitted": time_submitted.isoformat(),
+                    },
+                )
             return {"id": db_document.task.id}
 
-        db_connector.update_task_state(state=TesState.SYSTEM_ERROR.value)
+        db_connector.update_task_state(
+            state=TesState.SYSTEM_ERROR.value,
+            finalized=True,
+        )
         raise NoTesInstancesAvailable(
             "Could not forward the task request to any TES instance. Task"
             " state set to 'SYSTEM_ERROR'."
@@ -256,6 +376,11 @@ class TaskRuns:
     def list_tasks(self, **kwargs) -> dict:
         """Return list of tasks.
 
+        Page tokens are opaque and bound to the filters they were issued
+        for. An empty page token is returned for the last page. If requested,
+        the approximate number of tasks matching the filters is returned as
+        well.
+
         Args:
             **kwargs: Keyword arguments passed along with request.
 
@@ -268,31 +393,51 @@ class TaskRuns:
             self.foca_config.controllers["list_tasks"]["default_page_size"],
         )
         page_token = kwargs.get("page_token")
-        filter_dict = {}
-        filter_dict["user_id"] = kwargs.get("user_id")
+        filter_dict = self._get_list_filter(**kwargs)
+        filter_hash = get_filter_hash(filter_dict=filter_dict)
+        response: dict = {}
+        if kwargs.get("include_total_size"):
+            count_config: dict = (
+                self.foca_config.controllers["list_tasks"].get("count") or {}
+            )
+            response["total_size"] = get_task_count(
+                collection=self.db_client,
+                filter_dict=filter_dict,
+                filter_hash=filter_hash,
+                limit=count_config.get("limit", 0),
+            )
 
-        if page_token is not None:
-            filter_dict["_id"] = {"$lt": ObjectId(page_token)}
+        if page_token:
+            last_id = decode_page_token(
+                page_token=page_token,
+                filter_hash=filter_hash,
+            )
+            filter_dict.setdefault("_id", {})
+            filter_dict["_id"]["$lt"] = min(
+                last_id,
+                filter_dict["_id"].get("$lt", last_id),
+            )
         view = kwargs.get("view", "BASIC")
         projection = self._set_projection(view=view)
 
-        name_prefix: str = kwargs.get("name_prefix")
-
-        if name_prefix is not None:
-            filter_dict["task_original.name"] = {"$regex": f"^{name_prefix}"}
-
         cursor = (
             self.db_client.find(filter=filter_dict, projection=projection)
             .sort("_id", -1)
-            .limit(page_size)
+            .limit(page_size + 1)
         )
         tasks_list = list(cursor)
 
         logger.debug(f"Tasks list: {tasks_list}")
-        if tasks_list:
-            next_page_token = str(tasks_list[-1]["_id"])
+        if len(tasks_list) > page_size:
+            tasks_list = tasks_list[:page_size]
+            next_page_token = encode_page_token(
+                last_id=tasks_list[-1]["_id"],
+                filter_hash=filter_hash,
+            )
         else:
             next_page_token = ""
+        if view == "FULL":
+            self.blob_store.load(documents=tasks_list)
 
         tasks_lists = []
         for task in tasks_list:
@@ -302,15 +447,99 @@ class TaskRuns:
                 task["state"] = task["task"]["state"]
                 tasks_lists.append({"id": task["id"], "state": task["state"]})
             if view == "BASIC":
-                tasks_lists.append(task["task"])
+                tasks_lists.append(render_task_timestamps(task=task["task"]))
             if view == "FULL":
-                tasks_lists.append(task["task"])
+                tasks_lists.append(render_task_timestamps(task=task["task"]))
+
+        response.update(
+            {"next_page_token": next_page_token, "tasks": tasks_lists}
+        )
+        return response
+
+    @staticmethod
+    def _get_list_filter(**kwargs) -> dict:
+        """Get database filter for listing tasks.
+
+        Tasks are filtered by owner and, optionally, by name prefix, state,
+        tags, the host of the TES endpoint they were forwarded to and
+        creation time. Tag keys and values are paired by position; tags with
+        no or empty values are matched by key only. As the creation time of a
+        task is encoded in its database identifier, creation time ranges are
+        translated to identifier ranges, so that all filters are served by
+        indexes ending in the identifier, which is also used for sorting and
+        paging.
 
-        return {"next_page_token": next_page_token, "tasks": tasks_lists}
+        Args:
+            **kwargs: Keyword arguments passed along with request.
+
+        Returns:
+            Database filter.
+
+        Raises:
+            BadRequest: If filter parameters are invalid.
+        """
+        filter_dict: dict = {"user_id": kwargs.get("user_id")}
 
-    def get_task(self, id=str, **kwargs) -> dict:
+        name_prefix: Optional[str] = kwargs.get("name_prefix")
+        if name_prefix is not None:
+            filter_dict["task_original.name"] = {"$regex": f"^{name_prefix}"}
+
+        state: Optional[str] = kwargs.get("state")
+        if state is not None:
+            filter_dict["task.state"] = state
+
+        tes_endpoint_host: Optional[str] = kwargs.get("tes_endpoint_host")
+        if tes_endpoint_host is not None:
+            filter_dict["tes_endpoint.host"] = tes_endpoint_host
+
+        tag_keys: list[str] = kwargs.get("tag_key") or []
+        tag_values: list[str] = kwargs.get("tag_value") or []
+        if len(tag_values) > len(tag_keys):
+            raise BadRequest("More tag values than tag keys specified.")
+        tag_conditions: list[dict] = []
+        for index, key in enumerate(tag_keys):
+            value = tag_values[index] if index < len(tag_values) else ""
+            if value:
+                tag_conditions.append({"key": key, "value": value})
+            else:
+                tag_conditions.append({"key": key})
+        if tag_conditions:
+            filter_dict["tag_list"] = {
+                "$all": [
+                    {"$elemMatch": condition} for condition in tag_conditions
+                ]
+            }
+
+        id_range: dict = {}
+        for param, operator in (
+            ("created_after", "$gte"),
+            ("created_before", "$lt"),
+        ):
+            value = kwargs.get(param)
+            if value is None:
+                continue
+            try:
+                timestamp = to_datetime(value)
+            except ValueError as exc:
+                raise BadRequest(
+                    f"Invalid value for parameter '{param}': {value}"
+                ) from exc
+            id_range[operator] = ObjectId.from_datetime(timestamp)
+        if id_range:
+            filter_dict["_id"] = id_range
+        return filter_dict
+
+    def get_task(self, id=str, **kwargs) -> Union[dict, Response]:
         """Return detailed information about a task.
 
+        Tasks whose final state and logs are stored do not change anymore
+        and are cached in-process; in `FULL` view, only their version is
+        cached, as logs may be large, and tasks are loaded again on demand.
+        Responses carry an ETag derived from the version of the task
+        document and the requested view. If it matches the `If-None-Match`
+        request header, an empty response with status code 304 is returned
+        instead.
+
         Args:
             task_id: Task identifier.
             **kwargs: Additional keyword arguments passed along with request.
@@ -318,19 +547,100 @@ class TaskRuns:
         Returns:
             Response object according to TES API schema . Cf.
                 https://github.com/ga4gh/task-execution-schemas/blob/9e9c5aa2648d683d5574f9dbd63a025b4aea285d/openapi/task_execution_service.openapi.yaml
+                or, if the task was not modified, an empty response.
 
         Raises:
             pro_tes.exceptions.TaskNotFound: The requested task is not
                 available.
         """
-        projection = self._set_projection(view=kwargs.get("view", "BASIC"))
+        view: str = kwargs.get("view", "BASIC")
+        task: Optional[dict] = None
+        cached: Optional[tuple[Optional[dict], int]] = (
+            finished_task_cache.get(key=(id, view))
+        )
+        if cached is None and request.if_none_match:
+            document = self._find_task(id=id, projection={"version": True})
+            if document is None:
+                logger.error(f"Task '{id}' not found.")
+                raise TaskNotFound
+            cached = (None, document.get("version", 0))
+        if cached is not None:
+            task, version = cached
+            etag = self._get_etag(version=version, view=view)
+            if request.if_none_match.contains(etag):
+                return self._not_modified(etag=etag)
+        if task is None:
+            projection = self._set_projection(view=view)
+            document = self._find_task(id=id, projection=projection)
+            if document is None:
+                logger.error(f"Task '{id}' not found.")
+                raise TaskNotFound
+            if view == "FULL":
+                self.blob_store.load(documents=[document])
+            task = render_task_timestamps(task=document["task"])
+            version = document.get("version", 0)
+            if document.get("finalized"):
+                finished_task_cache.set(
+                    key=(id, view),
+                    value=(None if view == "FULL" else task, version),
+                )
+        etag = self._get_etag(version=version, view=view)
+
+        @after_this_request
+        def set_etag(response: Response) -> Response:
+            response.set_etag(etag)
+            return response
+
+        return task
+
+    def _find_task(self, id: str, projection: dict) -> Optional[dict]:
+        """Find task document, falling back to archived tasks.
+
+        Args:
+            id: Task identifier.
+            projection: Database projection.
+
+        Returns:
+            Task document, or `None` if the task is not available.
+        """
         document = self.db_client.find_one(
             filter={"task.id": id}, projection=projection
         )
         if document is None:
-            logger.error(f"Task '{id}' not found.")
-            raise TaskNotFound
-        return document["task"]
+            document = self.archive.find_one(
+                filter={"task.id": id}, projection=projection
+            )
+            if document is not None:
+                metrics.increment("archived_task_reads_total")
+        return document
+
+    @staticmethod
+    def _get_etag(version: int, view: str) -> str:
+        """Get entity tag of a task representation.
+
+        Args:
+            version: Version of the task document.
+            view: Task view.
+
+        Returns:
+            Entity tag.
+        """
+        return f"{version}-{view.lower()}"
+
+    @staticmethod
+    def _not_modified(etag: str) -> Response:
+        """Create response for a task that was not modified.
+
+        Args:
+            etag: Entity tag of the task representation.
+
+        Returns:
+            Empty response with status code 304.
+        """
+        metrics.increment("get_task_not_modified_total")
+        response = current_app.response_class(status=304)
+        response.set_etag(etag)
+        return response
 
     def cancel_task(self, id: str, **kwargs) -> dict:
         """Cancel task.
@@ -348,10 +658,7 @@ class TaskRuns:
             pro_tes.exceptions.TaskNotFound: The requested task is not
                 available.
         """
-        document = self.db_client.find_one(
-            filter={"task.id": id},
-            projection={"_id": False},
-        )
+        document = self._find_task(id=id, projection={"_id": False})
         if document is None:
             logger.error(f"task '{id}' not found.")
             raise TaskNotFound
@@ -376,9 +683,10 @@ class TaskRuns:
                 f" identifier '{db_document.worker_id}' running at TES"
                 f" endpoint hosted at: {url}"
             )
-            cli = tes.HTTPClient(
-                url,
-                timeout=5,
+            cli = create_tes_client(
+                url=url,
+                host=db_document.tes_endpoint.host,
+                latency=self.latency,
                 user=db_document.basic_auth.username,
                 password=db_document.basic_auth.password,
             )
@@ -387,6 +695,8 @@ class TaskRuns:
             db_connector.update_task_state(
                 state="CANCELED",
             )
+            for view in ("MINIMAL", "BASIC", "FULL"):
+                finished_task_cache.pop(key=(id, view))
             logger.info(
                 f"Task '{id}' with worker ID '{db_document.worker_id}'"
                 " canceled."
@@ -433,9 +743,8 @@ class TaskRuns:
         Returns:
             Sanitized request payload.
         """
-        time_now = datetime.now().strftime("%m-%d-%Y %H:%M:%S")
         if "creation_time" not in payload:
-            payload["creation_time"] = parse_time(time_now)
+            payload["creation_time"] = now()
         if "inputs" in payload:
             payload["inputs"] = [
                 tes.models.Input(**input) for input in payload["inputs"]
@@ -473,14 +782,17 @@ class TaskRuns:
             projection = {
                 "task.id": True,
                 "task.state": True,
+                "version": True,
+                "finalized": True,
             }
         elif view == "BASIC":
             projection = {
                 "task.inputs.content": False,
-                "task.system_logs": False,
-                "task.logs.stdout": False,
-                "task.logs.stderr": False,
+                "task.logs.system_logs": False,
+                "task.logs.logs.stdout": False,
+                "task.logs.logs.stderr": False,
                 "tes_endpoint": False,
+                "blobs": False,
             }
         elif view == "FULL":
             projection = {
@@ -492,7 +804,11 @@ class TaskRuns:
         return projection
 
     def _update_task(
-        self, payload: dict, db_document: DbDocument, start_time: str, **kwargs
+        self,
+        payload: dict,
+        db_document: DbDocument,
+        start_time: datetime,
+        **kwargs,
     ) -> DbDocument:
         """Update the task object.
 
@@ -510,14 +826,18 @@ class TaskRuns:
         )
         db_document.task.logs = [TesTaskLog(**logs) for logs in logs]
         db_document.task.state = TesState.UNKNOWN
+        if db_document.task.creation_time is None:
+            db_document.task.creation_time = start_time
         db_document.user_id = kwargs.get("user_id", None)
+        db_document.tag_list = TaskTag.from_tags(tags=db_document.task.tags)
+        self.blob_store.offload(document=db_document)
 
         (task_id, worker_id) = self._write_doc_to_db(document=db_document)
         db_document.task.id = task_id
         db_document.worker_id = worker_id
         return db_document
 
-    def _set_logs(self, payloads: dict, start_time: str) -> dict:
+    def _set_logs(self, payloads: dict, start_time: datetime) -> dict:
         """Create or update `TesTask.logs` and set start time.
 
         Args:
@@ -560,7 +880,7 @@ class TaskRuns:
         Returns:
             The updated database document.
         """
-        time_now = datetime.now().strftime("%m-%d-%Y %H:%M:%S")
+        time_now = now()
         tes_endpoint_dict = {"host": tes_url, "base_path": ""}
         db_document = db_connector.upsert_fields_in_root_object(
             root="tes_endpoint",
@@ -609,6 +929,36 @@ class TaskRuns:
                 logs.metadata.forwarded_to = tesNextTes_obj
         return db_document
 
+    @staticmethod
+    def _uses_sticky_routes(mw_handler: MiddlewareHandler) -> bool:
+        """Check whether middlewares rely on remembered sticky routes.
+
+        Args:
+            mw_handler: Middleware handler.
+
+        Returns:
+            Whether the sticky middleware, or the scoring middleware with the
+                sticky scorer, is part of the middleware chain.
+        """
+        return mw_handler.uses(middleware=TaskDistributionSticky) or (
+            mw_handler.uses(middleware=TaskDistributionScoring)
+            and "sticky" in get_weights()
+        )
+
+    @staticmethod
+    def _log_quota_exceeded(task_id: str, host: str) -> None:
+        """Log and count skipping a TES instance that reached its quota.
+
+        Args:
+            task_id: Task identifier.
+            host: TES instance URL.
+        """
+        metrics.increment("tes_quota_rejections_total", host=host)
+        logger.info(
+            f"Task '{task_id}' not sent to TES endpoint hosted at: {host}."
+            " Quota of in-flight tasks reached."
+        )
+
     @staticmethod
     def parse_basic_auth(auth: Optional[dict[str, str]]) -> BasicAuth:
         """Parse basic auth header.
@@ -0,0 +1,275 @@
+"""Asynchronous middlewares."""
+
+import abc
+import asyncio
+from copy import copy, deepcopy
+import logging
+from typing import Any, Optional
+
+import flask
+from flask import current_app
+from pydantic import BaseModel  # pragma pylint: disable=no-name-in-module
+
+from pro_tes.exceptions import MiddlewareException
+from pro_tes.middleware.abstract_middleware import AbstractMiddleware
+from pro_tes.utils.health import TesHealth
+
+logger = logging.getLogger(__name__)
+
+# pragma pylint: disable=too-few-public-methods
+
+
+class MiddlewareContext(BaseModel):
+    """Context of a request passed to asynchronous middlewares.
+
+    Attributes:
+        tes_urls: URLs of the configured TES instances, excluding unhealthy
+            ones.
+        data: Arbitrary data shared between middlewares.
+        request: Incoming request, if any; synchronous middlewares are
+            applied to copies of it.
+    """
+
+    tes_urls: list[str] = []
+    data: dict[str, Any] = {}
+    request: Optional[Any] = None
+
+    @classmethod
+    def from_config(
+        cls,
+        request: Optional[flask.Request] = None,
+    ) -> "MiddlewareContext":
+        """Create context from app config.
+
+        Args:
+            request: Incoming request.
+
+        Returns:
+            Middleware context.
+        """
+        return cls(
+            tes_urls=TesHealth().filter_healthy(
+                tes_urls=deepcopy(current_app.config.foca.tes["service_list"])
+            ),
+            request=request,
+        )
+
+
+class AbstractAsyncMiddleware(AbstractMiddleware):
+    """Abstract class for asynchronous middlewares.
+
+    Asynchronous middlewares operate on the parsed task payload rather than on
+    the request object and can run lookups concurrently, e.g., via
+    `asyncio.gather()` and, for blocking calls, `asyncio.to_thread()`; the
+    app context is available in both. They are applied like any other
+    middleware and can be combined with other middlewares to be applied
+    concurrently via `ParallelMiddleware`.
+    """
+
+    @abc.abstractmethod
+    async def apply(self, payload: dict, context: MiddlewareContext) -> dict:
+        """Modify task payload.
+
+        Args:
+            payload: Task payload to be modified.
+            context: Middleware context.
+
+        Returns:
+            Modified task payload.
+        """
+
+    def apply_middleware(self, request: flask.Request) -> flask.Request:
+        """Apply middleware to request object.
+
+        Args:
+            request: Request object to be modified.
+
+        Returns:
+            Modified request object.
+
+        Raises:
+            MiddlewareException: If request has no JSON payload.
+        """
+        if request.json is None:
+            raise MiddlewareException("Request has no JSON payload.")
+        payload = asyncio.run(
+            self.apply(
+                payload=request.json,
+                context=MiddlewareContext.from_config(request=request),
+            )
+        )
+        if payload is not request.json:
+            request.json.clear()
+            request.json.update(payload)
+        return request
+
+
+class SyncMiddlewareAdapter(AbstractAsyncMiddleware):
+    """Adapter for applying synchronous middlewares asynchronously.
+
+    The synchronous middleware is applied in a separate thread to a copy of
+    the incoming request carrying the task payload, so that headers,
+    authorization and remote address of the incoming request are retained.
+
+    Args:
+        middleware: Synchronous middleware class.
+
+    Attributes:
+        middleware: Synchronous middleware class.
+    """
+
+    def __init__(self, middleware: type[AbstractMiddleware]) -> None:
+        """Construct object instance."""
+        self.middleware: type[AbstractMiddleware] = middleware
+
+    async def apply(self, payload: dict, context: MiddlewareContext) -> dict:
+        """Modify task payload.
+
+        Args:
+            payload: Task payload to be modified.
+            context: Middleware context.
+
+        Returns:
+            Modified task payload.
+        """
+        return await asyncio.to_thread(
+            self._apply_sync, payload, context.request
+        )
+
+    def _apply_sync(
+        self,
+        payload: dict,
+        request: Optional[flask.Request],
+    ) -> dict:
+        """Apply synchronous middleware to a request carrying the payload.
+
+        Args:
+            payload: Task payload to be modified.
+            request: Incoming request; if `None`, a request carrying only the
+                payload is created.
+
+        Returns:
+            Modified task payload.
+        """
+        if request is None:
+            with current_app.test_request_context(json=payload):
+                modified = self.middleware().apply_middleware(flask.request)
+        else:
+            modified = self.middleware().apply_middleware(
+                copy_request(request=request, payload=payload)
+            )
+        assert modified.json is not None
+        return modified.json
+
+
+class ParallelMiddleware(AbstractAsyncMiddleware):
+    """Apply independent middlewares concurrently.
+
+    Each middleware is applied to its own copy of the task payload;
+    synchronous middlewares are applied via `SyncMiddlewareAdapter`. Changes
+    made by the middlewares are then merged in order, i.e., if several
+    middlewares change the same top-level field, the change made by the last
+    of them is kept. If any of the middlewares fails, the whole group fails.
+
+    Subclasses are created via `ParallelMiddleware.create()`.
+
+    Attributes:
+        middlewares: Middleware classes to apply concurrently.
+    """
+
+    middlewares: list[type[AbstractMiddleware]] = []
+
+    @classmethod
+    def create(
+        cls,
+        middlewares: list[type[AbstractMiddleware]],
+    ) -> type["ParallelMiddleware"]:
+        """Create middleware class applying middlewares concurrently.
+
+        Args:
+            middlewares: Middleware classes to apply concurrently.
+
+        Returns:
+            Middleware class.
+        """
+        name = "+".join(middleware.__name__ for middleware in middlewares)
+        return type(
+            f"Parallel[{name}]",
+            (cls,),
+            {"middlewares": middlewares, "__module__": cls.__module__},
+        )
+
+    async def apply(self, payload: dict, context: MiddlewareContext) -> dict:
+        """Modify task payload.
+
+        Args:
+            payload: Task payload to be modified.
+            context: Middleware context.
+
+        Returns:
+            Modified task payload.
+        """
+        original = deepcopy(payload)
+        results = await asyncio.gather(
+            *(
+                self._get_async(middleware).apply(
+                    payload=deepcopy(original),
+                    context=context,
+                )
+                for middleware in self.middlewares
+            )
+        )
+        changed: set[str] = set()
+        for middleware, result in zip(self.middlewares, results):
+            for key in set(original) | set(result):
+                if key in result and result[key] == original.get(key):
+                    continue
+                if key in changed:
+                    logger.debug(
+                        f"Field '{key}' changed by several middlewares;"
+                        f" keeping change by '{middleware.__name__}'."
+                    )
+                changed.add(key)
+                if key in result:
+                    payload[key] = result[key]
+                else:
+                    payload.pop(key, None)
+        return payload
+
+    @staticmethod
+    def _get_async(
+        middleware: type[AbstractMiddleware],
+    ) -> AbstractAsyncMiddleware:
+        """Get asynchronous middleware instance.
+
+        Args:
+            middleware: Middleware class.
+
+        Returns:
+            Instance of the middleware class if it is asynchronous, otherwise
+                an adapter for it.
+        """
+        if issubclass(middleware, AbstractAsyncMiddleware):
+            return middleware()
+        return SyncMiddlewareAdapter(middleware=middleware)
+
+
+def copy_request(
+    request: flask.Request,
+    payload: Optional[dict],
+) -> flask.Request:
+    """Copy request, replacing its JSON payload.
+
+    Headers, authorization and remote address of the request are retained.
+
+    Args:
+        request: Request to copy.
+        payload: JSON payload of the copy.
+
+    Returns:
+        Copy of the request.
+    """
+    request_copy = copy(request)
+    # pylint: disable=protected-access
+    request_copy._cached_json = (payload, payload)  # type: ignore
+    return request_copy
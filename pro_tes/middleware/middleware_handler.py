@@ -1,13 +1,25 @@
 """Middleware handler."""
 
+from copy import deepcopy
 import importlib
 import logging
-from typing import Union
+from threading import Thread
+from time import monotonic
+from typing import Any, Optional, Union
 
 import flask
 
-from pro_tes.exceptions import InvalidMiddleware, MiddlewareException
+from pro_tes.exceptions import (
+    InvalidMiddleware,
+    MiddlewareException,
+    MiddlewareTimeout,
+)
 from pro_tes.middleware.abstract_middleware import AbstractMiddleware
+from pro_tes.middleware.async_middleware import (
+    ParallelMiddleware,
+    copy_request,
+)
+from pro_tes.utils.metrics import StageTimer, metrics
 
 logger = logging.getLogger(__name__)
 
@@ -18,13 +30,74 @@ class MiddlewareHandler:
     Attributes:
         middlewares: List of middleware classes with up to one level of
             nesting.
+        timeout_chain: Time budget for applying all middlewares, in seconds.
+        timeout_default: Default time budget for applying a single
+            middleware, in seconds.
+        timeout_middlewares: Time budgets for applying individual
+            middlewares, in seconds, keyed by import path.
     """
 
     def __init__(self) -> None:
         """Class constructor."""
         self.middlewares: list[list[type[AbstractMiddleware]]] = []
+        self.timeout_chain: Optional[float] = None
+        self.timeout_default: Optional[float] = None
+        self.timeout_middlewares: dict[str, float] = {}
 
-    def set_middlewares(self, paths: list[Union[str, list[str]]]) -> None:
+    def set_config(self, config: Union[list, dict]) -> None:
+        """Set middlewares and time budgets from config.
+
+        An example of expected input format:
+            {
+                'chain': [
+                    'package.middlewares.one',
+                    ['package.middlewares.twoA', 'package.middlewares.twoB'],
+                    {
+                        'parallel': [
+                            'package.middlewares.threeA',
+                            'package.middlewares.threeB',
+                        ],
+                    },
+                ],
+                'timeouts': {
+                    'chain': 10,
+                    'default': 5,
+                    'middlewares': {'package.middlewares.twoA': 2},
+                },
+            }
+
+        For backwards compatibility, a list of middleware import paths as
+        expected by `set_middlewares()` is also accepted.
+
+        Args:
+            config: Middleware configuration.
+        """
+        if isinstance(config, list):
+            config = {"chain": config}
+        self.set_middlewares(paths=config["chain"])
+        self.set_timeouts(**(config.get("timeouts") or {}))
+
+    def set_timeouts(
+        self,
+        chain: Optional[float] = None,
+        default: Optional[float] = None,
+        middlewares: Optional[dict[str, float]] = None,
+    ) -> None:
+        """Set time budgets.
+
+        Args:
+            chain: Time budget for applying all middlewares, in seconds;
+                `None` for no limit.
+            default: Default time budget for applying a single middleware, in
+                seconds; `None` for no limit.
+            middlewares: Time budgets for applying individual middlewares, in
+                seconds, keyed by import path; overrides `default`.
+        """
+        self.timeout_chain = chain
+        self.timeout_default = default
+        self.timeout_middlewares = middlewares or {}
+
+    def set_middlewares(self, paths: list[Union[str, dict, list]]) -> None:
         """Import and set middlewares from paths.
 
         An example of aected input format:
@@ -33,8 +106,18 @@ class MiddlewareHandler:
                 ['package.middlewares.twoA', 'package.middlewares.twoB'],
                 ['package.middlewares.threeA', 'package.middlewares.threeB'],
                 'package.middlewares.four',
+                {
+                    'parallel': [
+                        'package.middlewares.fiveA',
+                        'package.middlewares.fiveB',
+                    ],
+                },
             ]
 
+        A dictionary with key `parallel` denotes a group of independent
+        middlewares that are applied concurrently (cf. `ParallelMiddleware`);
+        it can be used wherever an import path can.
+
         Args:
             paths: List of import paths for the middleware classes to be
                 imported, with up to one level of nesting.
@@ -42,10 +125,33 @@ class MiddlewareHandler:
         for item in paths:
             if isinstance(item, list):
                 self.middlewares.append(
-                    [self._import_middleware_class(path) for path in item]
+                    [self._get_middleware_class(path) for path in item]
                 )
             else:
-                self.middlewares.append([self._import_middleware_class(item)])
+                self.middlewares.append([self._get_middleware_class(item)])
+
+    def uses(self, middleware: type[AbstractMiddleware]) -> bool:
+        """Check whether a middleware class is part of the chain.
+
+        Alternatives and members of groups of parallel middlewares are
+        considered, as are subclasses of the middleware class.
+
+        Args:
+            middleware: Middleware class.
+
+        Returns:
+            Whether the middleware class is part of the chain.
+        """
+        for alternatives in self.middlewares:
+            for mw_class in alternatives:
+                members = (
+                    mw_class.middlewares
+                    if issubclass(mw_class, ParallelMiddleware)
+                    else [mw_class]
+                )
+                if any(issubclass(member, middleware) for member in members):
+                    return True
+        return False
 
     def apply_middlewares(
         self,
@@ -59,8 +165,20 @@ class MiddlewareHandler:
         This method iterates through the list of available middlewares and
         attempts to apply them in order. Each middleware can be a single class
         or a list of classes. The latter provides a fallback mechanism in case
-        a middleware fails to be applied. In that case, the next middleware in
-        the list is attempted.
+        a middleware fails to be applied or exceeds its time budget. In that
+        case, the next middleware in the list is attempted.
+
+        Middlewares with a time budget are applied in a separate thread to a
+        copy of the request; if the budget is exceeded, the middleware is
+        abandoned and its result discarded. The last alternative of each list
+        of middlewares is the fallback of last resort and is not bound by the
+        time budget of the whole chain, only by its own. Once the time budget
+        of the chain is exhausted, any other remaining alternatives are
+        skipped and the last alternative is attempted without a time limit.
+
+        The time spent in each middleware class, including failed and
+        abandoned attempts, is recorded in histogram
+        `middleware_duration_seconds` and logged at debug level.
 
         Args:
             request: Incoming request.
@@ -74,25 +192,188 @@ class MiddlewareHandler:
             MiddlewareException: If a middleware (a single class or all classes
                 in a list of alternatives) could not be applied.
         """
+        deadline: Optional[float] = (
+            None
+            if self.timeout_chain is None
+            else monotonic() + self.timeout_chain
+        )
+        timer = StageTimer("middleware_duration_seconds")
         for middleware in self.middlewares:
-            for mw_class in middleware:
+            exhausted = False
+            for index, mw_class in enumerate(middleware):
+                fallback = index == len(middleware) - 1
+                if (
+                    not exhausted
+                    and deadline is not None
+                    and monotonic() >= deadline
+                ):
+                    exhausted = True
+                    if not fallback:
+                        metrics.increment("middleware_chain_timeouts_total")
+                        logger.warning(
+                            "Middleware chain time budget exhausted; falling"
+                            f" back to '{middleware[-1]}'."
+                        )
+                if exhausted and not fallback:
+                    continue
                 logger.info(f"Applying middleware: {mw_class}")
-                instance = mw_class()
+                timeout = (
+                    None
+                    if exhausted
+                    else self._get_timeout(
+                        mw_class=mw_class,
+                        deadline=None if fallback else deadline,
+                    )
+                )
                 try:
-                    request = instance.apply_middleware(
-                        request, *args, **kwargs
+                    with timer.stage(mw_class.__name__):
+                        request = self._apply_middleware(
+                            mw_class,
+                            request,
+                            timeout,
+                            *args,
+                            **kwargs,
+                        )
+                except MiddlewareTimeout as exc:
+                    metrics.increment(
+                        "middleware_timeouts_total",
+                        middleware=mw_class.__name__,
+                    )
+                    logger.warning(
+                        f"Middleware class '{mw_class}' abandoned: {exc}"
                     )
+                    continue
                 except Exception as exc:  # pylint: disable=W0703
+                    metrics.increment(
+                        "middleware_failures_total",
+                        middleware=mw_class.__name__,
+                    )
                     logger.warning(
                         f"Error occurred in middleware class '{mw_class}':"
                         f" {exc}"
                     )
                     continue
+                metrics.increment(
+                    "middleware_applications_total",
+                    middleware=mw_class.__name__,
+                )
                 break
             else:
+                logger.debug(f"Middleware timings: {timer}")
                 raise MiddlewareException("No middleware could be applied.")
+        logger.debug(f"Middleware timings: {timer}")
+        return request
+
+    def _get_timeout(
+        self,
+        mw_class: type[AbstractMiddleware],
+        deadline: Optional[float],
+    ) -> Optional[float]:
+        """Get time budget for applying a middleware.
+
+        Args:
+            mw_class: Middleware class.
+            deadline: Deadline of the middleware chain, as returned by
+                `time.monotonic()`, or `None` if there is no deadline.
+
+        Returns:
+            Time budget in seconds, or `None` if there is no limit.
+        """
+        timeout = self.timeout_middlewares.get(
+            f"{mw_class.__module__}.{mw_class.__name__}",
+            self.timeout_default,
+        )
+        if deadline is None:
+            return timeout
+        remaining = max(deadline - monotonic(), 0)
+        return remaining if timeout is None else min(timeout, remaining)
+
+    @staticmethod
+    def _apply_middleware(
+        mw_class: type[AbstractMiddleware],
+        request: flask.Request,
+        timeout: Optional[float],
+        *args,
+        **kwargs,
+    ) -> flask.Request:
+        """Apply a single middleware, optionally with a time budget.
+
+        Args:
+            mw_class: Middleware class.
+            request: Incoming request.
+            timeout: Time budget in seconds, or `None` for no limit.
+            *args: Additional positional arguments to pass to the middleware.
+            **kwargs: Additional keyword arguments to pass to the middleware.
+
+        Returns:
+            Request object modified by the middleware.
+
+        Raises:
+            MiddlewareTimeout: If the middleware exceeds its time budget.
+        """
+        if timeout is None:
+            return mw_class().apply_middleware(request, *args, **kwargs)
+
+        # apply middleware to a copy of the request, so that an abandoned
+        # middleware cannot modify the request payload later on
+        request_copy = copy_request(
+            request=request, payload=deepcopy(request.json)
+        )
+        result: dict[str, Any] = {}
+        # pylint: disable=protected-access
+        app = flask.current_app._get_current_object()  # type: ignore
+
+        def target() -> None:
+            """Apply middleware and store result or exception."""
+            with app.app_context():
+                try:
+                    result["request"] = mw_class().apply_middleware(
+                        request_copy, *args, **kwargs
+                    )
+                except Exception as exc:  # pylint: disable=W0703
+                    result["exception"] = exc
+
+        thread = Thread(target=target, name=mw_class.__name__, daemon=True)
+        thread.start()
+        thread.join(timeout=timeout)
+        if thread.is_alive():
+            raise MiddlewareTimeout(f"Time budget of {timeout:.3f}s exceeded.")
+        if "exception" in result:
+            raise result["exception"]
+        assert request.json is not None
+        request.json.clear()
+        request.json.update(result["request"].json)
         return request
 
+    def _get_middleware_class(
+        self,
+        item: Union[str, dict],
+    ) -> type[AbstractMiddleware]:
+        """Get middleware class for an import path or a parallel group.
+
+        Args:
+            item: Import path of a middleware class or dictionary with key
+                `parallel` and a list of import paths as value.
+
+        Returns:
+            Middleware class.
+
+        Raises:
+            InvalidMiddleware: If the item is invalid.
+        """
+        if isinstance(item, dict):
+            if set(item) != {"parallel"} or not item["parallel"]:
+                raise InvalidMiddleware(
+                    f"Invalid group of parallel middlewares: {item}"
+                )
+            return ParallelMiddleware.create(
+                middlewares=[
+                    self._import_middleware_class(path)
+                    for path in item["parallel"]
+                ]
+            )
+        return self._import_middleware_class(item)
+
     @staticmethod
     def _import_middleware_class(import_path: str) -> type[AbstractMiddleware]:
         """Import a middleware class by its import path.
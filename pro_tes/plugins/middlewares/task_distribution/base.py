@@ -1,6 +1,7 @@
 """Random task distribution middleware."""
 
 from copy import deepcopy
+from typing import Optional
 
 import flask
 from flask import current_app
@@ -8,6 +9,7 @@ from pydantic import HttpUrl  # pragma pylint: disable=no-name-in-module
 
 from pro_tes.exceptions import MiddlewareException
 from pro_tes.middleware.abstract_middleware import AbstractMiddleware
+from pro_tes.utils.health import TesHealth
 
 # pragma pylint: disable=too-few-public-methods
 
@@ -38,8 +40,10 @@ class TaskDistributionBaseClass(AbstractMiddleware):
         if request.json is None:
             raise MiddlewareException("Request has no JSON payload.")
         self._set_tes_urls(
-            tes_urls=deepcopy(
-                current_app.config.foca.tes["service_list"]  # type: ignore
+            tes_urls=TesHealth().filter_healthy(
+                tes_urls=deepcopy(
+                    current_app.config.foca.tes["service_list"]  # type: ignore
+                )
             ),
             request=request,
         )
@@ -58,3 +62,24 @@ class TaskDistributionBaseClass(AbstractMiddleware):
             request: Request object to be modified.
         """
         self.tes_urls = list(set(tes_urls))
+
+    @staticmethod
+    def _get_ranked_tes_urls(
+        tes_urls: list[HttpUrl],
+        request: flask.Request,
+    ) -> Optional[list[HttpUrl]]:
+        """Get TES URIs as ranked by a preceding middleware.
+
+        Args:
+            tes_urls: List of available TES URIs.
+            request: Request object.
+
+        Returns:
+            Unique TES URIs set by a preceding middleware that are available,
+                in the order set; `None` if none were set.
+        """
+        assert request.json is not None
+        ranked: Optional[list[HttpUrl]] = request.json.get("tes_urls")
+        if not ranked:
+            return None
+        return [url for url in dict.fromkeys(ranked) if url in tes_urls]
@@ -0,0 +1,267 @@
+"""Module for data gravity-based task distribution logic."""
+
+from ftplib import FTP, all_errors as ftp_errors
+import logging
+from typing import Hashable, Optional
+from urllib.parse import unquote, urlsplit
+
+from flask import current_app
+import numpy as np
+from pydantic import (  # pragma pylint: disable=no-name-in-module
+    AnyUrl,
+    HttpUrl,
+)
+from pymongo.collection import Collection  # type: ignore
+from pymongo.errors import PyMongoError  # type: ignore
+import requests
+
+from pro_tes.plugins.middlewares.task_distribution.distance import (
+    TaskDistributionDistance,
+    TesStats,
+)
+from pro_tes.utils.misc import (
+    map_concurrently,
+    strip_auth,
+    upsert_by_field,
+)
+
+logger = logging.getLogger(__name__)
+
+# pragma pylint: disable=too-few-public-methods
+
+# templates for HTTP URLs of objects in public object stores
+OBJECT_STORE_URLS: dict[str, str] = {
+    "s3": "https://{bucket}.s3.amazonaws.com/{key}",
+    "gs": "https://storage.googleapis.com/{bucket}/{key}",
+}
+
+
+class TaskDistributionDataGravity(TaskDistributionDistance):
+    """Data gravity-based task distribution middleware.
+
+    Sorts the available TES instances by the sum of distances between a given
+    TES instance and all of the task's inputs, each weighted by the size of
+    the input, in ascending order. Large inputs thus dominate placement, and
+    the volume of data that has to be transferred across the network is
+    minimized.
+
+    Input sizes are determined via HTTP `HEAD` requests (`Content-Length`
+    header), object store metadata (`s3://` and `gs://` URIs) or the FTP `SIZE`
+    command and are cached in the database. Inputs whose size cannot be
+    determined are assumed to be of size `default_size`; failed lookups are
+    not cached and retried for the next task. Inputs in object stores are
+    located via the provider endpoint serving their bucket. Options are set
+    via config parameter `task_distribution.data_gravity`.
+
+    Attributes:
+        tes_urls: TES instance best suited for TES task.
+        input_uris: A list of input URIs from the incoming request.
+        tes_summary: Summary of TES instances and corresponding statistics.
+        rank_by: Name of the `TesStats` attribute to rank TES instances by.
+        config: Middleware options.
+    """
+
+    rank_by: str = "total_weighted_distance"
+
+    def __init__(self) -> None:
+        """Class constructor."""
+        super().__init__()
+        task_distribution_config: dict = (
+            getattr(current_app.config.foca, "task_distribution", None) or {}
+        )
+        self.config: dict = task_distribution_config.get("data_gravity") or {}
+
+    def _get_cache_key(  # pylint: disable=unused-argument
+        self,
+        tes_urls: list[HttpUrl],
+        task: dict,
+    ) -> Optional[Hashable]:
+        """Get key for caching distance statistics.
+
+        Size-weighted distances depend on individual inputs, not only on
+        their hosts, and are therefore not cached.
+
+        Args:
+            tes_urls: List of TES URIs.
+            task: Task object, as defined in the TES API specification.
+
+        Returns:
+            `None`.
+        """
+        return None
+
+    def _set_task_inputs(self, task: dict) -> None:
+        """Set task inputs and their sizes.
+
+        Args:
+            task: Task object, as defined in the TES API specification.
+        """
+        super()._set_task_inputs(task=task)
+        default_size: int = self.config.get("default_size", 1048576)
+        sizes = self._get_input_sizes(*self.task_summary.inputs.keys())
+        for uri, obj in self.task_summary.inputs.items():
+            size = sizes.get(uri)
+            obj.size = default_size if size is None else size
+
+    def _set_distances(self) -> None:
+        """Set total and size-weighted distances to task inputs."""
+        distances = self._get_distance_matrix()
+        sizes = np.array(
+            [obj.size or 0 for obj in self.task_summary.inputs.values()],
+            dtype=float,
+        )
+        for instance, total_distance, total_weighted_distance in zip(
+            self.task_summary.tes_instances.values(),
+            distances.sum(axis=1).tolist(),
+            (distances @ sizes).tolist(),
+        ):
+            instance.stats = TesStats(
+                total_distance=total_distance,
+                total_weighted_distance=total_weighted_distance,
+            )
+
+    def _get_input_sizes(self, *args: AnyUrl) -> dict[AnyUrl, Optional[int]]:
+        """Get sizes of inputs from cache or, if not cached, remotely.
+
+        Remote lookups are run concurrently.
+
+        Args:
+            *args: Input URIs.
+
+        Returns:
+            Dictionary of input URIs and their sizes in bytes, or `None` if a
+                size could not be determined.
+        """
+        collection = self._get_cache()
+        keys: dict[AnyUrl, str] = {uri: strip_auth(uri) for uri in args}
+        sizes: dict[AnyUrl, Optional[int]] = {}
+        if collection is not None:
+            cached = {
+                doc["uri"]: doc.get("size")
+                for doc in collection.find(
+                    {
+                        "uri": {"$in": list(keys.values())},
+                        "size": {"$ne": None},
+                    },
+                    {"_id": False},
+                )
+            }
+            sizes = {
+                uri: cached[key] for uri, key in keys.items() if key in cached
+            }
+        missing = [uri for uri in args if uri not in sizes]
+        if not missing:
+            return sizes
+        timeout: float = self.config.get("timeout", 2)
+        fetched = map_concurrently(
+            func=lambda uri: self._fetch_input_size(uri=uri, timeout=timeout),
+            items=missing,
+            max_workers=self.config.get("max_workers", 8),
+        )
+        sizes.update(fetched)
+        if collection is not None:
+            for uri, size in fetched.items():
+                if size is None:
+                    continue
+                upsert_by_field(
+                    collection=collection,
+                    field="uri",
+                    value=keys[uri],
+                    fields={"size": size},
+                )
+        return sizes
+
+    @staticmethod
+    def _get_location_uri(uri: AnyUrl) -> str:
+        """Get URI whose host determines the location of a task input.
+
+        Bucket names of object store URIs (`s3://` and `gs://`) are not
+        resolvable host names; such inputs are located via the HTTP endpoint
+        of the object store serving the bucket instead.
+
+        Args:
+            uri: Input URI.
+
+        Returns:
+            HTTP URL of the bucket for object store URIs, otherwise the input
+                URI.
+        """
+        parts = urlsplit(uri)
+        if parts.scheme in OBJECT_STORE_URLS:
+            return OBJECT_STORE_URLS[parts.scheme].format(
+                bucket=parts.hostname,
+                key="",
+            )
+        return uri
+
+    @staticmethod
+    def _get_cache() -> Optional[Collection]:
+        """Get database collection caching input sizes.
+
+        Returns:
+            Database collection, or `None` if not available.
+        """
+        try:
+            return (
+                current_app.config.foca.db.dbs["taskStore"]
+                .collections["input_sizes"]
+                .client
+            )
+        except (AttributeError, KeyError, PyMongoError) as exc:
+            logger.warning(f"Input size cache not available: {exc}")
+            return None
+
+    @staticmethod
+    def _fetch_input_size(uri: str, timeout: float) -> Optional[int]:
+        """Fetch size of an input from a remote location.
+
+        Args:
+            uri: Input URI.
+            timeout: Timeout for remote calls, in seconds.
+
+        Returns:
+            Size of input in bytes, or `None` if it could not be determined.
+        """
+        parts = urlsplit(uri)
+        try:
+            if parts.scheme in ("http", "https"):
+                return _head_content_length(url=uri, timeout=timeout)
+            if parts.scheme in OBJECT_STORE_URLS:
+                return _head_content_length(
+                    url=OBJECT_STORE_URLS[parts.scheme].format(
+                        bucket=parts.hostname,
+                        key=parts.path.lstrip("/"),
+                    ),
+                    timeout=timeout,
+                )
+            if parts.scheme == "ftp":
+                with FTP(timeout=timeout) as ftp:
+                    ftp.connect(host=parts.hostname, port=parts.port or 21)
+                    ftp.login(
+                        user=unquote(parts.username or "anonymous"),
+                        passwd=unquote(parts.password or ""),
+                    )
+                    ftp.voidcmd("TYPE I")
+                    return ftp.size(unquote(parts.path))
+        except (requests.RequestException, ValueError, *ftp_errors) as exc:
+            logger.debug(
+                f"Size of input at URI '{strip_auth(uri)}' could not be"
+                f" determined: {type(exc).__name__}: {exc}"
+            )
+        return None
+
+
+def _head_content_length(url: str, timeout: float) -> Optional[int]:
+    """Get content length of a resource via an HTTP `HEAD` request.
+
+    Args:
+        url: Resource URL.
+        timeout: Request timeout, in seconds.
+
+    Returns:
+        Content length in bytes, or `None` if not available.
+    """
+    response = requests.head(url, allow_redirects=True, timeout=timeout)
+    response.raise_for_status()
+    content_length = response.headers.get("Content-Length")
+    return None if content_length is None else int(content_length)
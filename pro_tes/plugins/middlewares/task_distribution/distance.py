@@ -1,29 +1,36 @@
 """Module for distance-based task distribution logic."""
 
+from collections import Counter
 import logging
-from socket import gaierror, gethostbyname
-from typing import Optional
-from urllib.parse import urlparse
+from typing import Hashable, Optional
+from urllib.parse import urlsplit
 
 import flask
-from geopy.distance import geodesic  # type: ignore
-from ip2geotools.errors import InvalidRequestError  # type: ignore
-from ip2geotools.databases.noncommercial import DbIpCity  # type: ignore
+from flask import current_app
 from ip2geotools.models import IpLocation  # type: ignore
+import numpy as np
 from pydantic import (  # pragma pylint: disable=no-name-in-module
     AnyUrl,
     BaseModel,
     HttpUrl,
 )
+from pymongo.errors import PyMongoError  # type: ignore
 
 from pro_tes.exceptions import MiddlewareException
 from pro_tes.plugins.middlewares.task_distribution.base import (
     TaskDistributionBaseClass,
 )
-from pro_tes.utils.misc import strip_auth
+from pro_tes.utils.geolocation import get_ip_locations, get_ips
+from pro_tes.utils.routing_cache import get_routing_epoch, routing_cache
+from pro_tes.utils.topology import TesTopology
 
 logger = logging.getLogger(__name__)
 
+# WGS-84 ellipsoid parameters and mean Earth radius, in kilometers
+WGS84_SEMI_MAJOR_AXIS: float = 6378.137
+WGS84_FLATTENING: float = 1 / 298.257223563
+EARTH_MEAN_RADIUS: float = 6371.0088
+
 # pragma pylint: disable=too-few-public-methods
 
 
@@ -31,11 +38,15 @@ class TesStats(BaseModel):
     """TES statistics.
 
     Attributes:
-        total distance: The total geodesic IP distance between the TES instance
-            and the task's inputs.
+        total distance: The total IP distance between the TES instance and
+            the task's inputs.
+        total_weighted_distance: The total IP distance between the TES
+            instance and the task's inputs, each weighted by the input's size,
+            in byte-kilometers.
     """
 
     total_distance: Optional[float] = None
+    total_weighted_distance: Optional[float] = None
 
 
 class TesInstance(BaseModel):
@@ -60,9 +71,11 @@ class TaskInput(BaseModel):
 
     Attributes:
         location: Input IP location.
+        size: Input size, in bytes.
     """
 
     location: Optional[IpLocation] = None
+    size: Optional[int] = None
 
     class Config:
         """Model configuration."""
@@ -86,17 +99,31 @@ class TaskSummary(BaseModel):
 class TaskDistributionDistance(TaskDistributionBaseClass):
     """Distance-based task distribution middleware.
 
-    Sorts the available TES instances by the sum of minimum geodesic distances
-    between a given TES instance and all of the task'sinputs, in ascending
-    order. Distances are calculated based on IP geolocations of the TES
-    instance and the inputs.
+    Sorts the available TES instances by the sum of minimum distances between
+    a given TES instance and all of the task's inputs, in ascending order.
+    Distances are calculated based on IP geolocations of the TES instance and
+    the inputs. The full instance-by-input distance matrix is computed in a
+    single vectorized pass, either on a sphere (`haversine`) or with Lambert's
+    approximation for the WGS-84 ellipsoid (`lambert`, default); the method
+    can be set via config parameter `task_distribution.distance.method`.
+
+    As distances only depend on the hosts of a task's inputs, computed
+    statistics are cached in-process, keyed by the number of inputs per host,
+    the set of candidate TES instances and the distance calculation method.
+    Cached statistics are discarded when the routing epoch advances, i.e.,
+    when TES instance health or locations change, and otherwise evicted on a
+    least-recently-used basis or after a time to live; limits are set via
+    config parameter `task_distribution.distance.cache`.
 
     Attributes:
         tes_urls: TES instance best suited for TES task.
         input_uris: A list of input URIs from the incoming request.
         tes_summary: Summary of TES instances and corresponding statistics.
+        rank_by: Name of the `TesStats` attribute to rank TES instances by.
     """
 
+    rank_by: str = "total_distance"
+
     def __init__(self) -> None:
         """Class constructor."""
         super().__init__()
@@ -112,12 +139,82 @@ class TaskDistributionDistance(TaskDistributionBaseClass):
         Args:
             tes_urls: List of TES URIs.
             request: Request object to be modified.
+
+        Raises:
+            MiddlewareException: If request has no JSON payload.
+        """
+        if request.json is None:
+            raise MiddlewareException("Request has no JSON payload.")
+        self.get_stats(tes_urls=tes_urls, task=request.json)
+        self.tes_urls = self._rank_tes_instances()
+
+    def get_stats(
+        self,
+        tes_urls: list[HttpUrl],
+        task: dict,
+    ) -> dict[HttpUrl, TesStats]:
+        """Compute distance statistics of TES instances for a task.
+
+        Args:
+            tes_urls: List of TES URIs.
+            task: Task object, as defined in the TES API specification.
+
+        Returns:
+            Dictionary of TES URIs and their distance statistics.
         """
+        key = self._get_cache_key(tes_urls=tes_urls, task=task)
+        epoch = None if key is None else get_routing_epoch()
+        if key is not None and epoch is not None:
+            cached: Optional[dict[HttpUrl, TesStats]] = routing_cache.get(
+                key=key, epoch=epoch
+            )
+            if cached is not None:
+                self.task_summary.tes_instances = {
+                    url: TesInstance(stats=stats)
+                    for url, stats in cached.items()
+                }
+                return cached
         self._set_tes_instances(tes_urls=tes_urls)
-        self._set_task_inputs(request=request)
+        self._set_task_inputs(task=task)
         self._set_locations()
         self._set_distances()
-        self.tes_urls = self._rank_tes_instances()
+        stats = {
+            url: instance.stats
+            for url, instance in self.task_summary.tes_instances.items()
+        }
+        if key is not None and epoch is not None:
+            routing_cache.set(key=key, value=stats, epoch=epoch)
+        return stats
+
+    def _get_cache_key(
+        self,
+        tes_urls: list[HttpUrl],
+        task: dict,
+    ) -> Optional[Hashable]:
+        """Get key for caching distance statistics.
+
+        Args:
+            tes_urls: List of TES URIs.
+            task: Task object, as defined in the TES API specification.
+
+        Returns:
+            Sorted number of distinct inputs per host, together with the
+                sorted candidate TES URIs and the distance calculation method;
+                `None` if statistics cannot be cached, e.g., because an input
+                URI has no host.
+        """
+        input_uris = {
+            item["url"] for item in task.get("inputs") or [] if item.get("url")
+        }
+        hosts = [urlsplit(uri).hostname for uri in input_uris]
+        if not hosts or None in hosts:
+            return None
+        return (
+            type(self).__name__,
+            self._get_distance_method(),
+            tuple(sorted(set(tes_urls))),
+            tuple(sorted(Counter(hosts).items())),
+        )
 
     def _set_tes_instances(self, tes_urls: list[HttpUrl]) -> None:
         """Set TES instances.
@@ -128,22 +225,19 @@ class TaskDistributionDistance(TaskDistributionBaseClass):
         for url in list(set(tes_urls)):
             self.task_summary.tes_instances[url] = TesInstance()
 
-    def _set_task_inputs(self, request: flask.Request) -> None:
+    def _set_task_inputs(self, task: dict) -> None:
         """Set task inputs.
 
         Args:
-            request: Request object to be modified.
+            task: Task object, as defined in the TES API specification.
 
         Raises:
-            MiddlewareException: If request has no JSON payload or if no input
-                URIs are available.
+            MiddlewareException: If no input URIs are available.
         """
-        if request.json is None:
-            raise MiddlewareException("Request has no JSON payload.")
         input_uris = list(
             {
                 input_value.get("url")
-                for input_value in request.json.get("inputs", [])
+                for input_value in task.get("inputs") or []
                 if input_value.get("url") is not None
             }
         )
@@ -153,19 +247,70 @@ class TaskDistributionDistance(TaskDistributionBaseClass):
             self.task_summary.inputs[uri] = TaskInput()
 
     def _set_locations(self) -> None:
-        """Set IP locations for TES instances and task inputs."""
+        """Set IP locations for TES instances and task inputs.
+
+        Locations of TES instances are taken from the shared TES topology
+        table; only TES instances missing from the table are looked up.
+
+        Raises:
+            MiddlewareException: If an IP address or location cannot be
+                determined.
+        """
         tes_urls = list(self.task_summary.tes_instances.keys())
-        input_uris = list(self.task_summary.inputs.keys())
-        uris_unique: list[AnyUrl] = list(set(tes_urls + input_uris))
-        ips: dict[AnyUrl, str] = self._get_ips(*uris_unique)
-        locations = self._get_ip_locations(*ips.values())
+        input_uris: dict[AnyUrl, str] = {
+            uri: self._get_location_uri(uri)
+            for uri in self.task_summary.inputs
+        }
+        tes_locations = self._get_tes_locations(tes_urls=tes_urls)
+        uris_unique: list[str] = list(
+            set(
+                list(input_uris.values())
+                + [url for url in tes_urls if url not in tes_locations]
+            )
+        )
+        try:
+            ips: dict[str, str] = get_ips(*uris_unique)
+            locations = get_ip_locations(*ips.values())
+        except ValueError as exc:
+            raise MiddlewareException(str(exc)) from exc
         for url in tes_urls:
-            self.task_summary.tes_instances[url].location = locations[ips[url]]
-        for uri in input_uris:
-            self.task_summary.inputs[uri].location = locations[ips[uri]]
+            self.task_summary.tes_instances[url].location = (
+                tes_locations[url]
+                if url in tes_locations
+                else locations[ips[url]]
+            )
+        for uri, location_uri in input_uris.items():
+            self.task_summary.inputs[uri].location = locations[
+                ips[location_uri]
+            ]
+
+    @staticmethod
+    def _get_location_uri(uri: AnyUrl) -> str:
+        """Get URI whose host determines the location of a task input.
+
+        Args:
+            uri: Input URI.
+
+        Returns:
+            Input URI.
+        """
+        return uri
 
     def _set_distances(self) -> None:
-        """Set distances between TES instances and task inputs.
+        """Set distances between TES instances and task inputs."""
+        distances = self._get_distance_matrix()
+        for instance, total_distance in zip(
+            self.task_summary.tes_instances.values(),
+            distances.sum(axis=1).tolist(),
+        ):
+            instance.stats = TesStats(total_distance=total_distance)
+
+    def _get_distance_matrix(self) -> np.ndarray:
+        """Get distances between TES instances and task inputs.
+
+        Returns:
+            Matrix of distances between TES instances (rows) and task inputs
+                (columns), in kilometers, in the order of the task summary.
 
         Raises:
             MiddlewareException: If an IP location is not available for a TES
@@ -178,104 +323,209 @@ class TaskDistributionDistance(TaskDistributionBaseClass):
                     f"IP location not available for input at URI: {uri}"
                 )
             locations_inputs.append(obj.location)
+        locations_instances: list[IpLocation] = []
         for url, instance in self.task_summary.tes_instances.items():
             if instance.location is None:
                 raise MiddlewareException(
                     f"IP location not available for TES instance at URL: {url}"
                 )
-            distances = self._get_distances(
-                node=instance.location,
-                leaves=locations_inputs,
-            )
-            instance.stats = TesStats(total_distance=sum(distances))
+            locations_instances.append(instance.location)
+        return self._get_distances(
+            nodes=locations_instances,
+            leaves=locations_inputs,
+            method=self._get_distance_method(),
+        )
 
     def _rank_tes_instances(self) -> list[HttpUrl]:
         """Rank TES instances by physical proximity to the task's inputs.
 
         Returns:
-            A list of TES URIs ranked by total distance to the task's inputs,
-                in ascending order.
+            A list of TES URIs ranked by the statistic set in `rank_by`, in
+                ascending order.
 
         Raises:
-            MiddlewareException: If total distance is not available for a TES
+            MiddlewareException: If the statistic is not available for a TES
                 instance.
         """
         distances: dict[HttpUrl, float] = {}
         for url, instance in self.task_summary.tes_instances.items():
-            if instance.stats.total_distance is None:
+            distance = getattr(instance.stats, self.rank_by)
+            if distance is None:
                 raise MiddlewareException(
-                    "Total distance not available for TES instance at URL:"
-                    f" {url}"
+                    f"Statistic '{self.rank_by}' not available for TES"
+                    f" instance at URL: {url}"
                 )
-            distances[url] = instance.stats.total_distance
+            distances[url] = distance
         return list(
             dict(sorted(distances.items(), key=lambda item: item[1])).keys()
         )
 
     @staticmethod
-    def _get_ips(*args: AnyUrl) -> dict[AnyUrl, str]:
-        """Get IP addresses for one or more URIs.
+    def _get_tes_locations(tes_urls: list[HttpUrl]) -> dict[str, IpLocation]:
+        """Get TES instance locations from the shared TES topology table.
 
         Args:
-            *args: URIs.
+            tes_urls: List of TES instance URLs.
 
         Returns:
-            Dictionary of URIs and their IP addresses.
-
-        Raises:
-            MiddlewareException: If IP address cannot be determined for a URI.
+            Dictionary of TES instance URLs and their locations; TES instances
+                with unknown locations are omitted, as are all TES instances
+                if the topology table is not available.
         """
-        ips: dict[AnyUrl, str] = {}
-        for uri in args:
-            try:
-                ips[uri] = gethostbyname(urlparse(strip_auth(uri)).netloc)
-            except gaierror as exc:
-                raise MiddlewareException(
-                    f"Could not determine IP address for URI: {uri}"
-                ) from exc
-        return ips
+        try:
+            return TesTopology().get_locations(tes_urls=list(tes_urls))
+        except (AttributeError, KeyError, PyMongoError) as exc:
+            logger.warning(f"TES topology not available: {exc}")
+            return {}
 
     @staticmethod
-    def _get_ip_locations(*args: str) -> dict[str, IpLocation]:
-        """Get locations of IP addresses.
-
-        Args:
-            *args: IP addresses.
+    def _get_distance_method() -> str:
+        """Get configured distance calculation method.
 
         Returns:
-            Dictionary of unique IP addresses and their locations.
+            Name of the distance calculation method.
 
         Raises:
-            MiddlewareException: If location cannot be determined for an IP.
+            MiddlewareException: If the configured method is not supported.
         """
-        locations: dict[str, IpLocation] = {}
-        for ip_addr in args:
-            try:
-                locations[ip_addr] = DbIpCity.get(ip_addr)
-            except InvalidRequestError as exc:
-                raise MiddlewareException(
-                    f"Could not determine location for IP: {ip_addr}"
-                ) from exc
-        return locations
+        config: dict = (
+            getattr(current_app.config.foca, "task_distribution", None) or {}
+        )
+        method: str = (config.get("distance") or {}).get("method", "lambert")
+        if method not in DISTANCE_METHODS:
+            raise MiddlewareException(
+                f"Unsupported distance calculation method: {method}"
+            )
+        return method
 
     @staticmethod
     def _get_distances(
-        node: IpLocation,
+        nodes: list[IpLocation],
         leaves: list[IpLocation],
-    ) -> list[float]:
-        """Get distances between a node and a list of leaves.
+        method: str = "lambert",
+    ) -> np.ndarray:
+        """Get distances between a list of nodes and a list of leaves.
 
         Args:
-            node: Node location.
+            nodes: List of node locations.
             leaves: List of leaf locations.
+            method: Distance calculation method; one of `haversine` and
+                `lambert`.
 
         Returns:
-            List of distances between the node and the leaves, in kilometers.
+            Matrix of distances between the nodes (rows) and the leaves
+                (columns), in kilometers.
         """
-        return [
-            geodesic(
-                (node.latitude, node.longitude),
-                (leaf.latitude, leaf.longitude),
-            ).km
-            for leaf in leaves
-        ]
+        coords_nodes = np.radians(
+            np.array(
+                [(node.latitude, node.longitude) for node in nodes],
+                dtype=float,
+            ).reshape(-1, 2)
+        )
+        coords_leaves = np.radians(
+            np.array(
+                [(leaf.latitude, leaf.longitude) for leaf in leaves],
+                dtype=float,
+            ).reshape(-1, 2)
+        )
+        return DISTANCE_METHODS[method](
+            coords_nodes[:, 0, np.newaxis],
+            coords_nodes[:, 1, np.newaxis],
+            coords_leaves[np.newaxis, :, 0],
+            coords_leaves[np.newaxis, :, 1],
+        )
+
+
+def _central_angles(
+    lat_1: np.ndarray,
+    lon_1: np.ndarray,
+    lat_2: np.ndarray,
+    lon_2: np.ndarray,
+) -> np.ndarray:
+    """Get central angles between points on a sphere.
+
+    Args:
+        lat_1: Latitudes of the first points, in radians.
+        lon_1: Longitudes of the first points, in radians.
+        lat_2: Latitudes of the second points, in radians.
+        lon_2: Longitudes of the second points, in radians.
+
+    Returns:
+        Broadcast array of central angles, in radians.
+    """
+    hav = (
+        np.sin((lat_2 - lat_1) / 2) ** 2
+        + np.cos(lat_1) * np.cos(lat_2) * np.sin((lon_2 - lon_1) / 2) ** 2
+    )
+    return 2 * np.arcsin(np.sqrt(np.clip(hav, 0.0, 1.0)))
+
+
+def haversine_distances(
+    lat_1: np.ndarray,
+    lon_1: np.ndarray,
+    lat_2: np.ndarray,
+    lon_2: np.ndarray,
+) -> np.ndarray:
+    """Get great-circle distances on a sphere with the mean Earth radius.
+
+    Args:
+        lat_1: Latitudes of the first points, in radians.
+        lon_1: Longitudes of the first points, in radians.
+        lat_2: Latitudes of the second points, in radians.
+        lon_2: Longitudes of the second points, in radians.
+
+    Returns:
+        Broadcast array of distances, in kilometers.
+    """
+    return EARTH_MEAN_RADIUS * _central_angles(lat_1, lon_1, lat_2, lon_2)
+
+
+def lambert_distances(
+    lat_1: np.ndarray,
+    lon_1: np.ndarray,
+    lat_2: np.ndarray,
+    lon_2: np.ndarray,
+) -> np.ndarray:
+    """Get distances on the WGS-84 ellipsoid via Lambert's formula.
+
+    Lambert's formula corrects great-circle distances computed on reduced
+    latitudes for the flattening of the ellipsoid; its error relative to
+    exact geodesic distances stays well below 0.1%.
+
+    Args:
+        lat_1: Latitudes of the first points, in radians.
+        lon_1: Longitudes of the first points, in radians.
+        lat_2: Latitudes of the second points, in radians.
+        lon_2: Longitudes of the second points, in radians.
+
+    Returns:
+        Broadcast array of distances, in kilometers.
+    """
+    beta_1 = np.arctan((1 - WGS84_FLATTENING) * np.tan(lat_1))
+    beta_2 = np.arctan((1 - WGS84_FLATTENING) * np.tan(lat_2))
+    sigma = _central_angles(beta_1, lon_1, beta_2, lon_2)
+    p_term = (beta_1 + beta_2) / 2
+    q_term = (beta_2 - beta_1) / 2
+    with np.errstate(divide="ignore", invalid="ignore"):
+        x_term = (
+            (sigma - np.sin(sigma))
+            * np.sin(p_term) ** 2
+            * np.cos(q_term) ** 2
+            / np.cos(sigma / 2) ** 2
+        )
+        y_term = (
+            (sigma + np.sin(sigma))
+            * np.cos(p_term) ** 2
+            * np.sin(q_term) ** 2
+            / np.sin(sigma / 2) ** 2
+        )
+        distances = WGS84_SEMI_MAJOR_AXIS * (
+            sigma - WGS84_FLATTENING / 2 * (x_term + y_term)
+        )
+    return np.where(sigma > 0, distances, 0.0)
+
+
+DISTANCE_METHODS = {
+    "haversine": haversine_distances,
+    "lambert": lambert_distances,
+}
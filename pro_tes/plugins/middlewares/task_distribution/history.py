@@ -0,0 +1,91 @@
+"""History-based task distribution middleware."""
+
+import random
+from typing import Optional
+
+import flask
+from flask import current_app
+from pydantic import HttpUrl  # pragma pylint: disable=no-name-in-module
+
+from pro_tes.exceptions import MiddlewareException
+from pro_tes.plugins.middlewares.task_distribution.base import (
+    TaskDistributionBaseClass,
+)
+from pro_tes.utils.history import TesHistory, get_task_signature
+
+# pragma pylint: disable=too-few-public-methods
+
+STATISTICS = ("mean", "p50", "p90")
+
+
+class TaskDistributionHistory(TaskDistributionBaseClass):
+    """History-based task distribution middleware.
+
+    Sorts the available TES instances by the expected time to completion of
+    the task, i.e., the sum of historical queue times and runtimes observed
+    at a given TES instance, in ascending order. Runtimes of tasks running the
+    same container images are preferred over runtimes of all tasks, if
+    enough of them are available. TES instances without history are ranked
+    first, so that their history is learned; ties are broken randomly.
+    Options are set via config parameter `task_distribution.history`.
+    """
+
+    def _set_tes_urls(
+        self,
+        tes_urls: list[HttpUrl],
+        request: flask.Request,
+    ) -> None:
+        """Set TES URIs.
+
+        Args:
+            tes_urls: List of TES URIs.
+            request: Request object to be modified.
+        """
+        tes_urls = list(set(tes_urls))
+        expected = get_expected_completion(
+            tes_urls=tes_urls,
+            task=request.json,
+        )
+        random.shuffle(tes_urls)
+        self.tes_urls = sorted(
+            tes_urls,
+            key=lambda url: expected[url] or 0.0,
+        )
+
+
+def get_expected_completion(
+    tes_urls: list[HttpUrl],
+    task: dict,
+) -> dict[HttpUrl, Optional[float]]:
+    """Get expected time to completion of a task per TES instance.
+
+    Args:
+        tes_urls: List of TES URIs.
+        task: Task object, as defined in the TES API specification.
+
+    Returns:
+        Dictionary of TES URIs and expected times to completion, in seconds,
+            or `None` for TES instances without history.
+
+    Raises:
+        MiddlewareException: If the configured statistic is not supported.
+    """
+    task_distribution_config: dict = (
+        getattr(current_app.config.foca, "task_distribution", None) or {}
+    )
+    config: dict = task_distribution_config.get("history") or {}
+    statistic: str = config.get("statistic", "mean")
+    if statistic not in STATISTICS:
+        raise MiddlewareException(
+            f"Unsupported history statistic: {statistic}"
+        )
+    return TesHistory(
+        collection=current_app.config.foca.db.dbs["taskStore"]
+        .collections["tes_history"]
+        .client
+    ).get_expected_completion(
+        hosts=tes_urls,
+        signature=get_task_signature(task=task),
+        statistic=statistic,
+        min_samples=config.get("min_samples", 5),
+    )
@@ -0,0 +1,88 @@
+"""Latency-aware task distribution middleware."""
+
+import random
+
+import flask
+from flask import current_app
+from pydantic import HttpUrl  # pragma pylint: disable=no-name-in-module
+
+from pro_tes.exceptions import MiddlewareException
+from pro_tes.plugins.middlewares.task_distribution.base import (
+    TaskDistributionBaseClass,
+)
+from pro_tes.utils.latency import LatencyStats, TesLatency
+
+# pragma pylint: disable=too-few-public-methods
+
+STATISTICS = ("ewma", "p50", "p90", "p99")
+
+
+class TaskDistributionLatency(TaskDistributionBaseClass):
+    """Latency-aware task distribution middleware.
+
+    Sorts the available TES instances by the observed latencies of calls made
+    to them, in ascending order, so that slow or degraded TES instances are
+    deprioritized. Latencies are penalized by the fraction of failed calls.
+    TES instances without recorded latencies are ranked first, so that
+    latencies are learned for them; ties are broken randomly. Options are set
+    via config parameter `task_distribution.latency`.
+    """
+
+    def _set_tes_urls(
+        self,
+        tes_urls: list[HttpUrl],
+        request: flask.Request,
+    ) -> None:
+        """Set TES URIs.
+
+        Args:
+            tes_urls: List of TES URIs.
+            request: Request object to be modified.
+        """
+        tes_urls = list(set(tes_urls))
+        scores = get_latency_scores(tes_urls=tes_urls)
+        random.shuffle(tes_urls)
+        self.tes_urls = sorted(tes_urls, key=lambda url: scores[url])
+
+
+def get_latency_scores(tes_urls: list[HttpUrl]) -> dict[HttpUrl, float]:
+    """Get latency scores of TES instances.
+
+    Args:
+        tes_urls: List of TES URIs.
+
+    Returns:
+        Dictionary of TES URIs and their latency scores, in seconds; `0` for
+            TES instances without recorded latencies.
+
+    Raises:
+        MiddlewareException: If the configured statistic is not supported.
+    """
+    task_distribution_config: dict = (
+        getattr(current_app.config.foca, "task_distribution", None) or {}
+    )
+    config: dict = task_distribution_config.get("latency") or {}
+    statistic: str = config.get("statistic", "ewma")
+    if statistic not in STATISTICS:
+        raise MiddlewareException(
+            f"Unsupported latency statistic: {statistic}"
+        )
+    error_weight: float = config.get("error_weight", 10)
+    stats: dict[str, LatencyStats] = TesLatency(
+        collection=current_app.config.foca.db.dbs["taskStore"]
+        .collections["tes_latencies"]
+        .client
+    ).get_stats(
+        hosts=tes_urls,
+        operation=config.get("operation"),
+        alpha=config.get("alpha", 0.3),
+    )
+    scores: dict[HttpUrl, float] = {}
+    for url in tes_urls:
+        latency = getattr(stats[url], statistic)
+        scores[url] = (
+            0.0
+            if latency is None
+            else latency * (1 + error_weight * stats[url].error_rate)
+        )
+    return scores
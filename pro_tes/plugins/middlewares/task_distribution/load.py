@@ -0,0 +1,65 @@
+"""Load-aware task distribution middleware."""
+
+import random
+
+import flask
+from flask import current_app
+from pydantic import HttpUrl  # pragma pylint: disable=no-name-in-module
+
+from pro_tes.plugins.middlewares.task_distribution.base import (
+    TaskDistributionBaseClass,
+)
+from pro_tes.utils.load import TesLoad
+
+# pragma pylint: disable=too-few-public-methods
+
+
+class TaskDistributionLoad(TaskDistributionBaseClass):
+    """Load-aware task distribution middleware.
+
+    Sorts the available TES instances by their utilization, i.e., the number
+    of tasks currently in flight at a given TES instance divided by its
+    capacity, in ascending order. Ties are broken randomly. Capacities are set
+    via config parameter `tes.capacities`, keyed by TES instance URL, with
+    `tes.default_capacity` applying to all other TES instances.
+    """
+
+    def _set_tes_urls(
+        self,
+        tes_urls: list[HttpUrl],
+        request: flask.Request,
+    ) -> None:
+        """Set TES URIs.
+
+        Args:
+            tes_urls: List of TES URIs.
+            request: Request object to be modified.
+        """
+        tes_urls = list(set(tes_urls))
+        utilization = get_utilization(tes_urls=tes_urls)
+        random.shuffle(tes_urls)
+        self.tes_urls = sorted(tes_urls, key=lambda url: utilization[url])
+
+
+def get_utilization(tes_urls: list[HttpUrl]) -> dict[HttpUrl, float]:
+    """Get utilization of TES instances.
+
+    Args:
+        tes_urls: List of TES URIs.
+
+    Returns:
+        Dictionary of TES URIs and the number of their in-flight tasks
+            divided by their capacity.
+    """
+    tes_config: dict = current_app.config.foca.tes
+    capacities: dict = tes_config.get("capacities") or {}
+    default_capacity: float = tes_config.get("default_capacity", 1)
+    in_flight = TesLoad(
+        collection=current_app.config.foca.db.dbs["taskStore"]
+        .collections["tasks"]
+        .client
+    ).get_in_flight(hosts=tes_urls)
+    return {
+        url: in_flight[url] / max(capacities.get(url, default_capacity), 1)
+        for url in tes_urls
+    }
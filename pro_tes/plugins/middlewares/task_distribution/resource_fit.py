@@ -0,0 +1,144 @@
+"""Resource-fit task distribution middleware."""
+
+import logging
+import random
+from typing import Optional
+
+import flask
+from flask import current_app
+from pydantic import HttpUrl  # pragma pylint: disable=no-name-in-module
+
+from pro_tes.plugins.middlewares.task_distribution.base import (
+    TaskDistributionBaseClass,
+)
+from pro_tes.utils.service_info import TesServiceInfoCache
+
+logger = logging.getLogger(__name__)
+
+# pragma pylint: disable=too-few-public-methods
+
+# numeric resources requested by tasks and limited by TES instances
+NUMERIC_RESOURCES = ("cpu_cores", "ram_gb", "disk_gb")
+
+
+class TaskDistributionResourceFit(TaskDistributionBaseClass):
+    """Resource-fit task distribution middleware.
+
+    Removes TES instances that cannot provide the resources requested by the
+    task (`resources` property of the task), i.e., instances with fewer CPU
+    cores, less RAM or disk space than requested, instances that only provide
+    preemptible compute for tasks that must not be preempted, and instances
+    that do not serve any of the requested zones.
+
+    Resource limits of a TES instance are taken from config parameter
+    `tes.resources` or, for limits not configured there, from the `resources`
+    field of its cached service info, if advertised, e.g.:
+
+        tes:
+          resources:
+            "https://tes.example.org":
+              cpu_cores: 32
+              ram_gb: 128
+              disk_gb: 1000
+              preemptible: false
+              zones: ["europe-north1"]
+
+    Here, `preemptible: true` denotes that the TES instance only provides
+    preemptible compute. Limits that are unknown are assumed to be met.
+
+    If the TES instances were already ranked by a preceding middleware, the
+    ranking is preserved, except that TES instances with unknown limits are
+    moved to the end. Otherwise, TES instances are ranked best fit first,
+    i.e., those whose limits are most closely matched by the requested
+    resources come first, keeping larger TES instances available for larger
+    tasks. If no TES instance fits, the task is not forwarded at all.
+    """
+
+    def _set_tes_urls(
+        self,
+        tes_urls: list[HttpUrl],
+        request: flask.Request,
+    ) -> None:
+        """Set TES URIs.
+
+        Args:
+            tes_urls: List of TES URIs.
+            request: Request object to be modified.
+        """
+        assert request.json is not None
+        ranked = self._get_ranked_tes_urls(tes_urls=tes_urls, request=request)
+        tes_urls = list(set(tes_urls)) if ranked is None else ranked
+        resources: dict = request.json.get("resources") or {}
+        limits = get_resource_limits(tes_urls=tes_urls)
+        scores: dict[HttpUrl, float] = {}
+        for url in tes_urls:
+            score = get_fit_score(resources=resources, limits=limits[url])
+            if score is not None:
+                scores[url] = score
+        if not scores:
+            logger.warning(
+                "No TES instance provides the requested resources:"
+                f" {resources}"
+            )
+        if ranked is not None:
+            self.tes_urls = sorted(scores, key=lambda url: scores[url] == 0)
+            return
+        candidates = list(scores)
+        random.shuffle(candidates)
+        self.tes_urls = sorted(
+            candidates,
+            key=lambda url: (scores[url] == 0, -scores[url]),
+        )
+
+
+def get_resource_limits(tes_urls: list[HttpUrl]) -> dict[HttpUrl, dict]:
+    """Get resource limits of TES instances.
+
+    Args:
+        tes_urls: List of TES URIs.
+
+    Returns:
+        Dictionary of TES URIs and their known resource limits.
+    """
+    configured: dict = current_app.config.foca.tes.get("resources") or {}
+    service_infos = TesServiceInfoCache().get(tes_urls=tes_urls)
+    limits: dict[HttpUrl, dict] = {}
+    for url in tes_urls:
+        advertised = service_infos.get(url, {}).get("resources")
+        limits[url] = {
+            **(advertised if isinstance(advertised, dict) else {}),
+            **(configured.get(url) or {}),
+        }
+    return limits
+
+
+def get_fit_score(resources: dict, limits: dict) -> Optional[float]:
+    """Get score of how well requested resources fit resource limits.
+
+    Args:
+        resources: Requested resources, as defined by the `tesResources`
+            schema of the TES API specification.
+        limits: Resource limits of a TES instance.
+
+    Returns:
+        Largest fraction of a resource limit taken up by the requested
+            resources, between `0` (exclusive) and `1` (inclusive); `0` if no
+            relevant limits are known; `None` if the resources do not fit.
+    """
+    score = 0.0
+    for name in NUMERIC_RESOURCES:
+        requested = resources.get(name)
+        limit = limits.get(name)
+        if requested is None or limit is None:
+            continue
+        if requested > limit:
+            return None
+        if limit > 0:
+            score = max(score, requested / limit)
+    if resources.get("preemptible") is False and limits.get("preemptible"):
+        return None
+    zones = resources.get("zones")
+    if zones and limits.get("zones") is not None:
+        if not set(zones) & set(limits["zones"]):
+            return None
+    return score
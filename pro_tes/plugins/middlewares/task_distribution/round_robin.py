@@ -0,0 +1,132 @@
+"""Weighted round-robin task distribution middleware."""
+
+from functools import lru_cache, reduce
+from math import gcd
+
+import flask
+from flask import current_app
+from pydantic import HttpUrl  # pragma pylint: disable=no-name-in-module
+from pymongo.collection import ReturnDocument  # type: ignore
+
+from pro_tes.plugins.middlewares.task_distribution.base import (
+    TaskDistributionBaseClass,
+)
+
+# pragma pylint: disable=too-few-public-methods
+
+# name of the shared counter of round-robin selections
+COUNTER_NAME = "round_robin"
+
+
+class TaskDistributionWeightedRoundRobin(TaskDistributionBaseClass):
+    """Smooth weighted round-robin task distribution middleware.
+
+    Selects TES instances in proportion to their weights, interleaving
+    selections as evenly as possible (e.g., weights 5, 1 and 1 yield the
+    order `A A B A C A A` rather than `A A A A A B C`). The selection order of
+    one full period is computed once per process from the configured
+    weights; a single shared counter, incremented atomically in the database,
+    determines the position in that order, so that selections are O(1) per
+    request and interleave correctly across workers.
+
+    Weights are set via config parameter `tes.weights`, keyed by TES instance
+    URL; TES instances without a weight are weighted by their capacity (cf.
+    `tes.capacities` and `tes.default_capacity`). The selected TES instance is
+    followed by the remaining ones in order of descending weight, as
+    fallbacks.
+    """
+
+    def _set_tes_urls(
+        self,
+        tes_urls: list[HttpUrl],
+        request: flask.Request,
+    ) -> None:
+        """Set TES URIs.
+
+        Args:
+            tes_urls: List of TES URIs.
+            request: Request object to be modified.
+        """
+        weights = get_weights(tes_urls=tes_urls)
+        schedule = get_schedule(
+            weights=tuple(sorted(weights.items())),
+        )
+        if not schedule:
+            self.tes_urls = []
+            return
+        selected = schedule[next_counter_value() % len(schedule)]
+        self.tes_urls = [selected] + sorted(
+            (url for url in weights if url != selected),
+            key=lambda url: (-weights[url], url),
+        )
+
+
+def get_weights(tes_urls: list[HttpUrl]) -> dict[HttpUrl, int]:
+    """Get weights of TES instances.
+
+    Args:
+        tes_urls: List of TES URIs.
+
+    Returns:
+        Dictionary of TES URIs and their weights; TES instances with a
+            non-positive weight are omitted.
+    """
+    tes_config: dict = current_app.config.foca.tes
+    weights: dict = tes_config.get("weights") or {}
+    capacities: dict = tes_config.get("capacities") or {}
+    default_capacity: int = tes_config.get("default_capacity", 1)
+    configured = {
+        url: int(weights.get(url, capacities.get(url, default_capacity)))
+        for url in set(tes_urls)
+    }
+    return {url: weight for url, weight in configured.items() if weight > 0}
+
+
+@lru_cache(maxsize=16)
+def get_schedule(weights: tuple[tuple[str, int], ...]) -> tuple[str, ...]:
+    """Compute selection order of one period of smooth weighted round-robin.
+
+    Weights are reduced by their greatest common divisor, so that the period
+    is as short as possible.
+
+    Args:
+        weights: Pairs of TES instance URLs and their (positive) weights, in
+            a deterministic order.
+
+    Returns:
+        TES instance URLs in order of selection; each URL occurs as often as
+            its reduced weight.
+    """
+    if not weights:
+        return ()
+    divisor = reduce(gcd, (weight for _, weight in weights))
+    reduced = [(url, weight // divisor) for url, weight in weights]
+    total = sum(weight for _, weight in reduced)
+    current = [0] * len(reduced)
+    schedule: list[str] = []
+    for _ in range(total):
+        for index, (_, weight) in enumerate(reduced):
+            current[index] += weight
+        index = max(range(len(reduced)), key=lambda i: current[i])
+        current[index] -= total
+        schedule.append(reduced[index][0])
+    return tuple(schedule)
+
+
+def next_counter_value() -> int:
+    """Atomically increment and get the shared round-robin counter.
+
+    Returns:
+        Number of selections made before the current one.
+    """
+    document = (
+        current_app.config.foca.db.dbs["taskStore"]
+        .collections["counters"]
+        .client.find_one_and_update(
+            {"name": COUNTER_NAME},
+            {"$inc": {"value": 1}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+    )
+    return document["value"] - 1
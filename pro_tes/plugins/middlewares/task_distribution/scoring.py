@@ -0,0 +1,397 @@
+"""Weighted scoring-based task distribution middleware."""
+
+from abc import ABC, abstractmethod
+import asyncio
+import logging
+from math import inf, isinf
+import random
+from typing import cast, Mapping, Optional
+
+from flask import current_app
+from pydantic import HttpUrl  # pragma pylint: disable=no-name-in-module
+
+from pro_tes.exceptions import MiddlewareException
+from pro_tes.middleware.async_middleware import (
+    AbstractAsyncMiddleware,
+    MiddlewareContext,
+)
+from pro_tes.plugins.middlewares.task_distribution.data_gravity import (
+    TaskDistributionDataGravity,
+)
+from pro_tes.plugins.middlewares.task_distribution.distance import (
+    TaskDistributionDistance,
+)
+from pro_tes.plugins.middlewares.task_distribution.history import (
+    get_expected_completion,
+)
+from pro_tes.plugins.middlewares.task_distribution.latency import (
+    get_latency_scores,
+)
+from pro_tes.plugins.middlewares.task_distribution.load import (
+    get_utilization,
+)
+from pro_tes.plugins.middlewares.task_distribution.resource_fit import (
+    get_fit_score,
+    get_resource_limits,
+)
+from pro_tes.plugins.middlewares.task_distribution.sticky import (
+    get_sticky_tes,
+)
+from pro_tes.plugins.middlewares.task_distribution.storage import (
+    AFFINITY_LEVELS,
+    get_affinity,
+    get_storage,
+)
+from pro_tes.utils.metrics import metrics
+from pro_tes.utils.misc import strip_auth
+
+logger = logging.getLogger(__name__)
+
+# pragma pylint: disable=too-few-public-methods
+
+# normalized cost assigned to TES instances a scorer knows nothing about
+NEUTRAL_COST = 0.5
+
+# costs of TES instances, as returned by scorers; read-only, so that scorers
+# can return, e.g., `dict[HttpUrl, float]`
+Costs = Mapping[HttpUrl, Optional[float]]
+
+
+class Scorer(ABC):
+    """Abstract base class for scorers.
+
+    A scorer assigns a cost to each candidate TES instance for a given task;
+    lower costs are better. A cost of `None` denotes that the scorer has no
+    information about a TES instance, a cost of `math.inf` that the TES
+    instance cannot run the task at all.
+    """
+
+    @abstractmethod
+    def get_costs(self, tes_urls: list[HttpUrl], task: dict) -> Costs:
+        """Get costs of TES instances for a task.
+
+        Args:
+            tes_urls: List of candidate TES URIs.
+            task: Task object, as defined in the TES API specification.
+
+        Returns:
+            Dictionary of TES URIs and their costs.
+        """
+
+
+class DistanceScorer(Scorer):
+    """Score TES instances by their total distance to the task's inputs."""
+
+    middleware_class: type[TaskDistributionDistance] = TaskDistributionDistance
+
+    def get_costs(self, tes_urls: list[HttpUrl], task: dict) -> Costs:
+        """Get costs of TES instances for a task.
+
+        Args:
+            tes_urls: List of candidate TES URIs.
+            task: Task object, as defined in the TES API specification.
+
+        Returns:
+            Dictionary of TES URIs and their costs; `None` for all TES
+                instances if the task has no inputs with URLs.
+        """
+        middleware = self.middleware_class()
+        try:
+            stats = middleware.get_stats(tes_urls=tes_urls, task=task)
+        except MiddlewareException as exc:
+            logger.debug(f"Distances not available: {exc}")
+            return {url: None for url in tes_urls}
+        return {
+            url: getattr(stats[url], middleware.rank_by) for url in tes_urls
+        }
+
+
+class DataGravityScorer(DistanceScorer):
+    """Score TES instances by their size-weighted distance to task inputs."""
+
+    middleware_class: type[TaskDistributionDistance] = (
+        TaskDistributionDataGravity
+    )
+
+
+class LoadScorer(Scorer):
+    """Score TES instances by their utilization."""
+
+    def get_costs(self, tes_urls: list[HttpUrl], task: dict) -> Costs:
+        """Get costs of TES instances for a task.
+
+        Args:
+            tes_urls: List of candidate TES URIs.
+            task: Task object, as defined in the TES API specification.
+
+        Returns:
+            Dictionary of TES URIs and their utilization.
+        """
+        return dict(get_utilization(tes_urls=tes_urls))
+
+
+class LatencyScorer(Scorer):
+    """Score TES instances by the latency of calls made to them."""
+
+    def get_costs(self, tes_urls: list[HttpUrl], task: dict) -> Costs:
+        """Get costs of TES instances for a task.
+
+        Args:
+            tes_urls: List of candidate TES URIs.
+            task: Task object, as defined in the TES API specification.
+
+        Returns:
+            Dictionary of TES URIs and their latency scores.
+        """
+        return dict(get_latency_scores(tes_urls=tes_urls))
+
+
+class HistoryScorer(Scorer):
+    """Score TES instances by the expected time to completion of the task."""
+
+    def get_costs(self, tes_urls: list[HttpUrl], task: dict) -> Costs:
+        """Get costs of TES instances for a task.
+
+        Args:
+            tes_urls: List of candidate TES URIs.
+            task: Task object, as defined in the TES API specification.
+
+        Returns:
+            Dictionary of TES URIs and expected times to completion.
+        """
+        return get_expected_completion(tes_urls=tes_urls, task=task)
+
+
+class ResourceFitScorer(Scorer):
+    """Score TES instances by how well they fit the requested resources.
+
+    TES instances that cannot provide the requested resources are excluded;
+    among the others, tighter fits are preferred.
+    """
+
+    def get_costs(self, tes_urls: list[HttpUrl], task: dict) -> Costs:
+        """Get costs of TES instances for a task.
+
+        Args:
+            tes_urls: List of candidate TES URIs.
+            task: Task object, as defined in the TES API specification.
+
+        Returns:
+            Dictionary of TES URIs and their costs.
+        """
+        resources: dict = task.get("resources") or {}
+        limits = get_resource_limits(tes_urls=tes_urls)
+        costs: dict[HttpUrl, Optional[float]] = {}
+        for url in tes_urls:
+            score = get_fit_score(resources=resources, limits=limits[url])
+            if score is None:
+                costs[url] = inf
+            else:
+                costs[url] = None if score == 0 else 1 - score
+        return costs
+
+
+class StickyScorer(Scorer):
+    """Score TES instances by whether the task should stick to them."""
+
+    def get_costs(self, tes_urls: list[HttpUrl], task: dict) -> Costs:
+        """Get costs of TES instances for a task.
+
+        Args:
+            tes_urls: List of candidate TES URIs.
+            task: Task object, as defined in the TES API specification.
+
+        Returns:
+            Dictionary of TES URIs and their costs: `0` for the TES instance
+                the task should stick to and `1` for all others; `None` for
+                all TES instances if there is none.
+        """
+        pinned = get_sticky_tes(tes_urls=tes_urls, task=task)
+        if pinned is None:
+            return {url: None for url in tes_urls}
+        return {url: 0.0 if url == pinned else 1.0 for url in tes_urls}
+
+
+class StorageScorer(Scorer):
+    """Score TES instances by the affinity of their storage to task data.
+
+    Each input and output URL of the task that does not match any storage
+    location of a TES instance adds a cost of `1`; matches of the scheme,
+    location or prefix add decreasing fractions thereof.
+    """
+
+    def get_costs(self, tes_urls: list[HttpUrl], task: dict) -> Costs:
+        """Get costs of TES instances for a task.
+
+        Args:
+            tes_urls: List of candidate TES URIs.
+            task: Task object, as defined in the TES API specification.
+
+        Returns:
+            Dictionary of TES URIs and their costs.
+        """
+        storage = get_storage(tes_urls=tes_urls)
+        task_urls = [
+            strip_auth(item["url"])
+            for key in ("inputs", "outputs")
+            for item in task.get(key) or []
+            if item.get("url")
+        ]
+        costs: dict[HttpUrl, Optional[float]] = {}
+        for url in tes_urls:
+            counts = get_affinity(urls=task_urls, storage=storage[url])
+            matched = sum(
+                count * (len(AFFINITY_LEVELS) - level) / len(AFFINITY_LEVELS)
+                for level, count in enumerate(counts)
+            )
+            costs[url] = len(task_urls) - matched
+        return costs
+
+
+SCORERS: dict[str, type[Scorer]] = {
+    "data_gravity": DataGravityScorer,
+    "distance": DistanceScorer,
+    "history": HistoryScorer,
+    "latency": LatencyScorer,
+    "load": LoadScorer,
+    "resource_fit": ResourceFitScorer,
+    "sticky": StickyScorer,
+    "storage": StorageScorer,
+}
+
+
+class TaskDistributionScoring(AbstractAsyncMiddleware):
+    """Weighted scoring-based task distribution middleware.
+
+    Combines several scorers, e.g., distance, load, latency and resource fit,
+    in a single pass: the task payload and the list of candidate TES
+    instances are prepared once and passed to each scorer. Each scorer's costs
+    are min-max normalized to the interval `[0, 1]` across TES instances,
+    with TES instances unknown to a scorer assigned a neutral cost of `0.5`.
+    TES instances are ranked by the weighted mean of their normalized costs,
+    in ascending order; TES instances that any scorer considers unable to run
+    the task are excluded, and ties are broken randomly. Scorers are run
+    concurrently; a scorer that fails is logged and ignored.
+
+    Scorers and their weights are set via config parameter
+    `task_distribution.scoring.weights`, e.g.:
+
+        task_distribution:
+          scoring:
+            weights:
+              distance: 1
+              load: 1
+              latency: 0.5
+              resource_fit: 1
+
+    Available scorers are listed in `SCORERS`.
+    """
+
+    async def apply(self, payload: dict, context: MiddlewareContext) -> dict:
+        """Set ranked TES URIs.
+
+        Args:
+            payload: Task payload to be modified.
+            context: Middleware context.
+
+        Returns:
+            Task payload with ranked TES URIs.
+        """
+        # TES URIs in the middleware context are not validated as `HttpUrl`
+        tes_urls = cast(list[HttpUrl], list(set(context.tes_urls)))
+        totals = await get_weighted_costs(tes_urls=tes_urls, task=payload)
+        random.shuffle(tes_urls)
+        payload["tes_urls"] = sorted(
+            (url for url in tes_urls if not isinf(totals[url])),
+            key=lambda url: totals[url],
+        )
+        return payload
+
+
+def get_weights() -> dict[str, float]:
+    """Get configured scorers and their weights.
+
+    Returns:
+        Dictionary of scorer names and their (positive) weights.
+
+    Raises:
+        MiddlewareException: If an unknown scorer is configured.
+    """
+    task_distribution_config: dict = (
+        getattr(current_app.config.foca, "task_distribution", None) or {}
+    )
+    weights: dict = (task_distribution_config.get("scoring") or {}).get(
+        "weights"
+    ) or {}
+    unknown = set(weights) - set(SCORERS)
+    if unknown:
+        raise MiddlewareException(f"Unknown scorers: {sorted(unknown)}")
+    return {name: weight for name, weight in weights.items() if weight > 0}
+
+
+async def get_weighted_costs(
+    tes_urls: list[HttpUrl],
+    task: dict,
+) -> dict[HttpUrl, float]:
+    """Get weighted mean of normalized costs of TES instances for a task.
+
+    Scorers are run concurrently, each in its own thread.
+
+    Args:
+        tes_urls: List of candidate TES URIs.
+        task: Task object, as defined in the TES API specification.
+
+    Returns:
+        Dictionary of TES URIs and their weighted mean normalized costs;
+            `math.inf` for TES instances that cannot run the task.
+    """
+    weights = get_weights()
+    totals: dict[HttpUrl, float] = {url: 0.0 for url in tes_urls}
+    weight_sum = sum(weights.values()) or 1
+    results = await asyncio.gather(
+        *(
+            asyncio.to_thread(
+                SCORERS[name]().get_costs, tes_urls=tes_urls, task=task
+            )
+            for name in weights
+        ),
+        return_exceptions=True,
+    )
+    for (name, weight), costs in zip(weights.items(), results):
+        if isinstance(costs, BaseException):
+            metrics.increment("scorer_failures_total", scorer=name)
+            logger.warning(
+                f"Scorer '{name}' failed and is ignored: "
+                f"{type(costs).__name__}: {costs}"
+            )
+            continue
+        for url, cost in normalize(costs=costs).items():
+            totals[url] += weight * cost / weight_sum
+    return totals
+
+
+def normalize(costs: Costs) -> dict[HttpUrl, float]:
+    """Min-max normalize costs.
+
+    Args:
+        costs: Dictionary of TES URIs and their costs.
+
+    Returns:
+        Dictionary of TES URIs and their costs, scaled to the interval
+            `[0, 1]`; unknown costs are set to `NEUTRAL_COST`, infinite costs
+            are kept.
+    """
+    known = [
+        cost for cost in costs.values() if cost is not None and not isinf(cost)
+    ]
+    low = min(known, default=0.0)
+    spread = max(known, default=0.0) - low
+    normalized: dict[HttpUrl, float] = {}
+    for url, cost in costs.items():
+        if cost is None:
+            normalized[url] = NEUTRAL_COST
+        elif isinf(cost):
+            normalized[url] = cost
+        else:
+            normalized[url] = (cost - low) / spread if spread else 0.0
+    return normalized
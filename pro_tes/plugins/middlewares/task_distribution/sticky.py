@@ -0,0 +1,92 @@
+"""Sticky task distribution middleware."""
+
+import logging
+import random
+from typing import Optional
+
+import flask
+from flask import current_app
+from pydantic import HttpUrl  # pragma pylint: disable=no-name-in-module
+
+from pro_tes.plugins.middlewares.task_distribution.base import (
+    TaskDistributionBaseClass,
+)
+from pro_tes.plugins.middlewares.task_distribution.load import (
+    get_utilization,
+)
+from pro_tes.utils.sticky import StickyRoutes
+
+logger = logging.getLogger(__name__)
+
+# pragma pylint: disable=too-few-public-methods
+
+
+class TaskDistributionSticky(TaskDistributionBaseClass):
+    """Sticky task distribution middleware.
+
+    Keeps tasks sharing a tag value, e.g., tasks of the same workflow, on the
+    TES instance the first of them was sent to, so that intermediate data
+    does not need to be moved between TES instances. The TES instance a task
+    is sent to is remembered per tag value when the task is forwarded; the
+    remembered TES instance is moved to the front of the list of TES
+    instances unless it is no longer available or overloaded, i.e., its
+    utilization (in-flight tasks divided by capacity) is at or above
+    `max_utilization`. Tasks are then sent elsewhere and the new TES instance
+    is remembered.
+
+    If the TES instances were already ranked (and possibly filtered) by a
+    preceding middleware, that ranking is used for all other TES instances;
+    otherwise, they are shuffled. Options are set via config parameter
+    `task_distribution.sticky`.
+    """
+
+    def _set_tes_urls(
+        self,
+        tes_urls: list[HttpUrl],
+        request: flask.Request,
+    ) -> None:
+        """Set TES URIs.
+
+        Args:
+            tes_urls: List of TES URIs.
+            request: Request object to be modified.
+        """
+        assert request.json is not None
+        ranked = self._get_ranked_tes_urls(tes_urls=tes_urls, request=request)
+        if ranked is None:
+            tes_urls = list(set(tes_urls))
+            random.shuffle(tes_urls)
+        else:
+            tes_urls = ranked
+        self.tes_urls = tes_urls
+        pinned = get_sticky_tes(tes_urls=tes_urls, task=request.json)
+        if pinned is not None:
+            self.tes_urls = [pinned] + [
+                url for url in tes_urls if url != pinned
+            ]
+
+
+def get_sticky_tes(tes_urls: list[HttpUrl], task: dict) -> Optional[HttpUrl]:
+    """Get TES instance a task should stick to.
+
+    Args:
+        tes_urls: List of available TES URIs.
+        task: Task object, as defined in the TES API specification.
+
+    Returns:
+        TES URI remembered for the task's tag value, or `None` if there is
+            none or it is unavailable or overloaded.
+    """
+    pinned = StickyRoutes.from_config().recall(tags=task.get("tags"))
+    if pinned is None or pinned not in tes_urls:
+        return None
+    task_distribution_config: dict = (
+        getattr(current_app.config.foca, "task_distribution", None) or {}
+    )
+    max_utilization: float = (
+        task_distribution_config.get("sticky") or {}
+    ).get("max_utilization", 1.0)
+    if get_utilization(tes_urls=[pinned])[pinned] >= max_utilization:
+        logger.info(f"Sticky TES instance '{pinned}' is overloaded.")
+        return None
+    return pinned
@@ -0,0 +1,145 @@
+"""Storage affinity-based task distribution middleware."""
+
+import random
+from typing import Optional
+from urllib.parse import SplitResult, urlsplit
+
+import flask
+from flask import current_app
+from pydantic import HttpUrl  # pragma pylint: disable=no-name-in-module
+
+from pro_tes.plugins.middlewares.task_distribution.base import (
+    TaskDistributionBaseClass,
+)
+from pro_tes.utils.misc import strip_auth
+from pro_tes.utils.service_info import TesServiceInfoCache
+
+# pragma pylint: disable=too-few-public-methods
+
+# affinity levels of a URL to a storage location, from strongest to weakest
+AFFINITY_LEVELS = ("prefix", "location", "scheme")
+
+
+class TaskDistributionStorage(TaskDistributionBaseClass):
+    """Storage affinity-based task distribution middleware.
+
+    Sorts the available TES instances by how well the URLs of the task's
+    inputs and outputs match the storage locations they advertise in the
+    `storage` field of their (cached) service info, so that data is staged
+    from and to storage close to the TES instance, e.g., the same cloud
+    bucket, rather than across clouds.
+
+    For each URL, only the strongest match with any storage location counts:
+    a `prefix` match (the URL lies under the storage location, e.g.,
+    `s3://bucket/data/x.bam` under `s3://bucket/data`), a `location` match
+    (same scheme and host or bucket) or a `scheme` match (e.g., both `s3`).
+    TES instances are ranked by their number of prefix matches, then location
+    matches, then scheme matches, in descending order; ties are broken
+    randomly. Advertised storage locations can be overridden via config
+    parameter `tes.storage`, keyed by TES instance URL.
+    """
+
+    def _set_tes_urls(
+        self,
+        tes_urls: list[HttpUrl],
+        request: flask.Request,
+    ) -> None:
+        """Set TES URIs.
+
+        Args:
+            tes_urls: List of TES URIs.
+            request: Request object to be modified.
+        """
+        assert request.json is not None
+        tes_urls = list(set(tes_urls))
+        storage = get_storage(tes_urls=tes_urls)
+        task_urls = [
+            strip_auth(item["url"])
+            for key in ("inputs", "outputs")
+            for item in request.json.get(key) or []
+            if item.get("url")
+        ]
+        scores = {
+            url: get_affinity(urls=task_urls, storage=storage[url])
+            for url in tes_urls
+        }
+        random.shuffle(tes_urls)
+        self.tes_urls = sorted(
+            tes_urls,
+            key=lambda url: scores[url],
+            reverse=True,
+        )
+
+
+def get_storage(tes_urls: list[HttpUrl]) -> dict[HttpUrl, list[str]]:
+    """Get storage locations of TES instances.
+
+    Args:
+        tes_urls: List of TES URIs.
+
+    Returns:
+        Dictionary of TES URIs and their storage locations.
+    """
+    configured: dict = current_app.config.foca.tes.get("storage") or {}
+    service_infos = TesServiceInfoCache().get(tes_urls=tes_urls)
+    storage: dict[HttpUrl, list[str]] = {}
+    for url in tes_urls:
+        if url in configured:
+            storage[url] = configured[url] or []
+            continue
+        advertised = service_infos.get(url, {}).get("storage")
+        storage[url] = (
+            [item for item in advertised if isinstance(item, str)]
+            if isinstance(advertised, list)
+            else []
+        )
+    return storage
+
+
+def get_affinity(urls: list[str], storage: list[str]) -> tuple[int, ...]:
+    """Count matches of URLs with storage locations per affinity level.
+
+    Args:
+        urls: Input and output URLs of a task.
+        storage: Storage locations of a TES instance.
+
+    Returns:
+        Number of URLs whose strongest match is a prefix, location and scheme
+            match, respectively.
+    """
+    counts = [0] * len(AFFINITY_LEVELS)
+    locations = [urlsplit(location) for location in storage]
+    for url in urls:
+        parts = urlsplit(url)
+        levels = [
+            _get_affinity_level(url=parts, location=location)
+            for location in locations
+        ]
+        levels = [level for level in levels if level is not None]
+        if levels:
+            counts[min(levels)] += 1
+    return tuple(counts)
+
+
+def _get_affinity_level(
+    url: SplitResult,
+    location: SplitResult,
+) -> Optional[int]:
+    """Get affinity level of a URL to a storage location.
+
+    Args:
+        url: URL, split into its components.
+        location: Storage location, split into its components.
+
+    Returns:
+        Index of the affinity level in `AFFINITY_LEVELS`, or `None` if the
+            URL does not match the storage location at all.
+    """
+    if url.scheme.lower() != location.scheme.lower():
+        return None
+    if url.hostname != location.hostname:
+        return 2
+    prefix = location.path.rstrip("/")
+    if url.path == prefix or url.path.startswith(f"{prefix}/"):
+        return 0
+    return 1
@@ -0,0 +1,50 @@
+"""Power-of-two-choices task distribution middleware."""
+
+import random
+
+import flask
+from pydantic import HttpUrl  # pragma pylint: disable=no-name-in-module
+
+from pro_tes.plugins.middlewares.task_distribution.base import (
+    TaskDistributionBaseClass,
+)
+from pro_tes.plugins.middlewares.task_distribution.load import (
+    get_utilization,
+)
+
+# pragma pylint: disable=too-few-public-methods
+
+
+class TaskDistributionPowerOfTwoChoices(TaskDistributionBaseClass):
+    """Power-of-two-choices task distribution middleware.
+
+    Samples two TES instances at random and selects the one with the lower
+    utilization, i.e., the number of tasks currently in flight divided by its
+    capacity (cf. `TaskDistributionLoad`). Compared to ranking all TES
+    instances by utilization, only the in-flight counters of the two sampled
+    instances are read, and because concurrent requests sample different
+    pairs, they do not all pile onto the same least-loaded instance before
+    counters catch up. In-flight counters are shared across workers.
+
+    The selected TES instance is followed by the other sampled one and then
+    by the remaining ones in random order, as fallbacks.
+    """
+
+    def _set_tes_urls(
+        self,
+        tes_urls: list[HttpUrl],
+        request: flask.Request,
+    ) -> None:
+        """Set TES URIs.
+
+        Args:
+            tes_urls: List of TES URIs.
+            request: Request object to be modified.
+        """
+        tes_urls = list(set(tes_urls))
+        random.shuffle(tes_urls)
+        choices = tes_urls[:2]
+        if len(choices) == 2:
+            utilization = get_utilization(tes_urls=choices)
+            choices.sort(key=lambda url: utilization[url])
+        self.tes_urls = choices + tes_urls[2:]
@@ -0,0 +1,21 @@
+"""Background services entry point.
+
+Runs one-off startup work and the background jobs refreshing TES instance
+information and archiving finished tasks. Must be started as a single,
+dedicated process, separately from the API server and Celery workers.
+"""
+
+from threading import Event
+
+from pro_tes.app import init_app, init_services
+
+
+def run_services() -> None:
+    """Run startup work and background jobs until the process is stopped."""
+    app = init_app()
+    init_services(app)
+    Event().wait()
+
+
+if __name__ == "__main__":
+    run_services()
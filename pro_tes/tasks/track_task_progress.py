@@ -1,19 +1,26 @@
 """Celery background task to process task asynchronously."""
 
+from datetime import datetime
 import logging
-from time import sleep
+from time import monotonic, sleep
+from typing import Optional
 
 from foca.database.register_mongodb import _create_mongo_client  # type: ignore
 from foca.models.config import Config  # type: ignore
 from flask import Flask
 from flask import current_app
-import tes  # type: ignore
+from pymongo.collection import Collection  # type: ignore
 
 from pro_tes.ga4gh.tes.models import TesState, TesTask
+from pro_tes.utils.blobs import TaskBlobStore
 from pro_tes.utils.db import DbDocumentConnector
+from pro_tes.utils.history import TesHistory, get_task_signature
+from pro_tes.utils.latency import TesLatency, create_tes_client
+from pro_tes.utils.load import TesLoad
 from pro_tes.ga4gh.tes.states import States
 from pro_tes.celery_worker import celery
 from pro_tes.utils.models import TaskModelConverter
+from pro_tes.utils.timestamps import now, to_datetime
 
 logger = logging.getLogger(__name__)
 
@@ -34,6 +41,7 @@ def task__track_task_progress(  # pylint: disable=too-many-arguments
     remote_task_id: str,
     user: str,
     password: str,
+    time_submitted: Optional[str] = None,
 ) -> None:
     """Relay task run request to remote TES and track run progress.
 
@@ -49,6 +57,9 @@ def task__track_task_progress(  # pylint: disable=too-many-arguments
         remote_task_id: task run identifier on remote TES service.
         user: User-name for basic authentication.
         password: Password for basic authentication.
+        time_submitted: Time at which the task was submitted to the remote TES
+            instance, in ISO 8601 format; queue times are measured from this
+            time, or from the start of tracking if not provided.
     """
     foca_config: Config = current_app.config.foca
     controller_config: dict = foca_config.controllers["post_task"]
@@ -69,18 +80,27 @@ def task__track_task_progress(  # pylint: disable=too-many-arguments
     db_client.update_task_state(state=TesState.INITIALIZING.value)
 
     url = f"{remote_host.strip('/')}/{remote_base_path.strip('/')}"
+    history = TesHistory(collection=collection.database["tes_history"])
+    submitted: datetime = to_datetime(time_submitted) or now()
+    time_running: Optional[float] = None
 
     # fetch task log and upsert database document
     try:
-        cli = tes.HTTPClient(
-            url,
-            timeout=5,
+        cli = create_tes_client(
+            url=url,
+            host=remote_host,
+            latency=TesLatency(
+                collection=collection.database["tes_latencies"],
+                window=foca_config.tes.get("latency_window", 100),
+            ),
             user=user,
             password=password,
         )
         response = cli.get_task(task_id=remote_task_id)
     except Exception:
-        db_client.update_task_state(state=TesState.SYSTEM_ERROR.value)
+        db_client.update_task_state(
+            state=TesState.SYSTEM_ERROR.value, finalized=True
+        )
         raise
 
     # track task progress
@@ -97,22 +117,83 @@ def task__track_task_progress(  # pylint: disable=too-many-arguments
                 attempt += 1
                 logger.warning(exc, exc_info=True)
                 continue
-            db_client.update_task_state(state=TesState.SYSTEM_ERROR.value)
+            db_client.update_task_state(
+                state=TesState.SYSTEM_ERROR.value, finalized=True
+            )
             raise
         if response.state != task_state:
             task_state = response.state
-            db_client.update_task_state(state=str(task_state))
+            # finished state is set along with final task logs
+            if task_state not in States.FINISHED:
+                db_client.update_task_state(state=str(task_state))
+            if task_state == TesState.RUNNING.value and time_running is None:
+                time_running = monotonic()
+                history.record_queue_time(
+                    host=remote_host,
+                    seconds=max((now() - submitted).total_seconds(), 0),
+                )
 
     task_model_converter = TaskModelConverter(task=response)
-    task_converted: TesTask = task_model_converter.convert_task()
+    _finalize_task(
+        collection=collection,
+        db_client=db_client,
+        task=task_model_converter.convert_task(),
+        remote_host=remote_host,
+        runtime=(
+            monotonic() - time_running
+            if task_state == TesState.COMPLETE.value
+            and time_running is not None
+            else None
+        ),
+    )
+    logger.info(f"[{worker_id}] {task_state}")
+
+
+def _finalize_task(
+    collection: Collection,
+    db_client: DbDocumentConnector,
+    task: TesTask,
+    remote_host: str,
+    runtime: Optional[float],
+) -> None:
+    """Store final state and logs of a finished task.
 
+    Args:
+        collection: Database collection storing tasks.
+        db_client: Database connector for the task document.
+        task: Finished task, as returned by the remote TES instance.
+        remote_host: Host at which the remote TES API is served.
+        runtime: Runtime of a successful task observed running, in seconds;
+            `None` if not available.
+    """
+    foca_config: Config = current_app.config.foca
     document = db_client.get_document()
 
+    # record runtime of successful tasks observed running
+    if runtime is not None:
+        history = TesHistory(collection=collection.database["tes_history"])
+        history.record_runtime(
+            host=remote_host,
+            seconds=runtime,
+            signature=get_task_signature(task=document.task_original.dict()),
+        )
+
     # updating task after task is finished
-    document.task.state = task_converted.state
-    for index, logs in enumerate(task_converted.logs):
+    document.task.state = task.state
+    for index, logs in enumerate(task.logs):
         document.task.logs[index].logs = logs.logs
         document.task.logs[index].outputs = logs.outputs
 
-    # updating the database
-    db_client.upsert_fields_in_root_object(root="task", **document.task.dict())
+    # updating the database; large fields are stored as blobs
+    blob_store = TaskBlobStore(
+        collection=collection.database["task_blobs"],
+        **(foca_config.storeLogs.get("offload") or {}),
+    )
+    replaced = blob_store.offload(document=document)
+    if document.blobs:
+        db_client.set_blob_references(blobs=document.blobs)
+    db_client.upsert_fields_in_root_object(
+        root="task", finalized=True, **document.task.dict()
+    )
+    blob_store.delete(blob_ids=replaced)
+    TesLoad(collection=collection).release(worker_id=db_client.worker_id)
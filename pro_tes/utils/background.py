@@ -0,0 +1,111 @@
+"""Utilities for running jobs periodically in the background."""
+
+import logging
+from threading import Event, Thread
+from typing import Any, Callable, Optional
+
+from flask import Flask
+
+logger = logging.getLogger(__name__)
+
+
+class PeriodicJob(Thread):
+    """Daemon thread calling a function periodically within app context.
+
+    Args:
+        app: Flask application instance.
+        func: Function to call; exceptions are logged and do not stop the
+            job.
+        interval: Interval between calls, in seconds; if `None`, the
+            function is only called once, which requires `run_immediately`.
+        name: Name of the job.
+        run_immediately: Whether to call the function when the job is
+            started rather than only after the first interval.
+
+    Attributes:
+        app: Flask application instance.
+        func: Function to call.
+        interval: Interval between calls, in seconds.
+        run_immediately: Whether to call the function when the job is
+            started.
+        stopped: Event signaling that the job should be stopped.
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        app: Flask,
+        func: Callable[[], Any],
+        interval: Optional[float],
+        name: str,
+        run_immediately: bool = False,
+    ) -> None:
+        """Construct object instance."""
+        super().__init__(name=name, daemon=True)
+        self.app: Flask = app
+        self.func: Callable[[], Any] = func
+        self.interval: Optional[float] = interval
+        self.run_immediately: bool = run_immediately
+        self.stopped: Event = Event()
+
+    def run(self) -> None:
+        """Call function every `interval` seconds until stopped."""
+        if self.run_immediately:
+            self._call()
+        if self.interval is None:
+            return
+        while not self.stopped.wait(timeout=self.interval):
+            self._call()
+
+    def _call(self) -> None:
+        """Call function within app context, logging any exceptions."""
+        try:
+            with self.app.app_context():
+                self.func()
+        except Exception as exc:  # pylint: disable=broad-except
+            logger.warning(
+                f"Background job '{self.name}' failed: "
+                f"{type(exc).__name__}: {exc}"
+            )
+
+    def stop(self) -> None:
+        """Stop job after the current call, if any, has finished."""
+        self.stopped.set()
+
+
+def start_periodic_job(
+    app: Flask,
+    func: Callable[[], Any],
+    interval: Optional[float],
+    name: str,
+    run_immediately: bool = False,
+) -> Optional[PeriodicJob]:
+    """Start periodic background job, unless disabled.
+
+    Args:
+        app: Flask application instance.
+        func: Function to call.
+        interval: Interval between calls, in seconds; if `None` or not
+            positive, the function is only called once if `run_immediately`
+            is set, otherwise no job is started.
+        name: Name of the job.
+        run_immediately: Whether to call the function when the job is
+            started rather than only after the first interval.
+
+    Returns:
+        Started background job, or `None` if job is disabled.
+    """
+    if not interval or interval <= 0:
+        if not run_immediately:
+            logger.info(f"Background job '{name}' disabled.")
+            return None
+        interval = None
+    job = PeriodicJob(
+        app=app,
+        func=func,
+        interval=interval,
+        name=name,
+        run_immediately=run_immediately,
+    )
+    job.start()
+    logger.info(f"Background job '{name}' started; interval: {interval}s")
+    return job
@@ -0,0 +1,239 @@
+"""Storage of large task fields outside of task documents."""
+
+import logging
+from typing import Any, Iterator, Optional, Union
+from uuid import uuid4
+
+from pydantic import BaseModel  # pragma pylint: disable=no-name-in-module
+from pymongo.collection import Collection  # type: ignore
+
+from pro_tes.ga4gh.tes.models import BlobReference, DbDocument, TesTask
+from pro_tes.utils.compression import LogCompressor
+from pro_tes.utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# task document fields whose large values are stored as blobs
+TASK_ROOTS = ("task", "task_original")
+
+
+class TaskBlobStore:
+    """Store for large task fields, kept outside of task documents.
+
+    Inline input contents, system logs and executor stdout/stderr can be
+    large. If larger than `min_size`, they are moved to a separate collection
+    and replaced by `None` in the task document, which instead references the
+    blobs by path. Task documents are thus kept small, and blobs are only
+    loaded when tasks are requested in `FULL` view. Blobs are optionally
+    compressed.
+
+    Args:
+        collection: Database collection storing blobs.
+        min_size: Minimum size, in bytes, of field values to store as blobs;
+            set to `None` to keep all values in task documents.
+        compression: Keyword arguments for `LogCompressor`; set to `None` to
+            store blobs uncompressed.
+
+    Attributes:
+        collection: Database collection storing blobs.
+        min_size: Minimum size, in bytes, of field values to store as blobs.
+        compressor: Compressor of blobs, if blobs are compressed.
+    """
+
+    def __init__(
+        self,
+        collection: Collection,
+        min_size: Optional[int] = None,
+        compression: Optional[dict] = None,
+    ) -> None:
+        """Construct object instance."""
+        self.collection: Collection = collection
+        self.min_size: Optional[int] = min_size
+        self.compressor: Optional[LogCompressor] = (
+            None if compression is None else LogCompressor(**compression)
+        )
+
+    def offload(self, document: DbDocument) -> list[str]:
+        """Move large field values of task document to blobs.
+
+        The task document is modified in place and needs to be written to
+        the database by the caller. Blobs that are no longer referenced are
+        not deleted right away, so that they remain available until the task
+        document is updated; cf. `delete()`.
+
+        Args:
+            document: Task document.
+
+        Returns:
+            Identifiers of blobs that are no longer referenced.
+        """
+        if self.min_size is None:
+            return []
+        references: dict[str, BlobReference] = {
+            reference.path: reference for reference in document.blobs
+        }
+        blobs: list[dict] = []
+        replaced: list[str] = []
+        for path, obj, attr in _get_fields(document=document):
+            value = getattr(obj, attr)
+            if value is None or _get_size(value) < self.min_size:
+                continue
+            reference = BlobReference(path=path, id=uuid4().hex)
+            blobs.append(self._create_blob(blob_id=reference.id, value=value))
+            if path in references:
+                replaced.append(references[path].id)
+            references[path] = reference
+            setattr(obj, attr, None)
+        if blobs:
+            self.collection.insert_many(blobs)
+            document.blobs = list(references.values())
+        return replaced
+
+    def load(self, documents: list[dict], root: str = "task") -> None:
+        """Restore field values of task documents from blobs.
+
+        Blobs of all documents are fetched with a single query.
+
+        Args:
+            documents: Task documents, as stored in the database; modified in
+                place, removing blob references.
+            root: Document field to restore field values of.
+        """
+        references: list[tuple[dict, BlobReference]] = [
+            (document, BlobReference(**reference))
+            for document in documents
+            for reference in document.pop("blobs", None) or []
+            if reference["path"].startswith(f"{root}.")
+        ]
+        if not references:
+            return
+        data: dict[str, Any] = {}
+        for blob in self.collection.find(
+            {"_id": {"$in": [ref.id for _, ref in references]}}
+        ):
+            try:
+                data[blob["_id"]] = self._read_blob(blob=blob)
+            except ValueError as exc:
+                logger.warning(f"Blob '{blob['_id']}' not readable: {exc}")
+        for document, reference in references:
+            if reference.id not in data:
+                logger.warning(
+                    f"Blob '{reference.id}' referenced at path"
+                    f" '{reference.path}' not available."
+                )
+                continue
+            _set_path(
+                obj=document,
+                path=reference.path,
+                value=data[reference.id],
+            )
+
+    def _create_blob(self, blob_id: str, value: Any) -> dict:
+        """Create blob, compressing the field value if configured.
+
+        Args:
+            blob_id: Blob identifier.
+            value: Field value.
+
+        Returns:
+            Blob, as stored in the database.
+        """
+        if self.compressor is None:
+            return {"_id": blob_id, "data": value}
+        data, codec = self.compressor.compress(value)
+        if codec is None:
+            return {"_id": blob_id, "data": data}
+        metrics.increment("blob_compressed_bytes_total", value=len(data))
+        metrics.increment(
+            "blob_uncompressed_bytes_total",
+            value=_get_size(value),
+        )
+        return {"_id": blob_id, "data": data, "codec": codec}
+
+    def _read_blob(self, blob: dict) -> Any:
+        """Read field value from blob, decompressing it if compressed.
+
+        Args:
+            blob: Blob, as stored in the database.
+
+        Returns:
+            Field value.
+
+        Raises:
+            ValueError: If the blob cannot be decompressed.
+        """
+        codec: Optional[str] = blob.get("codec")
+        if codec is None:
+            return blob["data"]
+        compressor = self.compressor or LogCompressor(codec=codec)
+        return compressor.decompress(data=blob["data"], codec=codec)
+
+    def delete(self, blob_ids: list[str]) -> None:
+        """Delete blobs.
+
+        Args:
+            blob_ids: Blob identifiers.
+        """
+        if blob_ids:
+            self.collection.delete_many({"_id": {"$in": blob_ids}})
+
+
+def _get_fields(
+    document: DbDocument,
+) -> Iterator[tuple[str, BaseModel, str]]:
+    """Get fields of a task document that may hold large values.
+
+    Args:
+        document: Task document.
+
+    Yields:
+        Path of the field within the document, model instance holding the
+            field and name of the field.
+    """
+    for root in TASK_ROOTS:
+        task: TesTask = getattr(document, root)
+        for i, _input in enumerate(task.inputs or []):
+            yield f"{root}.inputs.{i}.content", _input, "content"
+        for i, log in enumerate(task.logs or []):
+            yield f"{root}.logs.{i}.system_logs", log, "system_logs"
+            for j, executor_log in enumerate(log.logs or []):
+                for attr in ("stdout", "stderr"):
+                    path = f"{root}.logs.{i}.logs.{j}.{attr}"
+                    yield path, executor_log, attr
+
+
+def _get_size(value: Union[str, list[str]]) -> int:
+    """Get size of a field value.
+
+    Args:
+        value: Field value.
+
+    Returns:
+        Size of the value, in bytes.
+    """
+    if isinstance(value, str):
+        return len(value.encode())
+    return sum(len(item.encode()) for item in value)
+
+
+def _set_path(obj: Any, path: str, value: Any) -> None:
+    """Set value at a path of nested objects and lists, if the path exists.
+
+    Args:
+        obj: Nested objects and lists.
+        path: Dot-separated path; list elements are referenced by index.
+        value: Value to set.
+    """
+    *parents, key = path.split(".")
+    for part in parents:
+        if isinstance(obj, list):
+            index = int(part)
+            if index >= len(obj):
+                return
+            obj = obj[index]
+        elif isinstance(obj, dict) and part in obj:
+            obj = obj[part]
+        else:
+            return
+    if isinstance(obj, dict):
+        obj[key] = value
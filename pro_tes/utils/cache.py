@@ -0,0 +1,139 @@
+"""In-process caches."""
+
+from collections import OrderedDict
+from threading import Lock
+from time import monotonic
+from typing import Any, Hashable, Optional
+
+from pro_tes.utils.metrics import metrics
+
+
+class LruCache:
+    """Thread-safe LRU cache with expiry.
+
+    Entries can be tagged with an epoch; the cache is cleared as soon as a
+    different epoch is observed. Hits and misses are counted via metrics
+    `<name>_cache_hits` and `<name>_cache_misses`.
+
+    Args:
+        name: Name of the cache, used in metric names.
+        max_entries: Maximum number of entries; least recently used entries
+            are evicted first. Set to `0` to disable caching.
+        ttl: Time to live of entries, in seconds.
+
+    Attributes:
+        name: Name of the cache.
+        max_entries: Maximum number of entries.
+        ttl: Time to live of entries, in seconds.
+        epoch: Epoch of the cached entries.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_entries: int = 1024,
+        ttl: float = 300,
+    ) -> None:
+        """Construct object instance."""
+        self.name: str = name
+        self.max_entries: int = max_entries
+        self.ttl: float = ttl
+        self.epoch: Optional[int] = None
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock: Lock = Lock()
+
+    def configure(self, max_entries: int = 1024, ttl: float = 300) -> None:
+        """Set cache limits and remove all entries.
+
+        Args:
+            max_entries: Maximum number of entries; set to `0` to disable
+                caching.
+            ttl: Time to live of entries, in seconds.
+        """
+        with self._lock:
+            self.max_entries = max_entries
+            self.ttl = ttl
+            self._entries.clear()
+
+    def get(self, key: Hashable, epoch: Optional[int] = None) -> Optional[Any]:
+        """Get cached value.
+
+        Args:
+            key: Cache key.
+            epoch: Current epoch.
+
+        Returns:
+            Cached value, or `None` if there is no unexpired entry.
+        """
+        with self._lock:
+            self._set_epoch(epoch=epoch)
+            entry = self._entries.get(key)
+            if entry is None or monotonic() - entry[0] > self.ttl:
+                self._entries.pop(key, None)
+                metrics.increment(f"{self.name}_cache_misses_total")
+                return None
+            self._entries.move_to_end(key)
+            metrics.increment(f"{self.name}_cache_hits_total")
+            return entry[1]
+
+    def set(
+        self,
+        key: Hashable,
+        value: Any,
+        epoch: Optional[int] = None,
+    ) -> None:
+        """Cache value.
+
+        Args:
+            key: Cache key.
+            value: Value to cache.
+            epoch: Epoch the value was computed in.
+        """
+        with self._lock:
+            self._set_epoch(epoch=epoch)
+            if self.max_entries <= 0:
+                return
+            self._entries[key] = (monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def pop(self, key: Hashable) -> None:
+        """Remove entry, if present.
+
+        Args:
+            key: Cache key.
+        """
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        with self._lock:
+            self._entries.clear()
+            self.epoch = None
+
+    def _set_epoch(self, epoch: Optional[int]) -> None:
+        """Remove all entries if epoch changed.
+
+        Must be called while holding the lock.
+
+        Args:
+            epoch: Current epoch.
+        """
+        if epoch != self.epoch:
+            self._entries.clear()
+            self.epoch = epoch
+
+    def __len__(self) -> int:
+        """Get number of entries."""
+        with self._lock:
+            return len(self._entries)
+
+
+# in-process cache of tasks whose final state and logs are stored, keyed by
+# task identifier and view; tasks in `FULL` view are not cached, only their
+# versions
+finished_task_cache = LruCache(
+    name="finished_task", max_entries=4096, ttl=3600
+)
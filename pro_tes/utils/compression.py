@@ -0,0 +1,151 @@
+"""Compression of log payloads."""
+
+from functools import lru_cache
+import json
+from pathlib import Path
+from typing import Any, Optional
+import zlib
+
+import zstandard  # type: ignore
+
+# errors raised when decompressing invalid payloads
+DECOMPRESSION_ERRORS: tuple[type[Exception], ...] = (
+    zlib.error,
+    zstandard.ZstdError,
+)
+
+# supported compression codecs
+CODECS = ("zstd", "zlib")
+
+
+class LogCompressor:
+    """Compress and decompress log payloads.
+
+    Payloads, i.e., strings or lists of strings, are serialized as JSON and
+    compressed with Zstandard, optionally using a pre-trained dictionary, or
+    with zlib. Either codec can decompress payloads compressed with the
+    other.
+
+    Args:
+        codec: Compression codec; one of `CODECS`.
+        level: Compression level.
+        min_size: Minimum size, in bytes, of payloads to compress.
+        dictionary: Path to a Zstandard dictionary, e.g., as trained with
+            `train_dictionary()`. Payloads compressed with a dictionary can
+            only be decompressed with the same dictionary.
+
+    Attributes:
+        codec: Compression codec.
+        level: Compression level.
+        min_size: Minimum size, in bytes, of payloads to compress.
+
+    Raises:
+        ValueError: If the codec is not supported, or if a dictionary is set
+            but the codec is not `zstd`.
+    """
+
+    def __init__(
+        self,
+        codec: str = "zstd",
+        level: int = 3,
+        min_size: int = 0,
+        dictionary: Optional[str] = None,
+    ) -> None:
+        """Construct object instance."""
+        if codec not in CODECS:
+            raise ValueError(
+                f"Unsupported compression codec '{codec}'; use one of:"
+                f" {', '.join(CODECS)}."
+            )
+        if dictionary is not None and codec != "zstd":
+            raise ValueError("Compression dictionaries require codec 'zstd'.")
+        self.codec: str = codec
+        self.level: int = level
+        self.min_size: int = min_size
+        self._dictionary: Optional[Any] = (
+            None if dictionary is None else _load_dictionary(path=dictionary)
+        )
+
+    def compress(self, value: Any) -> tuple[Any, Optional[str]]:
+        """Compress payload.
+
+        Args:
+            value: Payload.
+
+        Returns:
+            Compressed payload and codec used or, if the payload is smaller
+                than `min_size` or does not shrink, the unchanged payload and
+                `None`.
+        """
+        data = json.dumps(value).encode()
+        if len(data) < self.min_size:
+            return value, None
+        if self.codec == "zstd":
+            compressed = zstandard.ZstdCompressor(
+                level=self.level,
+                dict_data=self._dictionary,
+            ).compress(data)
+        else:
+            compressed = zlib.compress(data, self.level)
+        if len(compressed) >= len(data):
+            return value, None
+        return compressed, self.codec
+
+    def decompress(self, data: Any, codec: Optional[str]) -> Any:
+        """Decompress payload.
+
+        Args:
+            data: Compressed payload.
+            codec: Codec the payload was compressed with, or `None` if it is
+                not compressed.
+
+        Returns:
+            Payload.
+
+        Raises:
+            ValueError: If the payload cannot be decompressed.
+        """
+        if codec is None:
+            return data
+        try:
+            if codec == "zstd":
+                decompressed = zstandard.ZstdDecompressor(
+                    dict_data=self._dictionary
+                ).decompress(data)
+            elif codec == "zlib":
+                decompressed = zlib.decompress(data)
+            else:
+                raise ValueError(f"Unsupported compression codec '{codec}'.")
+        except DECOMPRESSION_ERRORS as exc:
+            raise ValueError(
+                f"Payload could not be decompressed: {exc}"
+            ) from exc
+        return json.loads(decompressed)
+
+
+@lru_cache(maxsize=None)
+def _load_dictionary(path: str) -> Any:
+    """Load Zstandard dictionary; dictionaries are loaded once per process.
+
+    Args:
+        path: Path to the dictionary.
+
+    Returns:
+        Zstandard dictionary.
+    """
+    return zstandard.ZstdCompressionDict(Path(path).read_bytes())
+
+
+def train_dictionary(samples: list[Any], size: int = 112640) -> bytes:
+    """Train Zstandard dictionary on sample payloads.
+
+    Args:
+        samples: Sample payloads, e.g., executor logs of past tasks.
+        size: Maximum size of the dictionary, in bytes.
+
+    Returns:
+        Dictionary, to be saved to a file and passed to `LogCompressor`.
+    """
+    return zstandard.train_dictionary(
+        size, [json.dumps(sample).encode() for sample in samples]
+    ).as_bytes()
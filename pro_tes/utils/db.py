@@ -5,7 +5,9 @@ from typing import Mapping, Optional
 from pymongo.collection import ReturnDocument  # type: ignore
 from pymongo import collection as Collection  # type: ignore
 
-from pro_tes.ga4gh.tes.models import DbDocument, TesState
+from pro_tes.ga4gh.tes.models import BlobReference, DbDocument, TesState
+from pro_tes.ga4gh.tes.states import States
+from pro_tes.utils.load import TesLoad
 
 logger = logging.getLogger(__name__)
 
@@ -67,11 +69,16 @@ class DbDocumentConnector:
     def update_task_state(
         self,
         state: str = "UNKNOWN",
+        finalized: bool = False,
     ) -> None:
         """Update task status.
 
+        If the new status is terminal, the task is no longer counted as in
+        flight at its TES instance.
+
         Args:
             state: New task status; one of `pro_wes.ga4gh.wes.models.State`.
+            finalized: Whether the task document is not updated anymore.
 
         Raises:
             ValueError: Invalid state passed.
@@ -82,14 +89,36 @@ class DbDocumentConnector:
             raise ValueError(f"Unknown state: {state}") from exc
         self.collection.find_one_and_update(
             {"worker_id": self.worker_id},
-            {"$set": {"task.state": state}},
+            {
+                "$set": {"task.state": state, "finalized": finalized},
+                "$inc": {"version": 1},
+            },
         )
         logger.info(f"[{self.worker_id}] {state}")
+        if state in States.FINISHED:
+            TesLoad(collection=self.collection).release(
+                worker_id=self.worker_id
+            )
+
+    def set_blob_references(self, blobs: list[BlobReference]) -> None:
+        """Set references to field values stored as blobs.
+
+        Args:
+            blobs: References to field values stored outside of the document.
+        """
+        self.collection.find_one_and_update(
+            {"worker_id": self.worker_id},
+            {
+                "$set": {"blobs": [blob.dict() for blob in blobs]},
+                "$inc": {"version": 1},
+            },
+        )
 
     def upsert_fields_in_root_object(
         self,
         root: str,
         projection: Optional[Mapping] = None,
+        finalized: bool = False,
         **kwargs: object,
     ) -> DbDocument:
         """Insert or update fields in(to) the same root (object) field.
@@ -99,6 +128,7 @@ class DbDocumentConnector:
             projection: A projection object indicating which fields of the
                 document to return. By default, all fields except the MongoDB
                 identifier `_id` are returned.
+            finalized: Whether the task document is not updated anymore.
             **kwargs: Key-value pairs of fields to insert/update.
 
         Returns:
@@ -110,9 +140,13 @@ class DbDocumentConnector:
             {"worker_id": self.worker_id},
             {
                 "$set": {
-                    ".".join([root, key]): value
-                    for (key, value) in kwargs.items()
-                }
+                    **{
+                        ".".join([root, key]): value
+                        for (key, value) in kwargs.items()
+                    },
+                    "finalized": finalized,
+                },
+                "$inc": {"version": 1},
             },
             projection=projection,
             return_document=ReturnDocument.AFTER,
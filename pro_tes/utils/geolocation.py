@@ -0,0 +1,78 @@
+"""Utilities for IP address resolution and geolocation."""
+
+from socket import gaierror, gethostbyname
+from typing import Optional
+from urllib.parse import urlparse
+
+from ip2geotools.errors import LocationError  # type: ignore
+from ip2geotools.databases.noncommercial import DbIpCity  # type: ignore
+from ip2geotools.models import IpLocation  # type: ignore
+
+from pro_tes.utils.misc import strip_auth
+
+
+def get_ips(*args: str) -> dict[str, str]:
+    """Get IP addresses for one or more URIs.
+
+    Args:
+        *args: URIs.
+
+    Returns:
+        Dictionary of URIs and their IP addresses.
+
+    Raises:
+        ValueError: If IP address cannot be determined for a URI.
+    """
+    ips: dict[str, str] = {}
+    for uri in args:
+        try:
+            ips[uri] = gethostbyname(urlparse(strip_auth(uri)).netloc)
+        except gaierror as exc:
+            raise ValueError(
+                f"Could not determine IP address for URI: {uri}"
+            ) from exc
+    return ips
+
+
+def get_ip_locations(*args: str) -> dict[str, IpLocation]:
+    """Get locations of IP addresses.
+
+    Args:
+        *args: IP addresses.
+
+    Returns:
+        Dictionary of unique IP addresses and their locations.
+
+    Raises:
+        ValueError: If location cannot be determined for an IP.
+    """
+    locations: dict[str, IpLocation] = {}
+    for ip_addr in set(args):
+        try:
+            locations[ip_addr] = DbIpCity.get(ip_addr)
+        except LocationError as exc:
+            raise ValueError(
+                f"Could not determine location for IP: {ip_addr}"
+            ) from exc
+    return locations
+
+
+def create_ip_location(
+    latitude: float,
+    longitude: float,
+    ip_addr: Optional[str] = None,
+) -> IpLocation:
+    """Create IP location from coordinates.
+
+    Args:
+        latitude: Latitude, in degrees.
+        longitude: Longitude, in degrees.
+        ip_addr: IP address, if known.
+
+    Returns:
+        IP location.
+    """
+    location = IpLocation(ip_address=ip_addr)
+    location.latitude = latitude
+    location.longitude = longitude
+    return location
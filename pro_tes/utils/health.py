@@ -0,0 +1,234 @@
+"""Shared table of TES instance health."""
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+import logging
+from time import perf_counter
+from typing import Optional
+
+from flask import current_app
+from pydantic import BaseModel  # pragma pylint: disable=no-name-in-module
+from pymongo.collection import Collection  # type: ignore
+from pymongo.errors import PyMongoError  # type: ignore
+import requests
+
+from pro_tes.utils.latency import TesLatency
+from pro_tes.utils.routing_cache import bump_routing_epoch
+from pro_tes.utils.service_info import SERVICE_INFO_PATH, TesServiceInfoCache
+
+logger = logging.getLogger(__name__)
+
+# pragma pylint: disable=too-few-public-methods
+
+# path of the list tasks endpoint, relative to the TES instance URL
+LIST_TASKS_PATH = "ga4gh/tes/v1/tasks"
+
+
+class ProbeResult(BaseModel):
+    """Result of probing a TES instance.
+
+    Attributes:
+        healthy: Whether all probes succeeded.
+        service_info: Service info, if it could be fetched.
+        latencies: Latencies of the probes that completed, in seconds, keyed
+            by operation.
+        error: Error message of the first failed probe, if any.
+    """
+
+    healthy: bool = True
+    service_info: Optional[dict] = None
+    latencies: dict[str, float] = {}
+    error: Optional[str] = None
+
+
+class TesHealth:
+    """Manage the health of the configured TES instances.
+
+    TES instances are probed periodically in the background by fetching their
+    service info and listing a single task. A TES instance is considered
+    unhealthy after `failure_threshold` consecutive failed probes, until a
+    probe succeeds again. TES instances that were never probed or whose last
+    probe is older than `max_age` seconds are considered healthy. Probing
+    also updates the cached service info and records latencies. Options are
+    set via config parameter `tes.health`.
+
+    Attributes:
+        db_client: Database collection storing TES instance health.
+        config: Health check options.
+    """
+
+    def __init__(self) -> None:
+        """Construct class instance."""
+        self.db_client: Collection = (
+            current_app.config.foca.db.dbs["taskStore"]
+            .collections["tes_health"]
+            .client
+        )
+        self.config: dict = current_app.config.foca.tes.get("health") or {}
+
+    def probe(self) -> None:
+        """Probe all configured TES instances concurrently and record results.
+
+        Entries of TES instances that are no longer configured are removed.
+        If the set of unhealthy TES instances changes, the routing epoch is
+        advanced, invalidating cached routing decisions.
+        """
+        tes_urls: list[str] = list(
+            set(current_app.config.foca.tes["service_list"])
+        )
+        unhealthy_before = self.get_unhealthy(tes_urls=tes_urls)
+        timeout: float = self.config.get("timeout", 5)
+        with ThreadPoolExecutor(
+            max_workers=self.config.get("max_workers", 8)
+        ) as executor:
+            results = dict(
+                zip(
+                    tes_urls,
+                    executor.map(
+                        lambda url: probe_tes(url=url, timeout=timeout),
+                        tes_urls,
+                    ),
+                )
+            )
+        service_info_cache = TesServiceInfoCache()
+        latency = TesLatency(
+            collection=self.db_client.database["tes_latencies"],
+            window=current_app.config.foca.tes.get("latency_window", 100),
+        )
+        for url, result in results.items():
+            self._set_result(url=url, result=result)
+            if result.service_info is not None:
+                service_info_cache.set(
+                    url=url, service_info=result.service_info
+                )
+            for operation, seconds in result.latencies.items():
+                latency.record(
+                    host=url,
+                    operation=operation,
+                    seconds=seconds,
+                    success=result.healthy,
+                )
+        self.db_client.delete_many({"url": {"$nin": tes_urls}})
+        unhealthy = self.get_unhealthy(tes_urls=tes_urls)
+        if unhealthy:
+            logger.warning(f"Unhealthy TES instances: {sorted(unhealthy)}")
+        if unhealthy != unhealthy_before:
+            bump_routing_epoch()
+
+    def get_unhealthy(self, tes_urls: list[str]) -> set[str]:
+        """Get unhealthy TES instances.
+
+        Args:
+            tes_urls: List of TES instance URLs.
+
+        Returns:
+            Set of URLs of unhealthy TES instances.
+        """
+        checked_after = datetime.utcnow() - timedelta(
+            seconds=self.config.get("max_age", 300)
+        )
+        return {
+            doc["url"]
+            for doc in self.db_client.find(
+                {
+                    "url": {"$in": tes_urls},
+                    "consecutive_failures": {
+                        "$gte": self.config.get("failure_threshold", 2)
+                    },
+                    "checked_at": {"$gte": checked_after},
+                },
+                {"_id": False, "url": True},
+            )
+        }
+
+    def filter_healthy(self, tes_urls: list[str]) -> list[str]:
+        """Remove unhealthy TES instances, preserving order.
+
+        If all TES instances are unhealthy or health is not available, all of
+        them are kept, so that failing health checks alone never prevent tasks
+        from being forwarded.
+
+        Args:
+            tes_urls: List of TES instance URLs.
+
+        Returns:
+            List of URLs of TES instances that are not unhealthy.
+        """
+        try:
+            unhealthy = self.get_unhealthy(tes_urls=tes_urls)
+        except PyMongoError as exc:
+            logger.warning(f"TES instance health not available: {exc}")
+            return tes_urls
+        healthy = [url for url in tes_urls if url not in unhealthy]
+        if tes_urls and not healthy:
+            logger.warning("All TES instances are unhealthy; ignoring health.")
+            return tes_urls
+        return healthy
+
+    def _set_result(self, url: str, result: ProbeResult) -> None:
+        """Record probe result of TES instance.
+
+        Args:
+            url: TES instance URL.
+            result: Probe result.
+        """
+        now = datetime.utcnow()
+        update: dict = {
+            "$set": {
+                "url": url,
+                "checked_at": now,
+                "latencies": result.latencies,
+                "error": result.error,
+            }
+        }
+        if result.healthy:
+            update["$set"]["consecutive_failures"] = 0
+            update["$set"]["last_success"] = now
+        else:
+            update["$inc"] = {"consecutive_failures": 1}
+        self.db_client.update_one(
+            filter={"url": url},
+            update=update,
+            upsert=True,
+        )
+
+
+def probe_tes(url: str, timeout: float) -> ProbeResult:
+    """Probe TES instance.
+
+    The service info endpoint is required to respond successfully, the list
+    tasks endpoint to respond without a server error (it may require
+    authorization).
+
+    Args:
+        url: TES instance URL.
+        timeout: Timeout of each request, in seconds.
+
+    Returns:
+        Probe result.
+    """
+    result = ProbeResult()
+    base_url = url.rstrip("/")
+    try:
+        start = perf_counter()
+        response = requests.get(
+            f"{base_url}/{SERVICE_INFO_PATH}", timeout=timeout
+        )
+        result.latencies["get_service_info"] = perf_counter() - start
+        response.raise_for_status()
+        service_info = response.json()
+        if isinstance(service_info, dict):
+            result.service_info = service_info
+        start = perf_counter()
+        response = requests.get(
+            f"{base_url}/{LIST_TASKS_PATH}",
+            params={"view": "MINIMAL", "page_size": 1},
+            timeout=timeout,
+        )
+        result.latencies["list_tasks"] = perf_counter() - start
+        if response.status_code >= 500:
+            response.raise_for_status()
+    except (requests.RequestException, ValueError) as exc:
+        result.healthy = False
+        result.error = f"{type(exc).__name__}: {exc}"
+    return result
@@ -0,0 +1,243 @@
+"""Historical queue times and runtimes of tasks per TES instance."""
+
+from hashlib import sha256
+import logging
+from math import floor, log2
+from typing import Optional
+
+from pydantic import BaseModel  # pragma pylint: disable=no-name-in-module
+from pymongo.collection import Collection  # type: ignore
+from pymongo.errors import PyMongoError  # type: ignore
+
+logger = logging.getLogger(__name__)
+
+# pragma pylint: disable=too-few-public-methods
+
+# key of statistics aggregated over all tasks of a TES instance
+ALL_TASKS = "*"
+
+
+class DurationStats(BaseModel):
+    """Distribution of durations.
+
+    Durations are aggregated into logarithmic buckets: bucket `i` counts
+    durations in the interval `[2^i, 2^(i+1))` seconds, with bucket `0` also
+    including durations of less than one second.
+
+    Attributes:
+        count: Number of durations.
+        total: Sum of durations, in seconds.
+        buckets: Number of durations per bucket, keyed by bucket index.
+    """
+
+    count: int = 0
+    total: float = 0.0
+    buckets: dict[str, int] = {}
+
+    @property
+    def mean(self) -> Optional[float]:
+        """Mean duration, in seconds, or `None` if there are no durations."""
+        if not self.count:
+            return None
+        return self.total / self.count
+
+    def percentile(self, percent: float) -> Optional[float]:
+        """Estimate percentile of durations.
+
+        Args:
+            percent: Percentile to estimate, between 0 and 100.
+
+        Returns:
+            Upper bound of the bucket containing the percentile, in seconds,
+                or `None` if there are no durations.
+        """
+        if not self.count:
+            return None
+        rank = percent / 100 * self.count
+        cumulative = 0
+        for index in sorted(int(key) for key in self.buckets):
+            cumulative += self.buckets[str(index)]
+            if cumulative >= rank:
+                return float(2 ** (index + 1))
+        return float(2 ** (max(int(key) for key in self.buckets) + 1))
+
+    def get(self, statistic: str) -> Optional[float]:
+        """Get statistic.
+
+        Args:
+            statistic: One of `mean`, `p50` and `p90`.
+
+        Returns:
+            Value of statistic, in seconds, or `None` if there are no
+                durations.
+
+        Raises:
+            ValueError: If statistic is not supported.
+        """
+        if statistic == "mean":
+            return self.mean
+        if statistic in ("p50", "p90"):
+            return self.percentile(float(statistic[1:]))
+        raise ValueError(f"Unsupported statistic: {statistic}")
+
+
+class TesHistory:
+    """Record and summarize historical queue times and runtimes.
+
+    Queue times (submission until the task is first observed running) are
+    aggregated per TES instance. Runtimes (running until completion) are
+    aggregated both per TES instance and per TES instance and task signature,
+    i.e., the set of container images run by the task. Aggregates are updated
+    incrementally, so recording a duration is a single atomic update.
+
+    Args:
+        collection: Database collection storing aggregates.
+
+    Attributes:
+        collection: Database collection storing aggregates.
+    """
+
+    def __init__(self, collection: Collection) -> None:
+        """Construct object instance."""
+        self.collection: Collection = collection
+
+    def record_queue_time(self, host: str, seconds: float) -> None:
+        """Record queue time of a task.
+
+        Args:
+            host: TES instance URL.
+            seconds: Queue time, in seconds.
+        """
+        self._record(host=host, key=ALL_TASKS, field="queue", seconds=seconds)
+
+    def record_runtime(
+        self,
+        host: str,
+        seconds: float,
+        signature: Optional[str] = None,
+    ) -> None:
+        """Record runtime of a task.
+
+        Args:
+            host: TES instance URL.
+            seconds: Runtime, in seconds.
+            signature: Task signature, as returned by `get_task_signature()`.
+        """
+        self._record(
+            host=host, key=ALL_TASKS, field="runtime", seconds=seconds
+        )
+        if signature is not None:
+            self._record(
+                host=host, key=signature, field="runtime", seconds=seconds
+            )
+
+    def get_expected_completion(
+        self,
+        hosts: list[str],
+        signature: Optional[str] = None,
+        statistic: str = "mean",
+        min_samples: int = 5,
+    ) -> dict[str, Optional[float]]:
+        """Get expected time to completion of a task per TES instance.
+
+        The expected time to completion is the sum of the expected queue time
+        and the expected runtime. Runtimes of tasks with the same signature
+        are used if at least `min_samples` are available, runtimes of all
+        tasks otherwise.
+
+        Args:
+            hosts: TES instance URLs.
+            signature: Task signature, as returned by `get_task_signature()`.
+            statistic: Statistic used as expectation; one of `mean`, `p50`
+                and `p90`.
+            min_samples: Minimum number of runtimes of tasks with the same
+                signature.
+
+        Returns:
+            Dictionary of TES instance URLs and expected times to completion,
+                in seconds, or `None` if no history is available.
+        """
+        docs: dict[tuple[str, str], dict] = {
+            (doc["host"], doc["key"]): doc
+            for doc in self.collection.find(
+                {
+                    "host": {"$in": hosts},
+                    "key": {"$in": [ALL_TASKS, signature or ALL_TASKS]},
+                },
+                {"_id": False},
+            )
+        }
+        expected: dict[str, Optional[float]] = {}
+        for host in hosts:
+            doc_all = docs.get((host, ALL_TASKS), {})
+            queue = DurationStats(**doc_all.get("queue", {}))
+            runtime = DurationStats(
+                **docs.get((host, signature or ALL_TASKS), {}).get(
+                    "runtime", {}
+                )
+            )
+            if runtime.count < min_samples:
+                runtime = DurationStats(**doc_all.get("runtime", {}))
+            queue_time = queue.get(statistic)
+            run_time = runtime.get(statistic)
+            if queue_time is None and run_time is None:
+                expected[host] = None
+            else:
+                expected[host] = (queue_time or 0.0) + (run_time or 0.0)
+        return expected
+
+    def _record(
+        self,
+        host: str,
+        key: str,
+        field: str,
+        seconds: float,
+    ) -> None:
+        """Add duration to aggregate.
+
+        Database errors are logged and otherwise ignored.
+
+        Args:
+            host: TES instance URL.
+            key: Task signature or `ALL_TASKS`.
+            field: Name of the aggregate; one of `queue` and `runtime`.
+            seconds: Duration, in seconds.
+        """
+        bucket = floor(log2(seconds)) if seconds >= 1 else 0
+        try:
+            self.collection.update_one(
+                filter={"host": host, "key": key},
+                update={
+                    "$inc": {
+                        f"{field}.count": 1,
+                        f"{field}.total": seconds,
+                        f"{field}.buckets.{bucket}": 1,
+                    }
+                },
+                upsert=True,
+            )
+        except PyMongoError as exc:
+            logger.debug(f"Duration could not be recorded: {exc}")
+
+
+def get_task_signature(task: dict) -> Optional[str]:
+    """Get signature of a task.
+
+    Tasks running the same container images share a signature.
+
+    Args:
+        task: Task object, as defined in the TES API specification.
+
+    Returns:
+        Task signature, or `None` if the task has no executors.
+    """
+    images = sorted(
+        {
+            executor.get("image")
+            for executor in task.get("executors") or []
+            if executor.get("image")
+        }
+    )
+    if not images:
+        return None
+    return sha256("\n".join(images).encode()).hexdigest()[:16]
@@ -0,0 +1,142 @@
+"""Managed indexes of database collections."""
+
+import logging
+
+from pymongo import ASCENDING, DESCENDING, IndexModel  # type: ignore
+from pymongo.collection import Collection  # type: ignore
+from pymongo.errors import OperationFailure  # type: ignore
+
+logger = logging.getLogger(__name__)
+
+# index options compared when checking whether an existing index matches
+INDEX_OPTIONS = (
+    "unique",
+    "sparse",
+    "partialFilterExpression",
+    "expireAfterSeconds",
+)
+
+# indexes of the tasks collection, matching the queries of the controllers,
+# including task list filters, the task tracker and the in-flight task
+# counters
+TASKS_INDEXES: list[IndexModel] = [
+    IndexModel([("task.id", ASCENDING)], name="task_id", unique=True),
+    IndexModel([("worker_id", ASCENDING)], name="worker_id"),
+    IndexModel(
+        [("user_id", ASCENDING), ("_id", DESCENDING)],
+        name="user_id_id",
+    ),
+    IndexModel(
+        [("user_id", ASCENDING), ("task_original.name", ASCENDING)],
+        name="user_id_name",
+    ),
+    IndexModel(
+        [
+            ("user_id", ASCENDING),
+            ("task.state", ASCENDING),
+            ("_id", DESCENDING),
+        ],
+        name="user_id_state_id",
+    ),
+    IndexModel(
+        [
+            ("user_id", ASCENDING),
+            ("tes_endpoint.host", ASCENDING),
+            ("_id", DESCENDING),
+        ],
+        name="user_id_tes_endpoint_id",
+    ),
+    IndexModel(
+        [
+            ("user_id", ASCENDING),
+            ("tag_list.key", ASCENDING),
+            ("tag_list.value", ASCENDING),
+            ("_id", DESCENDING),
+        ],
+        name="user_id_tag_id",
+    ),
+    IndexModel(
+        [("in_flight", ASCENDING)],
+        name="in_flight",
+        partialFilterExpression={"in_flight": True},
+    ),
+]
+
+# indexes of the in-flight task counters; quota enforcement relies on the
+# unique index, which is named like its former FOCA-managed counterpart so
+# that existing indexes are kept
+TES_LOAD_INDEXES: list[IndexModel] = [
+    IndexModel([("host", ASCENDING)], name="host_1", unique=True),
+]
+
+
+def ensure_indexes(collection: Collection, indexes: list[IndexModel]) -> None:
+    """Migrate the indexes of a collection to a managed set of indexes.
+
+    Unlike indexes set via FOCA config, which are dropped and rebuilt at
+    every start, managed indexes are only created if they are missing or
+    differ from their specification. Missing indexes are created before
+    indexes that are no longer managed are dropped, so that queries remain
+    covered during migration. Indexes that cannot be created, e.g., unique
+    indexes on fields with duplicate values, are logged and skipped.
+
+    Args:
+        collection: Database collection.
+        indexes: Indexes the collection should have, besides the default
+            index on `_id`; each index must be named.
+    """
+    specs: dict[str, dict] = {
+        index.document["name"]: index.document for index in indexes
+    }
+    existing: dict[str, dict] = collection.index_information()
+    for name, info in list(existing.items()):
+        if name in specs and not _matches(info=info, spec=specs[name]):
+            logger.info(
+                f"Dropping outdated index '{name}' of collection"
+                f" '{collection.name}'."
+            )
+            collection.drop_index(name)
+            del existing[name]
+    for index in indexes:
+        name = index.document["name"]
+        if name in existing:
+            continue
+        logger.info(
+            f"Creating index '{name}' of collection '{collection.name}'."
+        )
+        try:
+            collection.create_indexes([index])
+        except OperationFailure as exc:
+            logger.error(
+                f"Index '{name}' of collection '{collection.name}' could not"
+                f" be created: {exc}"
+            )
+    for name in existing:
+        if name == "_id_" or name in specs:
+            continue
+        logger.info(
+            f"Dropping unmanaged index '{name}' of collection"
+            f" '{collection.name}'."
+        )
+        collection.drop_index(name)
+
+
+def _matches(info: dict, spec: dict) -> bool:
+    """Check whether an existing index matches its specification.
+
+    Args:
+        info: Index information, as returned by
+            `Collection.index_information()`.
+        spec: Index specification, as returned by `IndexModel.document`.
+
+    Returns:
+        Whether keys and options of the index match.
+    """
+    if [(key, int(direction)) for key, direction in info["key"]] != list(
+        spec["key"].items()
+    ):
+        return False
+    return all(
+        (info.get(option) or None) == (spec.get(option) or None)
+        for option in INDEX_OPTIONS
+    )
@@ -0,0 +1,271 @@
+"""Latencies of calls to TES instances."""
+
+from contextlib import contextmanager
+import logging
+from time import perf_counter
+from typing import Any, Iterator, Optional
+
+import numpy as np
+from pydantic import BaseModel  # pragma pylint: disable=no-name-in-module
+from pymongo.collection import Collection  # type: ignore
+from pymongo.errors import PyMongoError  # type: ignore
+import tes  # type: ignore
+
+logger = logging.getLogger(__name__)
+
+# pragma pylint: disable=too-few-public-methods
+
+# client methods for which latencies are recorded
+TRACKED_OPERATIONS = (
+    "cancel_task",
+    "create_task",
+    "get_service_info",
+    "get_task",
+    "list_tasks",
+)
+
+
+class LatencyStats(BaseModel):
+    """Latency statistics of a TES instance.
+
+    Attributes:
+        count: Number of samples the statistics are based on.
+        ewma: Exponentially weighted moving average of latencies, in seconds.
+        p50: Median latency, in seconds.
+        p90: 90th percentile of latencies, in seconds.
+        p99: 99th percentile of latencies, in seconds.
+        error_rate: Fraction of failed calls.
+    """
+
+    count: int = 0
+    ewma: Optional[float] = None
+    p50: Optional[float] = None
+    p90: Optional[float] = None
+    p99: Optional[float] = None
+    error_rate: float = 0.0
+
+
+class TesLatency:
+    """Record and summarize latencies of calls to TES instances.
+
+    For each TES instance, the latest samples are kept in a single database
+    document, both across all operations and per operation; statistics are
+    computed from these samples when requested.
+
+    Args:
+        collection: Database collection storing latency samples.
+        window: Number of latest samples to keep per TES instance and
+            operation.
+
+    Attributes:
+        collection: Database collection storing latency samples.
+        window: Number of latest samples to keep per TES instance and
+            operation.
+    """
+
+    def __init__(self, collection: Collection, window: int = 100) -> None:
+        """Construct object instance."""
+        self.collection: Collection = collection
+        self.window: int = window
+
+    def record(
+        self,
+        host: str,
+        operation: str,
+        seconds: float,
+        success: bool = True,
+    ) -> None:
+        """Record latency of a call to a TES instance.
+
+        Database errors are logged and otherwise ignored.
+
+        Args:
+            host: TES instance URL.
+            operation: Name of the operation, e.g., `create_task`.
+            seconds: Latency, in seconds.
+            success: Whether the call succeeded.
+        """
+        sample = {
+            "$each": [{"t": seconds, "ok": success}],
+            "$slice": -self.window,
+        }
+        try:
+            self.collection.update_one(
+                filter={"host": host},
+                update={
+                    "$push": {
+                        "samples": sample,
+                        f"operations.{operation}": sample,
+                    },
+                },
+                upsert=True,
+            )
+        except PyMongoError as exc:
+            logger.debug(f"Latency could not be recorded: {exc}")
+
+    @contextmanager
+    def track(self, host: str, operation: str) -> Iterator[None]:
+        """Record latency of the wrapped code block.
+
+        Calls raising an exception are recorded as failed.
+
+        Args:
+            host: TES instance URL.
+            operation: Name of the operation, e.g., `create_task`.
+
+        Yields:
+            Nothing.
+        """
+        start = perf_counter()
+        success = False
+        try:
+            yield
+            success = True
+        finally:
+            self.record(
+                host=host,
+                operation=operation,
+                seconds=perf_counter() - start,
+                success=success,
+            )
+
+    def get_stats(
+        self,
+        hosts: list[str],
+        operation: Optional[str] = None,
+        alpha: float = 0.3,
+    ) -> dict[str, LatencyStats]:
+        """Get latency statistics of TES instances.
+
+        Args:
+            hosts: TES instance URLs.
+            operation: Name of the operation to consider; if `None`, all
+                operations are considered.
+            alpha: Smoothing factor of the exponentially weighted moving
+                average; higher values discount older samples faster.
+
+        Returns:
+            Dictionary of TES instance URLs and their latency statistics.
+        """
+        field = "samples" if operation is None else f"operations.{operation}"
+        stats: dict[str, LatencyStats] = {
+            host: LatencyStats() for host in hosts
+        }
+        for doc in self.collection.find(
+            {"host": {"$in": hosts}},
+            {"_id": False, "host": True, field: True},
+        ):
+            samples = doc.get("samples", [])
+            if operation is not None:
+                samples = doc.get("operations", {}).get(operation, [])
+            stats[doc["host"]] = self.summarize(samples=samples, alpha=alpha)
+        return stats
+
+    @staticmethod
+    def summarize(samples: list[dict], alpha: float = 0.3) -> LatencyStats:
+        """Compute latency statistics from samples.
+
+        Args:
+            samples: Latency samples, in chronological order.
+            alpha: Smoothing factor of the exponentially weighted moving
+                average.
+
+        Returns:
+            Latency statistics.
+        """
+        if not samples:
+            return LatencyStats()
+        latencies = np.array([sample["t"] for sample in samples], dtype=float)
+        ewma = latencies[0]
+        for latency in latencies[1:]:
+            ewma = alpha * latency + (1 - alpha) * ewma
+        p50, p90, p99 = np.percentile(latencies, [50, 90, 99]).tolist()
+        return LatencyStats(
+            count=len(samples),
+            ewma=float(ewma),
+            p50=p50,
+            p90=p90,
+            p99=p99,
+            error_rate=sum(not sample["ok"] for sample in samples)
+            / len(samples),
+        )
+
+
+class TrackedTesClient:
+    """Wrapper for a TES client recording latencies of all calls.
+
+    Args:
+        client: TES client.
+        host: TES instance URL under which latencies are recorded.
+        latency: Latency recorder.
+
+    Attributes:
+        client: TES client.
+        host: TES instance URL under which latencies are recorded.
+        latency: Latency recorder.
+    """
+
+    def __init__(
+        self,
+        client: tes.HTTPClient,
+        host: str,
+        latency: TesLatency,
+    ) -> None:
+        """Construct object instance."""
+        self.client: tes.HTTPClient = client
+        self.host: str = host
+        self.latency: TesLatency = latency
+
+    def __getattr__(self, name: str) -> Any:
+        """Get client attribute, recording latencies of tracked operations.
+
+        Args:
+            name: Attribute name.
+
+        Returns:
+            Client attribute.
+        """
+        attribute = getattr(self.client, name)
+        if name not in TRACKED_OPERATIONS:
+            return attribute
+
+        def tracked(*args, **kwargs) -> Any:
+            """Call client method and record its latency."""
+            with self.latency.track(host=self.host, operation=name):
+                return attribute(*args, **kwargs)
+
+        return tracked
+
+
+def create_tes_client(
+    url: str,
+    host: str,
+    latency: TesLatency,
+    user: Optional[str] = None,
+    password: Optional[str] = None,
+) -> TrackedTesClient:
+    """Create TES client recording latencies of all calls.
+
+    Args:
+        url: TES API URL, including base path.
+        host: TES instance URL under which latencies are recorded.
+        latency: Latency recorder.
+        user: Username for basic authentication.
+        password: Password for basic authentication.
+
+    Returns:
+        TES client.
+
+    Raises:
+        ValueError: TES API URL is invalid.
+    """
+    return TrackedTesClient(
+        client=tes.HTTPClient(
+            url,
+            timeout=5,
+            user=user,
+            password=password,
+        ),
+        host=host,
+        latency=latency,
+    )
@@ -0,0 +1,185 @@
+"""Counters of in-flight tasks per TES instance."""
+
+import logging
+from typing import Optional
+
+from pymongo.collection import Collection  # type: ignore
+from pymongo.collection import ReturnDocument  # type: ignore
+from pymongo.errors import DuplicateKeyError  # type: ignore
+
+logger = logging.getLogger(__name__)
+
+
+class TesLoad:
+    """Manage counters of in-flight tasks per TES instance.
+
+    Counters are updated incrementally whenever a task is forwarded to a TES
+    instance (`reserve()` and `acquire()`) and whenever it reaches a terminal
+    state (`release()`), so that reading the current load does not require
+    scanning the tasks collection. Counters double as quota slots: a
+    reservation fails if a TES instance already has as many tasks in flight
+    as its quota allows. Whether a task is currently counted is tracked via
+    the `in_flight` flag of its database document, ensuring that each task
+    is counted and released at most once.
+
+    Args:
+        collection: Database collection storing task objects; counters are
+            stored in the sibling collection `tes_load`.
+
+    Attributes:
+        collection: Database collection storing task objects.
+        counters: Database collection storing in-flight task counters.
+    """
+
+    def __init__(self, collection: Collection) -> None:
+        """Construct object instance."""
+        self.collection: Collection = collection
+        self.counters: Collection = collection.database["tes_load"]
+
+    def reserve(self, host: str, quota: Optional[int] = None) -> bool:
+        """Reserve a slot for a task at TES instance, unless it is full.
+
+        The counter is only incremented if it is below the quota, in a single
+        atomic operation, so that concurrent reservations across workers can
+        never exceed the quota. Requires the unique index on `host` (cf.
+        `pro_tes.utils.indexes.TES_LOAD_INDEXES`).
+
+        Args:
+            host: TES instance URL the task is about to be forwarded to.
+            quota: Maximum number of in-flight tasks at the TES instance;
+                `None` for no limit.
+
+        Returns:
+            `True` if a slot was reserved, `False` if the TES instance is full.
+        """
+        query: dict = {"host": host}
+        if quota is not None:
+            if quota <= 0:
+                return False
+            query["in_flight"] = {"$lt": quota}
+        try:
+            self.counters.update_one(
+                filter=query,
+                update={"$inc": {"in_flight": 1}},
+                upsert=True,
+            )
+        except DuplicateKeyError:
+            # counter exists but is at quota, so the upsert attempted to
+            # insert a second counter for the same TES instance
+            return False
+        return True
+
+    def cancel_reservation(self, host: str) -> None:
+        """Release slot reserved for a task that could not be forwarded.
+
+        Args:
+            host: TES instance URL a slot was reserved at.
+        """
+        self.counters.update_one(
+            filter={"host": host},
+            update={"$inc": {"in_flight": -1}},
+        )
+
+    def acquire(
+        self,
+        worker_id: str,
+        host: str,
+        reserved: bool = False,
+    ) -> bool:
+        """Count task as in flight at TES instance.
+
+        Args:
+            worker_id: Worker identifier of the task.
+            host: TES instance URL the task was forwarded to.
+            reserved: Whether a slot was reserved for the task via
+                `reserve()`, in which case the counter is not incremented
+                again.
+
+        Returns:
+            `True` if task was counted, `False` if it was already counted.
+        """
+        document = self.collection.find_one_and_update(
+            {"worker_id": worker_id, "in_flight": {"$ne": True}},
+            {"$set": {"in_flight": True}},
+        )
+        if document is None:
+            if reserved:
+                self.cancel_reservation(host=host)
+            return False
+        if not reserved:
+            self.counters.update_one(
+                filter={"host": host},
+                update={"$inc": {"in_flight": 1}},
+                upsert=True,
+            )
+        return True
+
+    def release(self, worker_id: str) -> bool:
+        """Stop counting task as in flight at its TES instance.
+
+        Args:
+            worker_id: Worker identifier of the task.
+
+        Returns:
+            `True` if task was released, `False` if it was not counted.
+        """
+        document = self.collection.find_one_and_update(
+            {"worker_id": worker_id, "in_flight": True},
+            {"$set": {"in_flight": False}},
+            projection={"tes_endpoint.host": True},
+            return_document=ReturnDocument.BEFORE,
+        )
+        if document is None:
+            return False
+        self.counters.update_one(
+            filter={"host": document["tes_endpoint"]["host"]},
+            update={"$inc": {"in_flight": -1}},
+        )
+        return True
+
+    def get_in_flight(self, hosts: list[str]) -> dict[str, int]:
+        """Get number of in-flight tasks per TES instance.
+
+        Args:
+            hosts: TES instance URLs.
+
+        Returns:
+            Dictionary of TES instance URLs and their number of in-flight
+                tasks.
+        """
+        in_flight: dict[str, int] = {host: 0 for host in hosts}
+        for doc in self.counters.find(
+            {"host": {"$in": hosts}},
+            {"_id": False},
+        ):
+            in_flight[doc["host"]] = max(doc.get("in_flight", 0), 0)
+        return in_flight
+
+    def rebuild(self) -> None:
+        """Recompute counters from the tasks collection.
+
+        Intended to correct drift, e.g., after crashes; requires a scan of all
+        in-flight tasks.
+        """
+        counts = {
+            doc["_id"]: doc["count"]
+            for doc in self.collection.aggregate(
+                [
+                    {"$match": {"in_flight": True}},
+                    {
+                        "$group": {
+                            "_id": "$tes_endpoint.host",
+                            "count": {"$sum": 1},
+                        }
+                    },
+                ]
+            )
+        }
+        self.counters.delete_many({"host": {"$nin": list(counts)}})
+        for host, count in counts.items():
+            self.counters.update_one(
+                filter={"host": host},
+                update={"$set": {"in_flight": count}},
+                upsert=True,
+            )
+        logger.info(f"In-flight task counters rebuilt: {counts}")
@@ -0,0 +1,336 @@
+"""In-process metrics registry."""
+
+from bisect import bisect_left
+from collections import defaultdict
+from contextlib import contextmanager
+from itertools import accumulate
+from math import inf, isinf
+from threading import Lock
+from time import perf_counter
+from typing import Iterator, Optional
+
+from flask import Response
+from pydantic import BaseModel  # pragma pylint: disable=no-name-in-module
+
+LabelSet = tuple[tuple[str, str], ...]
+
+# upper bounds of histogram buckets, in seconds
+DEFAULT_BUCKETS: tuple[float, ...] = (
+    0.001,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1,
+    2.5,
+    5,
+    10,
+)
+
+
+class Histogram(BaseModel):
+    """Histogram of observed values.
+
+    Attributes:
+        buckets: Upper bounds of buckets; an implicit last bucket holds all
+            larger values.
+        counts: Number of observed values per bucket (not cumulative).
+        count: Number of observed values.
+        sum: Sum of observed values.
+    """
+
+    buckets: tuple[float, ...] = DEFAULT_BUCKETS
+    counts: list[int] = [0] * (len(DEFAULT_BUCKETS) + 1)
+    count: int = 0
+    sum: float = 0
+
+    def observe(self, value: float) -> None:
+        """Add value to histogram.
+
+        Args:
+            value: Observed value.
+        """
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def get_cumulative_counts(self) -> list[tuple[float, int]]:
+        """Get cumulative number of observed values per bucket.
+
+        Returns:
+            List of bucket upper bounds, including `math.inf` for the
+                implicit last bucket, and the number of observed values less
+                than or equal to them.
+        """
+        return list(
+            zip(
+                (*self.buckets, inf),
+                accumulate(self.counts),
+            )
+        )
+
+
+class MetricsRegistry:
+    """Thread-safe registry of labeled counters and histograms.
+
+    Metrics are kept per process, e.g., per Gunicorn worker.
+
+    Attributes:
+        counters: Dictionary of counter names and their values per label set.
+        histograms: Dictionary of histogram names and their values per label
+            set.
+    """
+
+    def __init__(self) -> None:
+        """Construct object instance."""
+        self.counters: dict[str, dict[LabelSet, float]] = defaultdict(
+            lambda: defaultdict(float)
+        )
+        self.histograms: dict[str, dict[LabelSet, Histogram]] = defaultdict(
+            lambda: defaultdict(Histogram)
+        )
+        self._lock: Lock = Lock()
+
+    def increment(self, name: str, value: float = 1, **labels: str) -> None:
+        """Increment counter.
+
+        Args:
+            name: Counter name; following Prometheus naming conventions, it
+                should end in `_total`.
+            value: Value to increment counter by.
+            **labels: Labels identifying the counter instance.
+        """
+        with self._lock:
+            self.counters[name][self._get_label_set(**labels)] += value
+
+    def get_counter(self, name: str, **labels: str) -> float:
+        """Get counter value.
+
+        Args:
+            name: Counter name.
+            **labels: Labels identifying the counter instance.
+
+        Returns:
+            Counter value; `0` if counter was never incremented.
+        """
+        with self._lock:
+            return self.counters.get(name, {}).get(
+                self._get_label_set(**labels), 0
+            )
+
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        """Add value to histogram.
+
+        Args:
+            name: Histogram name.
+            value: Observed value, e.g., a duration in seconds.
+            **labels: Labels identifying the histogram instance.
+        """
+        with self._lock:
+            self.histograms[name][self._get_label_set(**labels)].observe(value)
+
+    def get_histogram(self, name: str, **labels: str) -> Optional[Histogram]:
+        """Get copy of histogram.
+
+        Args:
+            name: Histogram name.
+            **labels: Labels identifying the histogram instance.
+
+        Returns:
+            Histogram; `None` if no value was ever observed.
+        """
+        with self._lock:
+            histogram = self.histograms.get(name, {}).get(
+                self._get_label_set(**labels)
+            )
+            return None if histogram is None else histogram.copy(deep=True)
+
+    def snapshot(self) -> dict:
+        """Get current values of all metrics.
+
+        Returns:
+            Dictionary of metric names and lists of label-value records;
+                values of histograms are dictionaries of bucket upper bounds,
+                bucket counts, count and sum.
+        """
+        with self._lock:
+            snapshot: dict = {
+                name: [
+                    {"labels": dict(label_set), "value": value}
+                    for label_set, value in values.items()
+                ]
+                for name, values in self.counters.items()
+            }
+            for name, histograms in self.histograms.items():
+                snapshot[name] = [
+                    {"labels": dict(label_set), "value": histogram.dict()}
+                    for label_set, histogram in histograms.items()
+                ]
+            return snapshot
+
+    def to_prometheus(self) -> str:
+        """Render all metrics in the Prometheus text exposition format.
+
+        Histograms are rendered as cumulative buckets (series `<name>_bucket`
+        with label `le`), sum (`<name>_sum`) and count (`<name>_count`).
+
+        Returns:
+            Metrics in Prometheus text exposition format, version 0.0.4.
+        """
+        lines: list[str] = []
+        with self._lock:
+            for name, values in sorted(self.counters.items()):
+                lines.append(f"# TYPE {name} counter")
+                for label_set, value in values.items():
+                    lines.append(f"{name}{_format_labels(label_set)} {value}")
+            for name, histograms in sorted(self.histograms.items()):
+                lines.append(f"# TYPE {name} histogram")
+                for label_set, histogram in histograms.items():
+                    for bound, count in histogram.get_cumulative_counts():
+                        labels = _format_labels(
+                            label_set + (("le", _format_value(bound)),)
+                        )
+                        lines.append(f"{name}_bucket{labels} {count}")
+                    labels = _format_labels(label_set)
+                    lines.append(f"{name}_sum{labels} {histogram.sum}")
+                    lines.append(f"{name}_count{labels} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def reset(self) -> None:
+        """Remove all metrics."""
+        with self._lock:
+            self.counters.clear()
+            self.histograms.clear()
+
+    @staticmethod
+    def _get_label_set(**labels: str) -> LabelSet:
+        """Get hashable, order-independent representation of labels.
+
+        Args:
+            **labels: Labels.
+
+        Returns:
+            Sorted tuple of label name-value pairs.
+        """
+        return tuple(
+            sorted((key, str(value)) for key, value in labels.items())
+        )
+
+
+metrics = MetricsRegistry()
+
+
+def get_metrics() -> Response:
+    """Serve metrics of the current process for Prometheus to scrape.
+
+    Returns:
+        Response with metrics in Prometheus text exposition format.
+    """
+    return Response(
+        metrics.to_prometheus(),
+        mimetype="text/plain",
+        content_type="text/plain; version=0.0.4; charset=utf-8",
+    )
+
+
+def _format_labels(label_set: LabelSet) -> str:
+    """Format labels in Prometheus text exposition format.
+
+    Args:
+        label_set: Label name-value pairs.
+
+    Returns:
+        Labels enclosed in braces; empty string if there are no labels.
+    """
+    if not label_set:
+        return ""
+    labels = ",".join(f'{key}="{_escape(value)}"' for key, value in label_set)
+    return f"{{{labels}}}"
+
+
+def _format_value(value: float) -> str:
+    """Format bucket upper bound in Prometheus text exposition format.
+
+    Args:
+        value: Bucket upper bound.
+
+    Returns:
+        `+Inf` for `math.inf`, otherwise the value.
+    """
+    return "+Inf" if isinf(value) else str(value)
+
+
+def _escape(value: str) -> str:
+    """Escape label value in Prometheus text exposition format.
+
+    Args:
+        value: Label value.
+
+    Returns:
+        Label value with backslashes, double quotes and line feeds escaped.
+    """
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class StageTimer:
+    """Time stages of an operation.
+
+    The duration of each stage is added to a histogram, labeled by stage, and
+    kept for logging a summary of the operation.
+
+    Args:
+        name: Name of the histogram.
+        registry: Metrics registry to record durations in.
+        **labels: Labels added to the stage label of each duration.
+
+    Attributes:
+        name: Name of the histogram.
+        registry: Metrics registry to record durations in.
+        labels: Labels added to the stage label of each duration.
+        durations: Total durations of timed stages, in seconds, in order of
+            their first completion.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        registry: MetricsRegistry = metrics,
+        **labels: str,
+    ) -> None:
+        """Construct object instance."""
+        self.name: str = name
+        self.registry: MetricsRegistry = registry
+        self.labels: dict[str, str] = labels
+        self.durations: dict[str, float] = {}
+
+    @contextmanager
+    def stage(self, stage: str) -> Iterator[None]:
+        """Time the wrapped code block.
+
+        Durations are recorded also if the code block raises an exception.
+
+        Args:
+            stage: Name of the stage.
+
+        Yields:
+            Nothing.
+        """
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            seconds = perf_counter() - start
+            self.durations[stage] = self.durations.get(stage, 0) + seconds
+            self.registry.observe(
+                self.name, seconds, stage=stage, **self.labels
+            )
+
+    def __str__(self) -> str:
+        """Summarize durations of timed stages, in milliseconds."""
+        return ", ".join(
+            f"{stage}={seconds * 1000:.1f}ms"
+            for stage, seconds in self.durations.items()
+        )
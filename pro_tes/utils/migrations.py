@@ -0,0 +1,164 @@
+"""Migrations of database documents."""
+
+from datetime import datetime
+import logging
+from typing import Any, Optional
+
+from pymongo.collection import Collection  # type: ignore
+
+from pro_tes.ga4gh.tes.models import TaskTag
+from pro_tes.utils.timestamps import now, to_datetime
+
+logger = logging.getLogger(__name__)
+
+# fields of task documents holding TES tasks
+TASK_FIELDS = ("task", "task_original")
+
+# paths of timestamps, relative to TES tasks
+TIMESTAMP_PATHS = (
+    "creation_time",
+    "logs.start_time",
+    "logs.end_time",
+    "logs.logs.start_time",
+    "logs.logs.end_time",
+)
+
+
+def migrate_tag_list(collection: Collection) -> int:
+    """Add tag lists to task documents lacking them.
+
+    Tags of TES tasks are stored as objects with arbitrary keys, which cannot
+    be indexed. For filtering, they are therefore also stored as a list of
+    key-value pairs in field `tag_list`. Documents written before that field
+    was introduced are updated once, at startup.
+
+    Args:
+        collection: Database collection storing tasks.
+
+    Returns:
+        Number of updated documents.
+    """
+    updated = 0
+    for document in collection.find(
+        {"tag_list": {"$exists": False}},
+        {"task.tags": True},
+    ):
+        tag_list = TaskTag.from_tags(
+            tags=(document.get("task") or {}).get("tags")
+        )
+        updated += collection.update_one(
+            {"_id": document["_id"], "tag_list": {"$exists": False}},
+            {"$set": {"tag_list": [tag.dict() for tag in tag_list]}},
+        ).modified_count
+    if updated:
+        logger.info(
+            f"Added tag lists to {updated} documents of collection"
+            f" '{collection.name}'."
+        )
+    return updated
+
+
+def migrate_timestamps(collection: Collection) -> int:
+    """Convert task timestamps stored as strings to dates.
+
+    Earlier versions stored the creation time of tasks as well as start and
+    end times of task and executor logs as strings, partly in a non-standard
+    format, both for processed and original tasks. Such timestamps are
+    converted to dates, so that they can be sorted, range-queried and
+    indexed. Timestamps that cannot be parsed are logged and set to `None`.
+    As finding such timestamps requires a scan of the whole collection,
+    completion of the migration is recorded in collection `migrations` and
+    the migration is skipped thereafter.
+
+    Args:
+        collection: Database collection storing tasks.
+
+    Returns:
+        Number of updated documents.
+    """
+    name = f"{collection.name}.timestamps"
+    migrations: Collection = collection.database["migrations"]
+    if migrations.find_one({"_id": name}) is not None:
+        return 0
+    updated = 0
+    for document in collection.find(
+        {
+            "$or": [
+                {f"{field}.{path}": {"$type": "string"}}
+                for field in TASK_FIELDS
+                for path in TIMESTAMP_PATHS
+            ]
+        },
+        {
+            f"{field}.{key}": True
+            for field in TASK_FIELDS
+            for key in ("creation_time", "logs")
+        },
+    ):
+        updated += collection.update_one(
+            {"_id": document["_id"]},
+            {
+                "$set": _get_timestamp_update(document=document),
+                "$inc": {"version": 1},
+            },
+        ).modified_count
+    if updated:
+        logger.info(
+            f"Converted timestamps of {updated} documents of collection"
+            f" '{collection.name}'."
+        )
+    migrations.update_one(
+        {"_id": name},
+        {"$set": {"completed_at": now()}},
+        upsert=True,
+    )
+    return updated
+
+
+def _get_timestamp_update(document: dict) -> dict:
+    """Get update converting the timestamps of a task document to dates.
+
+    Args:
+        document: Database document with creation times and logs of tasks.
+
+    Returns:
+        Fields to set, keyed by path.
+    """
+    update: dict = {}
+    for field in TASK_FIELDS:
+        task: dict = document.get(field) or {}
+        if "creation_time" in task:
+            update[f"{field}.creation_time"] = _convert_timestamp(
+                document=document, value=task["creation_time"]
+            )
+        if not task.get("logs"):
+            continue
+        for task_log in task["logs"]:
+            for log in [task_log] + (task_log.get("logs") or []):
+                for key in ("start_time", "end_time"):
+                    if key in log:
+                        log[key] = _convert_timestamp(
+                            document=document, value=log[key]
+                        )
+        update[f"{field}.logs"] = task["logs"]
+    return update
+
+
+def _convert_timestamp(document: dict, value: Any) -> Optional[datetime]:
+    """Convert stored timestamp to date.
+
+    Args:
+        document: Database document the timestamp belongs to.
+        value: Stored timestamp.
+
+    Returns:
+        Timestamp in UTC, or `None` if it cannot be parsed.
+    """
+    try:
+        return to_datetime(value)
+    except ValueError:
+        logger.warning(
+            f"Invalid timestamp '{value}' of document '{document['_id']}'"
+            " set to None."
+        )
+        return None
@@ -1,7 +1,15 @@
 """Miscellaneous utilities."""
 
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Hashable, Mapping, Sequence, TypeVar
 from urllib.parse import urlsplit, urlunsplit
 
+from pymongo.collection import Collection  # type: ignore
+
+KeyT = TypeVar("KeyT", bound=Hashable)
+ValueT = TypeVar("ValueT")
+
 
 def strip_auth(url: str) -> str:
     """Remove basic authentication information from URI, if present.
@@ -18,3 +26,51 @@ def strip_auth(url: str) -> str:
     elements = list(urlsplit(url))
     elements[1] = elements[1][elements[1].rfind("@") + 1 :]  # noqa: E203
     return urlunsplit(elements)
+
+
+def map_concurrently(
+    func: Callable[[KeyT], ValueT],
+    items: Sequence[KeyT],
+    max_workers: int,
+) -> dict[KeyT, ValueT]:
+    """Call function for each item concurrently, in a thread pool.
+
+    Args:
+        func: Function to call with each item.
+        items: Items to call function with.
+        max_workers: Maximum number of concurrent calls.
+
+    Returns:
+        Dictionary of items and the respective return values.
+    """
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return dict(zip(items, executor.map(func, items)))
+
+
+def upsert_by_field(
+    collection: Collection,
+    field: str,
+    value: Any,
+    fields: Mapping[str, Any],
+) -> None:
+    """Insert or update document identified by the value of a field.
+
+    The time of the update is set in field `updated_at`.
+
+    Args:
+        collection: Database collection.
+        field: Name of the field identifying the document.
+        value: Value of the field identifying the document.
+        fields: Further fields to set.
+    """
+    collection.update_one(
+        filter={field: value},
+        update={
+            "$set": {
+                field: value,
+                **fields,
+                "updated_at": datetime.utcnow(),
+            }
+        },
+        upsert=True,
+    )
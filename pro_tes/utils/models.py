@@ -1,6 +1,6 @@
 """Class to convert py-tes to proTES TES task model."""
 
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import Optional
 
 from tes.models import TaskLog, Task  # type: ignore
@@ -17,6 +17,7 @@ from pro_tes.ga4gh.tes.models import (
     TesState,
     TesTask,
 )
+from pro_tes.utils.timestamps import to_datetime
 
 
 class TaskModelConverter:
@@ -246,7 +247,7 @@ class TaskModelConverter:
     def convert_time(
         timestamp: Optional[datetime],
         allow_none=True,
-    ) -> Optional[str]:
+    ) -> Optional[datetime]:
         """Convert py-tes to proTES TES task time.
 
         Args:
@@ -255,11 +256,11 @@ class TaskModelConverter:
                 is `None`.
 
         Returns:
-            String representation of time in RFC3339 format, or `None`, if
-                `allow_none` is `True` and `timestamp` is `None`.
+            Time in UTC, or `None`, if `allow_none` is `True` and `timestamp`
+                is `None`.
         """
         if timestamp is None:
             if allow_none:
                 return None
-            return datetime.fromtimestamp(0).isoformat()
-        return timestamp.isoformat()
+            return datetime.fromtimestamp(0, tz=timezone.utc)
+        return to_datetime(timestamp)
@@ -0,0 +1,108 @@
+"""Utilities for paginating task lists."""
+
+import base64
+import binascii
+import hashlib
+import json
+from typing import Mapping
+
+from bson.errors import InvalidId  # type: ignore
+from bson.objectid import ObjectId  # type: ignore
+from pymongo.collection import Collection  # type: ignore
+
+from pro_tes.exceptions import BadRequest
+from pro_tes.utils.cache import LruCache
+
+# cache of approximate numbers of tasks matching list filters
+task_count_cache = LruCache(name="task_count", max_entries=1024, ttl=30)
+
+
+def get_filter_hash(filter_dict: Mapping) -> str:
+    """Get hash of a database filter.
+
+    Args:
+        filter_dict: Database filter.
+
+    Returns:
+        Hash of the filter, identical for equivalent filters.
+    """
+    serialized = json.dumps(filter_dict, sort_keys=True, default=str)
+    return hashlib.sha256(serialized.encode()).hexdigest()[:16]
+
+
+def encode_page_token(last_id: ObjectId, filter_hash: str) -> str:
+    """Create opaque page token.
+
+    Args:
+        last_id: Database identifier of the last task of the current page,
+            i.e., the sort key to continue from.
+        filter_hash: Hash of the filter the page was retrieved with.
+
+    Returns:
+        Page token.
+    """
+    return (
+        base64.urlsafe_b64encode(f"{last_id}.{filter_hash}".encode())
+        .decode()
+        .rstrip("=")
+    )
+
+
+def decode_page_token(page_token: str, filter_hash: str) -> ObjectId:
+    """Get sort key to continue from from opaque page token.
+
+    Args:
+        page_token: Page token.
+        filter_hash: Hash of the filter of the current request.
+
+    Returns:
+        Database identifier of the last task of the previous page.
+
+    Raises:
+        BadRequest: If the page token is invalid or was issued for a
+            different filter.
+    """
+    try:
+        last_id, token_hash = (
+            base64.urlsafe_b64decode(page_token + "=" * (-len(page_token) % 4))
+            .decode()
+            .split(".")
+        )
+        object_id = ObjectId(last_id)
+    except (binascii.Error, InvalidId, UnicodeDecodeError, ValueError) as exc:
+        raise BadRequest(f"Invalid page token: {page_token}") from exc
+    if token_hash != filter_hash:
+        raise BadRequest(
+            "Page token was issued for a different set of filters."
+        )
+    return object_id
+
+
+def get_task_count(
+    collection: Collection,
+    filter_dict: Mapping,
+    filter_hash: str,
+    limit: int = 0,
+) -> int:
+    """Get approximate number of tasks matching a filter.
+
+    Counts are cached and thus may be outdated by up to the time to live of
+    the cache. Counting stops at `limit`, bounding the cost of counting tasks
+    matching broad filters.
+
+    Args:
+        collection: Database collection storing tasks.
+        filter_dict: Database filter.
+        filter_hash: Hash of the filter.
+        limit: Maximum number of tasks to count; set to `0` for no limit.
+
+    Returns:
+        Approximate number of tasks matching the filter.
+    """
+    count = task_count_cache.get(key=filter_hash)
+    if count is None:
+        count = collection.count_documents(
+            filter_dict, **({"limit": limit} if limit > 0 else {})
+        )
+        task_count_cache.set(key=filter_hash, value=count)
+    return count
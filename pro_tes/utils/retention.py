@@ -0,0 +1,165 @@
+"""Retention of finished tasks."""
+
+from datetime import timedelta
+import logging
+from typing import Optional
+
+from bson.objectid import ObjectId  # type: ignore
+from pymongo import ASCENDING, DESCENDING, IndexModel  # type: ignore
+from pymongo.collection import Collection  # type: ignore
+from pymongo.errors import BulkWriteError  # type: ignore
+
+from pro_tes.ga4gh.tes.states import States
+from pro_tes.utils.indexes import ensure_indexes
+from pro_tes.utils.metrics import metrics
+from pro_tes.utils.timestamps import now
+
+logger = logging.getLogger(__name__)
+
+# MongoDB error code for duplicate keys
+DUPLICATE_KEY_ERROR = 11000
+
+
+class TaskArchiver:
+    """Move finished tasks from the tasks collection to an archive.
+
+    Tasks in a finished state created more than `max_age` seconds ago are
+    moved in batches, once their final logs are stored; tasks stored before
+    documents were marked as finalized are moved regardless. Tasks are
+    inserted into the archive before they are deleted from the tasks
+    collection, so that they remain available throughout. If `ttl` is set,
+    archived tasks and their blobs are deleted by the database `ttl` seconds
+    after archival.
+
+    Args:
+        collection: Database collection storing tasks.
+        archive: Database collection storing archived tasks.
+        blobs: Database collection storing large task fields.
+        max_age: Minimum age of tasks to archive, in seconds; set to `None` to
+            disable archival.
+        batch_size: Maximum number of tasks to move at once.
+        ttl: Time after which archived tasks are deleted, in seconds; set to
+            `None` to keep archived tasks.
+
+    Attributes:
+        collection: Database collection storing tasks.
+        archive: Database collection storing archived tasks.
+        blobs: Database collection storing large task fields.
+        max_age: Minimum age of tasks to archive, in seconds.
+        batch_size: Maximum number of tasks to move at once.
+        ttl: Time after which archived tasks are deleted, in seconds.
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        collection: Collection,
+        archive: Collection,
+        blobs: Collection,
+        *,
+        max_age: Optional[float] = None,
+        batch_size: int = 1000,
+        ttl: Optional[float] = None,
+    ) -> None:
+        """Construct object instance."""
+        self.collection: Collection = collection
+        self.archive: Collection = archive
+        self.blobs: Collection = blobs
+        self.max_age: Optional[float] = max_age
+        self.batch_size: int = batch_size
+        self.ttl: Optional[float] = ttl
+
+    def ensure_indexes(self) -> None:
+        """Create indexes of the archive and expiry of archived blobs."""
+        expiry: list[IndexModel] = (
+            []
+            if self.ttl is None
+            else [
+                IndexModel(
+                    [("archived_at", ASCENDING)],
+                    name="archived_at",
+                    expireAfterSeconds=int(self.ttl),
+                )
+            ]
+        )
+        ensure_indexes(
+            collection=self.archive,
+            indexes=[
+                IndexModel(
+                    [("task.id", ASCENDING)], name="task_id", unique=True
+                ),
+                IndexModel(
+                    [("user_id", ASCENDING), ("_id", DESCENDING)],
+                    name="user_id_id",
+                ),
+            ]
+            + expiry,
+        )
+        ensure_indexes(collection=self.blobs, indexes=expiry)
+
+    def run(self) -> int:
+        """Move finished tasks older than the maximum age to the archive.
+
+        Returns:
+            Number of archived tasks.
+        """
+        if self.max_age is None:
+            return 0
+        archived = 0
+        created_before = ObjectId.from_datetime(
+            now() - timedelta(seconds=self.max_age)
+        )
+        while True:
+            documents = list(
+                self.collection.find(
+                    {
+                        "_id": {"$lt": created_before},
+                        "task.state": {"$in": States.FINISHED},
+                        "in_flight": {"$ne": True},
+                        "finalized": {"$ne": False},
+                    }
+                ).limit(self.batch_size)
+            )
+            if not documents:
+                break
+            self._move(documents=documents)
+            archived += len(documents)
+            if len(documents) < self.batch_size:
+                break
+        if archived:
+            metrics.increment("tasks_archived_total", value=archived)
+            logger.info(f"Archived {archived} finished tasks.")
+        return archived
+
+    def _move(self, documents: list[dict]) -> None:
+        """Move tasks to the archive.
+
+        Tasks that were already archived, e.g., by an interrupted run, are
+        not archived again.
+
+        Args:
+            documents: Task documents.
+        """
+        archived_at = now()
+        for document in documents:
+            document["archived_at"] = archived_at
+        try:
+            self.archive.insert_many(documents, ordered=False)
+        except BulkWriteError as exc:
+            if any(
+                error["code"] != DUPLICATE_KEY_ERROR
+                for error in exc.details["writeErrors"]
+            ):
+                raise
+        blob_ids = [
+            reference["id"]
+            for document in documents
+            for reference in document.get("blobs") or []
+        ]
+        if blob_ids:
+            self.blobs.update_many(
+                {"_id": {"$in": blob_ids}},
+                {"$set": {"archived_at": archived_at}},
+            )
+        self.collection.delete_many(
+            {"_id": {"$in": [document["_id"] for document in documents]}}
+        )
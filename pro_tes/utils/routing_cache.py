@@ -0,0 +1,80 @@
+"""In-process cache of routing decisions."""
+
+import logging
+from typing import Optional
+
+from flask import current_app
+from pymongo import ReturnDocument  # type: ignore
+from pymongo.collection import Collection  # type: ignore
+from pymongo.errors import PyMongoError  # type: ignore
+
+from pro_tes.utils.cache import LruCache
+
+logger = logging.getLogger(__name__)
+
+# name of the shared counter that is incremented whenever TES instance health
+# or locations change
+EPOCH_COUNTER_NAME = "routing_epoch"
+
+
+class RoutingCache(LruCache):
+    """Thread-safe LRU cache of routing decisions with expiry.
+
+    Entries are tagged with the routing epoch they were computed in; the cache
+    is cleared as soon as a different epoch is observed, i.e., after TES
+    instance health or locations changed.
+
+    Args:
+        max_entries: Maximum number of entries; least recently used entries
+            are evicted first. Set to `0` to disable caching.
+        ttl: Time to live of entries, in seconds.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl: float = 300) -> None:
+        """Construct object instance."""
+        super().__init__(name="routing", max_entries=max_entries, ttl=ttl)
+
+
+routing_cache = RoutingCache()
+
+
+def _get_counters() -> Collection:
+    """Get collection of shared counters.
+
+    Returns:
+        Database collection storing shared counters.
+    """
+    return (
+        current_app.config.foca.db.dbs["taskStore"]
+        .collections["counters"]
+        .client
+    )
+
+
+def get_routing_epoch() -> Optional[int]:
+    """Get current routing epoch.
+
+    Returns:
+        Current routing epoch, or `None` if it is not available.
+    """
+    try:
+        document = _get_counters().find_one({"name": EPOCH_COUNTER_NAME})
+    except PyMongoError as exc:
+        logger.warning(f"Routing epoch not available: {exc}")
+        return None
+    return 0 if document is None else document["value"]
+
+
+def bump_routing_epoch() -> None:
+    """Increment routing epoch, invalidating cached routing decisions."""
+    try:
+        document = _get_counters().find_one_and_update(
+            {"name": EPOCH_COUNTER_NAME},
+            {"$inc": {"value": 1}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+    except PyMongoError as exc:
+        logger.warning(f"Routing epoch could not be advanced: {exc}")
+        return
+    logger.info(f"Routing epoch advanced to {document['value']}.")
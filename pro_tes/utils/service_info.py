@@ -0,0 +1,126 @@
+"""Shared cache of service info of TES instances."""
+
+import logging
+from typing import Optional
+
+from flask import current_app
+from pymongo.collection import Collection  # type: ignore
+import requests
+
+from pro_tes.utils.misc import map_concurrently, upsert_by_field
+
+logger = logging.getLogger(__name__)
+
+# path of the service info endpoint, relative to the TES instance URL
+SERVICE_INFO_PATH = "ga4gh/tes/v1/service-info"
+
+
+class TesServiceInfoCache:
+    """Manage cached service info of the configured TES instances.
+
+    Service info is fetched concurrently at app initialization and refreshed
+    periodically in the background, so that task distribution middlewares can
+    use it without making remote calls. Service info is stored as returned by
+    the TES instances, including any non-standard fields. Options are set via
+    config parameter `tes.service_info`.
+
+    Attributes:
+        db_client: Database collection storing service info.
+        config: Cache options.
+    """
+
+    def __init__(self) -> None:
+        """Construct class instance."""
+        self.db_client: Collection = (
+            current_app.config.foca.db.dbs["taskStore"]
+            .collections["tes_service_info"]
+            .client
+        )
+        self.config: dict = (
+            current_app.config.foca.tes.get("service_info") or {}
+        )
+
+    def refresh(self) -> None:
+        """Fetch service info of all configured TES instances.
+
+        Service info that cannot be fetched is logged and the previously
+        cached service info, if any, is kept; entries of TES instances that
+        are no longer configured are removed.
+        """
+        tes_urls: list[str] = list(
+            set(current_app.config.foca.tes["service_list"])
+        )
+        timeout: float = self.config.get("timeout", 5)
+        fetched = map_concurrently(
+            func=lambda url: fetch_service_info(url=url, timeout=timeout),
+            items=tes_urls,
+            max_workers=self.config.get("max_workers", 8),
+        )
+        for url, service_info in fetched.items():
+            if service_info is not None:
+                self.set(url=url, service_info=service_info)
+        self.db_client.delete_many({"url": {"$nin": tes_urls}})
+        logger.info("TES service info refreshed.")
+
+    def set(self, url: str, service_info: dict) -> None:
+        """Insert or update cached service info of a TES instance.
+
+        Args:
+            url: TES instance URL.
+            service_info: Service info, as returned by the TES instance.
+        """
+        upsert_by_field(
+            collection=self.db_client,
+            field="url",
+            value=url,
+            fields={"service_info": service_info},
+        )
+
+    def get(self, tes_urls: list[str]) -> dict[str, dict]:
+        """Get cached service info of TES instances.
+
+        Args:
+            tes_urls: List of TES instance URLs.
+
+        Returns:
+            Dictionary of TES instance URLs and their service info; TES
+                instances without cached service info are omitted.
+        """
+        return {
+            doc["url"]: doc["service_info"]
+            for doc in self.db_client.find(
+                {"url": {"$in": tes_urls}},
+                {"_id": False, "url": True, "service_info": True},
+            )
+        }
+
+
+def fetch_service_info(url: str, timeout: float) -> Optional[dict]:
+    """Fetch service info of a TES instance.
+
+    Args:
+        url: TES instance URL.
+        timeout: Request timeout, in seconds.
+
+    Returns:
+        Service info, or `None` if it could not be fetched.
+    """
+    try:
+        response = requests.get(
+            f"{url.rstrip('/')}/{SERVICE_INFO_PATH}",
+            timeout=timeout,
+        )
+        response.raise_for_status()
+        service_info = response.json()
+    except (requests.RequestException, ValueError) as exc:
+        logger.warning(
+            f"Service info of TES instance at URL '{url}' could not be"
+            f" fetched: {type(exc).__name__}: {exc}"
+        )
+        return None
+    if not isinstance(service_info, dict):
+        logger.warning(
+            f"Service info of TES instance at URL '{url}' is malformed."
+        )
+        return None
+    return service_info
@@ -0,0 +1,124 @@
+"""Shared cache of TES instances chosen for task tag values."""
+
+from datetime import datetime
+import logging
+from typing import Optional
+
+from flask import current_app
+from pymongo.collection import Collection  # type: ignore
+from pymongo.errors import PyMongoError  # type: ignore
+
+logger = logging.getLogger(__name__)
+
+
+class StickyRoutes:
+    """Remember the TES instance tasks with a given tag value were sent to.
+
+    Routes are stored in a database collection, so that they are shared across
+    workers. Entries expire via a TTL index on `updated_at` (cf. collection
+    `sticky_routes` in the database config); in addition, the number of
+    entries is bounded by `max_entries`, evicting the least recently updated
+    ones.
+
+    Args:
+        collection: Database collection storing routes.
+        tag: Name of the task tag whose values routes are kept for.
+        max_entries: Maximum number of routes to keep.
+
+    Attributes:
+        collection: Database collection storing routes.
+        tag: Name of the task tag whose values routes are kept for.
+        max_entries: Maximum number of routes to keep.
+    """
+
+    def __init__(
+        self,
+        collection: Collection,
+        tag: str = "WORKFLOW_ID",
+        max_entries: int = 100000,
+    ) -> None:
+        """Construct object instance."""
+        self.collection: Collection = collection
+        self.tag: str = tag
+        self.max_entries: int = max_entries
+
+    @classmethod
+    def from_config(cls) -> "StickyRoutes":
+        """Create instance from config parameter `task_distribution.sticky`.
+
+        Returns:
+            Sticky routes, stored in collection `sticky_routes`.
+        """
+        task_distribution_config: dict = (
+            getattr(current_app.config.foca, "task_distribution", None) or {}
+        )
+        config: dict = task_distribution_config.get("sticky") or {}
+        return cls(
+            collection=current_app.config.foca.db.dbs["taskStore"]
+            .collections["sticky_routes"]
+            .client,
+            tag=config.get("tag", "WORKFLOW_ID"),
+            max_entries=config.get("max_entries", 100000),
+        )
+
+    def recall(self, tags: Optional[dict]) -> Optional[str]:
+        """Get TES instance for the tag value of a task.
+
+        Args:
+            tags: Task tags.
+
+        Returns:
+            TES instance URL, or `None` if the task has no value for the tag
+                or no route is known for it.
+        """
+        value = (tags or {}).get(self.tag)
+        if not value:
+            return None
+        doc = self.collection.find_one(
+            {"tag": self.tag, "value": value},
+            {"_id": False, "host": True},
+        )
+        return None if doc is None else doc["host"]
+
+    def remember(self, tags: Optional[dict], host: str) -> None:
+        """Remember TES instance a task was sent to.
+
+        Database errors are logged and otherwise ignored.
+
+        Args:
+            tags: Task tags.
+            host: TES instance URL the task was sent to.
+        """
+        value = (tags or {}).get(self.tag)
+        if not value:
+            return
+        try:
+            result = self.collection.update_one(
+                filter={"tag": self.tag, "value": value},
+                update={
+                    "$set": {
+                        "tag": self.tag,
+                        "value": value,
+                        "host": host,
+                        "updated_at": datetime.utcnow(),
+                    }
+                },
+                upsert=True,
+            )
+            if result.upserted_id is not None:
+                self._evict()
+        except PyMongoError as exc:
+            logger.debug(f"Route could not be remembered: {exc}")
+
+    def _evict(self) -> None:
+        """Remove least recently updated routes exceeding `max_entries`."""
+        excess = self.collection.estimated_document_count() - self.max_entries
+        if excess <= 0:
+            return
+        oldest = [
+            doc["_id"]
+            for doc in self.collection.find({}, {"_id": True})
+            .sort("updated_at", 1)
+            .limit(excess)
+        ]
+        self.collection.delete_many({"_id": {"$in": oldest}})
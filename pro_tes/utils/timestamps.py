@@ -0,0 +1,86 @@
+"""Utilities for handling task timestamps."""
+
+from datetime import datetime, timezone
+from typing import Optional, Union
+
+from dateutil.parser import parse as parse_time
+
+# format of timestamps written by earlier versions, in local time
+LEGACY_FORMAT = "%m-%d-%Y %H:%M:%S"
+
+
+def now() -> datetime:
+    """Get current time.
+
+    Returns:
+        Current time in UTC, truncated to milliseconds, the precision of
+            dates stored in the database.
+    """
+    timestamp = datetime.now(timezone.utc)
+    return timestamp.replace(microsecond=timestamp.microsecond // 1000 * 1000)
+
+
+def to_datetime(value: Union[datetime, str, None]) -> Optional[datetime]:
+    """Convert timestamp to `datetime` object in UTC.
+
+    Timestamps without time zone information are assumed to be in UTC, except
+    for timestamps in the legacy format, which were written in local time.
+
+    Args:
+        value: Timestamp as `datetime` object or string.
+
+    Returns:
+        Timestamp in UTC, or `None` if `value` is `None`.
+
+    Raises:
+        ValueError: If `value` cannot be parsed.
+    """
+    if value is None:
+        return None
+    if isinstance(value, str):
+        try:
+            value = datetime.strptime(value, LEGACY_FORMAT).astimezone()
+        except ValueError:
+            try:
+                value = parse_time(value)
+            except OverflowError as exc:
+                raise ValueError(f"Invalid timestamp: {value}") from exc
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def to_rfc3339(value: Union[datetime, str, None]) -> Optional[str]:
+    """Render timestamp in RFC 3339 format.
+
+    Args:
+        value: Timestamp as `datetime` object or string; `datetime` objects
+            without time zone information, as returned by the database, are
+            assumed to be in UTC.
+
+    Returns:
+        Timestamp in RFC 3339 format, in UTC, or `None` if `value` is `None`.
+    """
+    timestamp = to_datetime(value)
+    if timestamp is None:
+        return None
+    return timestamp.isoformat().replace("+00:00", "Z")
+
+
+def render_task_timestamps(task: dict) -> dict:
+    """Render timestamps of a task object in RFC 3339 format.
+
+    Args:
+        task: Task object, as stored in the database; modified in place.
+
+    Returns:
+        Task object with timestamps rendered as strings.
+    """
+    if "creation_time" in task:
+        task["creation_time"] = to_rfc3339(task["creation_time"])
+    for task_log in task.get("logs") or []:
+        for log in [task_log] + (task_log.get("logs") or []):
+            for key in ("start_time", "end_time"):
+                if key in log:
+                    log[key] = to_rfc3339(log[key])
+    return task
@@ -0,0 +1,159 @@
+"""Shared table of TES instance locations."""
+
+import logging
+from typing import Optional
+
+from flask import current_app
+from ip2geotools.models import IpLocation  # type: ignore
+from pymongo.collection import Collection  # type: ignore
+
+from pro_tes.utils.geolocation import (
+    create_ip_location,
+    get_ip_locations,
+    get_ips,
+)
+from pro_tes.utils.misc import upsert_by_field
+from pro_tes.utils.routing_cache import bump_routing_epoch
+
+logger = logging.getLogger(__name__)
+
+
+class TesTopology:
+    """Manage the locations of the configured TES instances.
+
+    Locations are computed in the background, starting at app initialization,
+    and refreshed periodically, so that task distribution middlewares only
+    need to resolve the locations of a task's inputs. Static locations can be
+    set for individual TES instances via config parameter `tes.locations`,
+    e.g.:
+
+        tes:
+          locations:
+            "https://tes.example.org":
+              latitude: 60.17
+              longitude: 24.94
+
+    Attributes:
+        db_client: Database collection storing TES instance locations.
+    """
+
+    def __init__(self) -> None:
+        """Construct class instance."""
+        self.db_client: Collection = (
+            current_app.config.foca.db.dbs["taskStore"]
+            .collections["tes_topology"]
+            .client
+        )
+
+    def refresh(self) -> None:
+        """Compute locations of all configured TES instances.
+
+        Locations that cannot be determined are logged and skipped; entries
+        of TES instances that are no longer configured are removed. If any
+        location changes, the routing epoch is advanced, invalidating cached
+        routing decisions.
+        """
+        tes_config: dict = current_app.config.foca.tes
+        tes_urls: list[str] = list(set(tes_config["service_list"]))
+        coordinates_before = self._get_coordinates()
+        static_locations: dict = tes_config.get("locations") or {}
+        for url in tes_urls:
+            if url in static_locations:
+                self._set_location(
+                    url=url,
+                    latitude=static_locations[url]["latitude"],
+                    longitude=static_locations[url]["longitude"],
+                    source="config",
+                )
+                continue
+            try:
+                ip_addr = get_ips(url)[url]
+                location = get_ip_locations(ip_addr)[ip_addr]
+            except ValueError as exc:
+                logger.warning(
+                    f"Location of TES instance at URL '{url}' could not be"
+                    f" determined: {exc}"
+                )
+                continue
+            self._set_location(
+                url=url,
+                latitude=location.latitude,
+                longitude=location.longitude,
+                source="lookup",
+                ip_addr=ip_addr,
+            )
+        self.db_client.delete_many({"url": {"$nin": tes_urls}})
+        logger.info("TES topology refreshed.")
+        if self._get_coordinates() != coordinates_before:
+            bump_routing_epoch()
+
+    def _get_coordinates(self) -> dict[str, tuple[float, float]]:
+        """Get coordinates of all TES instances in the table.
+
+        Returns:
+            Dictionary of TES instance URLs and their latitudes and
+                longitudes.
+        """
+        return {
+            doc["url"]: (doc["latitude"], doc["longitude"])
+            for doc in self.db_client.find(
+                {},
+                {
+                    "_id": False,
+                    "url": True,
+                    "latitude": True,
+                    "longitude": True,
+                },
+            )
+        }
+
+    def get_locations(self, tes_urls: list[str]) -> dict[str, IpLocation]:
+        """Get known locations of TES instances.
+
+        Args:
+            tes_urls: List of TES instance URLs.
+
+        Returns:
+            Dictionary of TES instance URLs and their locations; TES instances
+                with unknown locations are omitted.
+        """
+        return {
+            doc["url"]: create_ip_location(
+                latitude=doc["latitude"],
+                longitude=doc["longitude"],
+                ip_addr=doc.get("ip"),
+            )
+            for doc in self.db_client.find(
+                {"url": {"$in": tes_urls}},
+                {"_id": False},
+            )
+        }
+
+    def _set_location(  # pylint: disable=too-many-arguments
+        self,
+        url: str,
+        latitude: float,
+        longitude: float,
+        source: str,
+        ip_addr: Optional[str] = None,
+    ) -> None:
+        """Insert or update location of TES instance.
+
+        Args:
+            url: TES instance URL.
+            latitude: Latitude, in degrees.
+            longitude: Longitude, in degrees.
+            source: Source of the location; one of `config` and `lookup`.
+            ip_addr: IP address of the TES instance, if resolved.
+        """
+        upsert_by_field(
+            collection=self.db_client,
+            field="url",
+            value=url,
+            fields={
+                "ip": ip_addr,
+                "latitude": latitude,
+                "longitude": longitude,
+                "source": source,
+            },
+        )
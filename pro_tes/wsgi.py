@@ -2,4 +2,6 @@
 
 from pro_tes.app import init_app
 
+# Startup work and background jobs are run by a dedicated process (cf.
+# `services.py`)
 app = init_app()
@@ -0,0 +1 @@
+"""proTES benchmarks."""
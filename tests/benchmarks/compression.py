@@ -0,0 +1,124 @@
+"""Benchmark compression of task logs.
+
+Compares storage savings and decompression latency of the supported codecs
+for synthetic executor logs, i.e., timestamped log lines with a limited
+vocabulary, as typically written by bioinformatics tools. Zstandard is
+benchmarked with and without a dictionary trained on a separate set of logs.
+
+Usage:
+    python -m tests.benchmarks.compression [--logs 100] [--lines 2000]
+"""
+
+import argparse
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from timeit import timeit
+
+import numpy as np
+
+from pro_tes.utils.compression import LogCompressor, train_dictionary
+
+WORDS = (
+    "INFO WARNING DEBUG reading writing aligned reads sample chromosome"
+    " processed records bases quality filtered passed failed mapping index"
+    " sorting merging coverage variant calls threads memory elapsed"
+).split()
+
+
+def _random_logs(size: int, lines: int, rng: np.random.Generator) -> list:
+    """Create random executor logs.
+
+    Args:
+        size: Number of logs.
+        lines: Number of lines per log.
+        rng: Random number generator.
+
+    Returns:
+        List of logs.
+    """
+    logs = []
+    for _ in range(size):
+        seconds = np.cumsum(rng.integers(low=0, high=5, size=lines))
+        logs.append(
+            "\n".join(
+                f"[2024-03-01 {second // 3600 % 24:02d}:"
+                f"{second // 60 % 60:02d}:{second % 60:02d}] "
+                + " ".join(rng.choice(WORDS, size=6))
+                + f" {rng.integers(1e6)}"
+                for second in seconds
+            )
+        )
+    return logs
+
+
+def _benchmark(
+    name: str,
+    compressor: LogCompressor,
+    logs: list,
+    repeat: int,
+) -> None:
+    """Benchmark compressor and print results.
+
+    Args:
+        name: Name of the configuration.
+        compressor: Compressor to benchmark.
+        logs: Logs to compress.
+        repeat: Number of repetitions for timing decompression.
+    """
+    size = sum(len(log.encode()) for log in logs)
+    compressed = [compressor.compress(log) for log in logs]
+    size_compressed = sum(len(data) for data, _ in compressed)
+    seconds = timeit(
+        lambda: [
+            compressor.decompress(data=data, codec=codec)
+            for data, codec in compressed
+        ],
+        number=repeat,
+    )
+    print(
+        f"{name:<20} {size / size_compressed:>8.2f}x"
+        f" {seconds / repeat / len(logs) * 1e6:>10.1f} us/log"
+    )
+
+
+def main() -> None:
+    """Run benchmark and print results."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--logs", type=int, default=100)
+    parser.add_argument("--lines", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(seed=0)
+    logs = _random_logs(size=args.logs, lines=args.lines, rng=rng)
+    size = sum(len(log.encode()) for log in logs)
+    print(f"{args.logs} logs x {args.lines} lines; {size / 1e6:.1f} MB")
+    print(f"{'codec':<20} {'ratio':>9} {'decode':>16}")
+    for level in (1, 6, 9):
+        _benchmark(
+            name=f"zlib (level {level})",
+            compressor=LogCompressor(codec="zlib", level=level),
+            logs=logs,
+            repeat=args.repeat,
+        )
+    for level in (3, 9, 19):
+        _benchmark(
+            name=f"zstd (level {level})",
+            compressor=LogCompressor(codec="zstd", level=level),
+            logs=logs,
+            repeat=args.repeat,
+        )
+    samples = _random_logs(size=args.logs, lines=args.lines // 10, rng=rng)
+    with TemporaryDirectory() as tmp_dir:
+        path = Path(tmp_dir) / "logs.dict"
+        path.write_bytes(train_dictionary(samples=samples))
+        _benchmark(
+            name="zstd + dict (3)",
+            compressor=LogCompressor(codec="zstd", dictionary=str(path)),
+            logs=logs,
+            repeat=args.repeat,
+        )
+
+
+if __name__ == "__main__":
+    main()
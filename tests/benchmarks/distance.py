@@ -0,0 +1,121 @@
+"""Benchmark distance calculations of the distance-based middleware.
+
+Compares the vectorized distance matrix computation against per-pair geodesic
+distance calculations for randomly placed TES instances and task inputs.
+
+Usage:
+    python -m tests.benchmarks.distance [--inputs 1000] [--instances 50]
+"""
+
+import argparse
+from timeit import timeit
+
+from geopy.distance import geodesic  # type: ignore
+from ip2geotools.models import IpLocation  # type: ignore
+import numpy as np
+
+from pro_tes.plugins.middlewares.task_distribution.distance import (
+    DISTANCE_METHODS,
+    TaskDistributionDistance,
+)
+
+
+def _random_locations(size: int, rng: np.random.Generator) -> list:
+    """Create random IP locations.
+
+    Args:
+        size: Number of locations.
+        rng: Random number generator.
+
+    Returns:
+        List of IP locations.
+    """
+    locations = []
+    for latitude, longitude in rng.uniform(
+        low=(-80, -180), high=(80, 180), size=(size, 2)
+    ):
+        location = IpLocation(ip_address=None)
+        location.latitude = latitude
+        location.longitude = longitude
+        locations.append(location)
+    return locations
+
+
+def _rank_geodesic(nodes: list, leaves: list) -> list[int]:
+    """Rank nodes by total geodesic distance to leaves in Python loops.
+
+    Args:
+        nodes: List of node locations.
+        leaves: List of leaf locations.
+
+    Returns:
+        Node indices ranked by total distance, in ascending order.
+    """
+    totals = [
+        sum(
+            geodesic(
+                (node.latitude, node.longitude),
+                (leaf.latitude, leaf.longitude),
+            ).km
+            for leaf in leaves
+        )
+        for node in nodes
+    ]
+    return sorted(range(len(nodes)), key=lambda index: totals[index])
+
+
+def _rank_vectorized(nodes: list, leaves: list, method: str) -> list[int]:
+    """Rank nodes by total distance to leaves in one vectorized pass.
+
+    Args:
+        nodes: List of node locations.
+        leaves: List of leaf locations.
+        method: Distance calculation method.
+
+    Returns:
+        Node indices ranked by total distance, in ascending order.
+    """
+    # pylint: disable=protected-access
+    distances = TaskDistributionDistance._get_distances(
+        nodes=nodes,
+        leaves=leaves,
+        method=method,
+    )
+    return np.argsort(distances.sum(axis=1), kind="stable").tolist()
+
+
+def main() -> None:
+    """Run benchmark and print results."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--inputs", type=int, default=1000)
+    parser.add_argument("--instances", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(seed=0)
+    nodes = _random_locations(size=args.instances, rng=rng)
+    leaves = _random_locations(size=args.inputs, rng=rng)
+    print(f"{args.instances} TES instances x {args.inputs} inputs")
+
+    ranking_geodesic = _rank_geodesic(nodes=nodes, leaves=leaves)
+    seconds = timeit(
+        lambda: _rank_geodesic(nodes=nodes, leaves=leaves),
+        number=args.repeat,
+    )
+    print(f"{'geodesic (loop)':<20} {seconds / args.repeat * 1000:>10.2f} ms")
+    for method in DISTANCE_METHODS:
+        ranking = _rank_vectorized(nodes=nodes, leaves=leaves, method=method)
+        seconds = timeit(
+            lambda method=method: _rank_vectorized(
+                nodes=nodes, leaves=leaves, method=method
+            ),
+            number=args.repeat,
+        )
+        print(
+            f"{method + ' (numpy)':<20} {seconds / args.repeat * 1000:>10.2f}"
+            f" ms; same ranking: {ranking == ranking_geodesic}"
+        )
+
+
+if __name__ == "__main__":
+    main()
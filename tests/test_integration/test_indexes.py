@@ -0,0 +1,125 @@
+"""Integration tests asserting that database queries use indexes.
+
+Requires a MongoDB instance at `localhost:27017`, e.g., as started via
+`docker-compose up`.
+"""
+
+from typing import Iterator
+
+from bson.objectid import ObjectId  # type: ignore
+from pymongo import MongoClient  # type: ignore
+from pymongo.collection import Collection  # type: ignore
+import pytest
+
+from pro_tes.ga4gh.tes.states import States
+from pro_tes.utils.indexes import TASKS_INDEXES, ensure_indexes
+
+# queries issued against the tasks collection: filter, sort
+QUERIES = {
+    "get_task": ({"task.id": "ABC123"}, None),
+    "cancel_task": ({"task.id": "ABC123"}, None),
+    "track_task": ({"worker_id": "worker"}, None),
+    "acquire": ({"worker_id": "worker", "in_flight": {"$ne": True}}, None),
+    "release": ({"worker_id": "worker", "in_flight": True}, None),
+    "rebuild_load": ({"in_flight": True}, None),
+    "list_tasks": ({"user_id": None}, [("_id", -1)]),
+    "list_tasks_page": (
+        {"user_id": "user", "_id": {"$lt": ObjectId()}},
+        [("_id", -1)],
+    ),
+    "list_tasks_name_prefix": (
+        {"user_id": "user", "task_original.name": {"$regex": "^task"}},
+        [("_id", -1)],
+    ),
+    "list_tasks_state": (
+        {"user_id": "user", "task.state": "RUNNING"},
+        [("_id", -1)],
+    ),
+    "list_tasks_tes_endpoint": (
+        {"user_id": "user", "tes_endpoint.host": "https://tes.org/"},
+        [("_id", -1)],
+    ),
+    "list_tasks_tag": (
+        {
+            "user_id": "user",
+            "tag_list": {
+                "$all": [{"$elemMatch": {"key": "project", "value": "a"}}]
+            },
+        },
+        [("_id", -1)],
+    ),
+    "list_tasks_tag_key": (
+        {
+            "user_id": "user",
+            "tag_list": {"$all": [{"$elemMatch": {"key": "project"}}]},
+        },
+        [("_id", -1)],
+    ),
+    "list_tasks_created": (
+        {
+            "user_id": "user",
+            "_id": {"$gte": ObjectId(), "$lt": ObjectId()},
+        },
+        [("_id", -1)],
+    ),
+    "archive_tasks": (
+        {
+            "_id": {"$lt": ObjectId()},
+            "task.state": {"$in": States.FINISHED},
+            "in_flight": {"$ne": True},
+            "finalized": {"$ne": False},
+        },
+        None,
+    ),
+}
+
+
+@pytest.fixture(name="collection")
+def fixture_collection() -> Iterator[Collection]:
+    """Provide tasks collection with managed indexes and some documents."""
+    client: MongoClient = MongoClient(
+        "mongodb://localhost:27017", serverSelectionTimeoutMS=2000
+    )
+    collection = client["taskStore_test_indexes"]["tasks"]
+    collection.drop()
+    collection.insert_many(
+        [
+            {
+                "task": {
+                    "id": f"TASK{i}",
+                    "state": "RUNNING" if i % 4 else "COMPLETE",
+                    "tags": {"project": f"{i % 5}"},
+                },
+                "task_original": {"name": f"task{i}"},
+                "worker_id": f"worker{i}",
+                "user_id": "user" if i % 2 else None,
+                "in_flight": i % 3 == 0,
+                "tes_endpoint": {"host": f"https://tes{i % 3}.org/"},
+                "tag_list": [{"key": "project", "value": f"{i % 5}"}],
+            }
+            for i in range(100)
+        ]
+    )
+    ensure_indexes(collection=collection, indexes=TASKS_INDEXES)
+    yield collection
+    client.drop_database("taskStore_test_indexes")
+
+
+def get_stages(plan: dict) -> Iterator[str]:
+    """Get names of all stages of a query plan."""
+    yield plan["stage"]
+    for child in [plan.get("inputStage")] + plan.get("inputStages", []):
+        if child is not None:
+            yield from get_stages(child)
+
+
+@pytest.mark.parametrize("name", QUERIES)
+def test_query_uses_index(collection, name):
+    """Test that queries are answered by index scans."""
+    filter_dict, sort = QUERIES[name]
+    cursor = collection.find(filter_dict)
+    if sort is not None:
+        cursor = cursor.sort(sort)
+    stages = set(get_stages(cursor.explain()["queryPlanner"]["winningPlan"]))
+    assert "COLLSCAN" not in stages
+    assert "IXSCAN" in stages
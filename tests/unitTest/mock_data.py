@@ -1,5 +1,8 @@
 """Mock data for Testing."""
 
+from foca.models.config import MongoConfig
+import mongomock
+
 DB = "taskStore"
 
 INDEX_CONFIG_TASKS = {"keys": [("task_id", 1), ("worker_id", 1)]}
@@ -14,10 +17,54 @@ COLLECTION_CONFIG_SERVICE_INFO = {
     "indexes": [INDEX_CONFIG_SERVICE_INFO],
 }
 
+COLLECTION_CONFIG_TES_TOPOLOGY = {
+    "indexes": [{"keys": [("url", 1)], "options": {"unique": True}}],
+}
+
+COLLECTION_CONFIG_INPUT_SIZES = {
+    "indexes": [{"keys": [("uri", 1)], "options": {"unique": True}}],
+}
+
+COLLECTION_CONFIG_TES_LATENCIES = {
+    "indexes": [{"keys": [("host", 1)], "options": {"unique": True}}],
+}
+
+COLLECTION_CONFIG_TES_HISTORY = {
+    "indexes": [
+        {"keys": [("host", 1), ("key", 1)], "options": {"unique": True}}
+    ],
+}
+
+COLLECTION_CONFIG_TES_SERVICE_INFO = {
+    "indexes": [{"keys": [("url", 1)], "options": {"unique": True}}],
+}
+
+COLLECTION_CONFIG_COUNTERS = {
+    "indexes": [{"keys": [("name", 1)], "options": {"unique": True}}],
+}
+
+COLLECTION_CONFIG_STICKY_ROUTES = {
+    "indexes": [
+        {"keys": [("tag", 1), ("value", 1)], "options": {"unique": True}}
+    ],
+}
+
+COLLECTION_CONFIG_TES_HEALTH = {
+    "indexes": [{"keys": [("url", 1)], "options": {"unique": True}}],
+}
+
 DB_CONFIG = {
     "collections": {
         "tasks": COLLECTION_CONFIG_TASKS,
         "service_info": COLLECTION_CONFIG_SERVICE_INFO,
+        "tes_topology": COLLECTION_CONFIG_TES_TOPOLOGY,
+        "input_sizes": COLLECTION_CONFIG_INPUT_SIZES,
+        "tes_latencies": COLLECTION_CONFIG_TES_LATENCIES,
+        "tes_history": COLLECTION_CONFIG_TES_HISTORY,
+        "tes_service_info": COLLECTION_CONFIG_TES_SERVICE_INFO,
+        "counters": COLLECTION_CONFIG_COUNTERS,
+        "sticky_routes": COLLECTION_CONFIG_STICKY_ROUTES,
+        "tes_health": COLLECTION_CONFIG_TES_HEALTH,
     },
 }
 
@@ -67,6 +114,16 @@ MONGO_CONFIG = {
     },
 }
 
+
+def get_mongo_config() -> MongoConfig:
+    """Create database config with collections backed by `mongomock`."""
+    config = MongoConfig(**MONGO_CONFIG)
+    client = mongomock.MongoClient()
+    for name, collection in config.dbs[DB].collections.items():
+        collection.client = client.db[name]
+    return config
+
+
 MOCK_HEADERS = {
     "Accept": "application/json",
     "Content-Type": "application/json",
@@ -0,0 +1,8 @@
+"""Fixtures and setup for tests of the TES API controllers."""
+
+import sys
+from unittest.mock import MagicMock
+
+# controllers import the Celery app, which connects to the database at import
+# time; tests do not submit jobs, so it is replaced by a mock
+sys.modules.setdefault("pro_tes.celery_worker", MagicMock())
@@ -0,0 +1,304 @@
+"""Unit tests for TES API server-side controller methods."""
+
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+import unittest
+
+from bson.objectid import ObjectId  # type: ignore
+from flask import Flask
+from foca.models.config import Config
+import mongomock
+import pytest
+
+from pro_tes.exceptions import BadRequest, TaskNotFound
+from pro_tes.ga4gh.tes.task_runs import TaskRuns
+from pro_tes.utils.cache import finished_task_cache
+from pro_tes.utils.pagination import task_count_cache
+from tests.unitTest.mock_data import (
+    CONTROLLER_CONFIG,
+    TES_CONFIG,
+    get_mongo_config,
+)
+
+START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+TES_A = "https://a.tes/"
+TES_B = "https://b.tes/"
+
+
+class TaskRunsTestCase(unittest.TestCase):
+    """Base class for tests of controller methods, providing tasks."""
+
+    app = Flask(__name__)
+
+    def setUp(self):
+        """Set up the test environment."""
+        task_count_cache.clear()
+        finished_task_cache.clear()
+        self.app.config.foca = Config(
+            db=get_mongo_config(),
+            controllers=CONTROLLER_CONFIG,
+            tes=TES_CONFIG,
+            storeLogs={"execution_trace": False},
+        )
+        self.collection = mongomock.MongoClient().db.tasks
+        self.app.config.foca.db.dbs["taskStore"].collections[
+            "tasks"
+        ].client = self.collection
+        for index in range(8):
+            self.collection.insert_one(
+                {
+                    "_id": ObjectId.from_datetime(
+                        START + timedelta(hours=index)
+                    ),
+                    "user_id": None,
+                    "task": {
+                        "id": f"TASK{index}",
+                        "state": "RUNNING" if index % 2 else "COMPLETE",
+                        "creation_time": (
+                            START + timedelta(hours=index)
+                        ).replace(tzinfo=None),
+                    },
+                    "task_original": {"name": f"task{index}"},
+                    "tes_endpoint": {"host": TES_A if index < 4 else TES_B},
+                    "tag_list": (
+                        [
+                            {"key": "project", "value": f"{index % 3}"},
+                            {"key": "flag", "value": ""},
+                        ]
+                        if index % 2
+                        else []
+                    ),
+                }
+            )
+
+
+class TestListTasks(TaskRunsTestCase):
+    """Test filtering of task lists."""
+
+    def list_ids(self, **kwargs) -> list[str]:
+        """List identifiers of tasks matching filters."""
+        with self.app.app_context():
+            response = TaskRuns().list_tasks(view="MINIMAL", **kwargs)
+        return [task["id"] for task in response["tasks"]]
+
+    def test_state(self):
+        """Test filtering by state."""
+        assert self.list_ids(state="RUNNING", page_size=10) == [
+            "TASK7",
+            "TASK5",
+            "TASK3",
+            "TASK1",
+        ]
+
+    def test_tes_endpoint_host(self):
+        """Test filtering by TES endpoint host."""
+        assert self.list_ids(tes_endpoint_host=TES_A, page_size=10) == [
+            "TASK3",
+            "TASK2",
+            "TASK1",
+            "TASK0",
+        ]
+
+    def test_tags(self):
+        """Test filtering by tag keys and values."""
+        assert self.list_ids(
+            tag_key=["project", "flag"], tag_value=["1"], page_size=10
+        ) == ["TASK7", "TASK1"]
+        assert self.list_ids(tag_key=["flag"], page_size=10) == [
+            "TASK7",
+            "TASK5",
+            "TASK3",
+            "TASK1",
+        ]
+
+    def test_tags_invalid(self):
+        """Test that more tag values than keys are rejected."""
+        with pytest.raises(BadRequest):
+            self.list_ids(tag_key=["project"], tag_value=["1", "2"])
+
+    def test_created_range(self):
+        """Test filtering by creation time."""
+        assert self.list_ids(
+            created_after=(START + timedelta(hours=2)).isoformat(),
+            created_before=(START + timedelta(hours=5)).isoformat(),
+        ) == ["TASK4", "TASK3", "TASK2"]
+
+    def test_created_invalid(self):
+        """Test that invalid creation times are rejected."""
+        with pytest.raises(BadRequest):
+            self.list_ids(created_after="yesterday-ish")
+
+    def test_page_token_with_filters(self):
+        """Test that page tokens are combined with and bound to filters."""
+        filters = {
+            "state": "RUNNING",
+            "created_before": (START + timedelta(hours=7)).isoformat(),
+        }
+        with self.app.app_context():
+            first = TaskRuns().list_tasks(
+                view="MINIMAL", page_size=2, **filters
+            )
+            second = TaskRuns().list_tasks(
+                view="MINIMAL",
+                page_size=2,
+                page_token=first["next_page_token"],
+                **filters,
+            )
+            with pytest.raises(BadRequest):
+                TaskRuns().list_tasks(
+                    view="MINIMAL",
+                    page_size=2,
+                    page_token=first["next_page_token"],
+                    state="RUNNING",
+                )
+        assert [task["id"] for task in first["tasks"]] == ["TASK5", "TASK3"]
+        assert [task["id"] for task in second["tasks"]] == ["TASK1"]
+        assert second["next_page_token"] == ""
+
+    def test_last_page_token_empty(self):
+        """Test that no page token is returned for a full last page."""
+        with self.app.app_context():
+            response = TaskRuns().list_tasks(
+                view="MINIMAL", state="RUNNING", page_size=4
+            )
+        assert len(response["tasks"]) == 4
+        assert response["next_page_token"] == ""
+
+    def test_total_size(self):
+        """Test that the number of matching tasks is returned if requested."""
+        with self.app.app_context():
+            response = TaskRuns().list_tasks(
+                view="MINIMAL",
+                tes_endpoint_host=TES_B,
+                page_size=1,
+                include_total_size=True,
+            )
+            assert "total_size" not in TaskRuns().list_tasks(view="MINIMAL")
+        assert response["total_size"] == 4
+        assert len(response["tasks"]) == 1
+
+    def test_timestamps_rendered(self):
+        """Test that timestamps are rendered in RFC 3339 format."""
+        with self.app.test_request_context():
+            task = TaskRuns().get_task(id="TASK1")
+            tasks = TaskRuns().list_tasks(view="BASIC", page_size=1)["tasks"]
+        assert task["creation_time"] == "2024-01-01T01:00:00Z"
+        assert tasks[0]["creation_time"] == "2024-01-01T07:00:00Z"
+
+
+class TestGetTask(TaskRunsTestCase):
+    """Test conditional requests and caching of individual tasks."""
+
+    def get_task(self, task_id: str, etag: Optional[str] = None):
+        """Get task and response, optionally conditional on an ETag."""
+        headers = {} if etag is None else {"If-None-Match": f'"{etag}"'}
+        with self.app.test_request_context(headers=headers):
+            result = TaskRuns().get_task(id=task_id)
+            response = self.app.process_response(
+                self.app.make_response(result)
+            )
+        return result, response
+
+    def test_etag(self):
+        """Test that ETags change with document versions."""
+        _, response = self.get_task(task_id="TASK1")
+        etag = response.get_etag()[0]
+        assert response.status_code == 200
+        _, response = self.get_task(task_id="TASK1", etag=etag)
+        assert response.status_code == 304
+        assert response.get_etag()[0] == etag
+        self.collection.update_one(
+            {"task.id": "TASK1"},
+            {"$set": {"task.state": "PAUSED"}, "$inc": {"version": 1}},
+        )
+        task, response = self.get_task(task_id="TASK1", etag=etag)
+        assert response.status_code == 200
+        assert response.get_etag()[0] != etag
+        assert task["state"] == "PAUSED"
+
+    def test_finished_tasks_cached(self):
+        """Test that only finalized tasks are cached."""
+        self.collection.update_one(
+            {"task.id": "TASK0"}, {"$set": {"finalized": True}}
+        )
+        self.get_task(task_id="TASK0")
+        self.get_task(task_id="TASK1")
+        self.collection.delete_many({})
+        task, response = self.get_task(task_id="TASK0")
+        assert task["state"] == "COMPLETE"
+        _, response = self.get_task(
+            task_id="TASK0", etag=response.get_etag()[0]
+        )
+        assert response.status_code == 304
+        with pytest.raises(TaskNotFound):
+            self.get_task(task_id="TASK1")
+
+    def test_full_view_not_cached(self):
+        """Test that only versions of tasks in FULL view are cached."""
+        self.collection.update_one(
+            {"task.id": "TASK0"}, {"$set": {"finalized": True}}
+        )
+        with self.app.test_request_context():
+            TaskRuns().get_task(id="TASK0", view="FULL")
+        assert finished_task_cache.get(key=("TASK0", "FULL")) == (None, 0)
+        self.collection.delete_many({})
+        headers = {"If-None-Match": '"0-full"'}
+        with self.app.test_request_context(headers=headers):
+            response = TaskRuns().get_task(id="TASK0", view="FULL")
+        assert response.status_code == 304
+        with self.app.test_request_context():
+            with pytest.raises(TaskNotFound):
+                TaskRuns().get_task(id="TASK0", view="FULL")
+
+    def test_blobs_loaded_for_full_view(self):
+        """Test that fields stored as blobs are only loaded in FULL view."""
+        self.collection.database["task_blobs"].insert_one(
+            {"_id": "blob", "data": "output"}
+        )
+        self.collection.update_one(
+            {"task.id": "TASK2"},
+            {
+                "$set": {
+                    "task.logs": [{"logs": [{"exit_code": 0}]}],
+                    "blobs": [
+                        {"path": "task.logs.0.logs.0.stdout", "id": "blob"}
+                    ],
+                }
+            },
+        )
+        with self.app.test_request_context():
+            full = TaskRuns().get_task(id="TASK2", view="FULL")
+            basic = TaskRuns().get_task(id="TASK2", view="BASIC")
+        assert full["logs"][0]["logs"][0]["stdout"] == "output"
+        assert "stdout" not in basic["logs"][0]["logs"][0]
+
+    def test_archived_task(self):
+        """Test that archived tasks are found, but not listed."""
+        document = self.collection.find_one_and_delete({"task.id": "TASK2"})
+        self.collection.database["tasks_archive"].insert_one(document)
+        task, response = self.get_task(task_id="TASK2")
+        assert task["id"] == "TASK2"
+        assert response.status_code == 200
+        with self.app.test_request_context():
+            assert TaskRuns().cancel_task(id="TASK2") == {}
+            tasks = TaskRuns().list_tasks()["tasks"]
+        assert "TASK2" not in [task["id"] for task in tasks]
+
+    def test_unfinalized_tasks_not_cached(self):
+        """Test that finished tasks are not cached before being finalized."""
+        self.collection.update_one(
+            {"task.id": "TASK0"}, {"$set": {"task.state": "CANCELED"}}
+        )
+        _, response = self.get_task(task_id="TASK0")
+        etag = response.get_etag()[0]
+        self.collection.update_one(
+            {"task.id": "TASK0"},
+            {
+                "$set": {"task.logs": [{"logs": []}], "finalized": True},
+                "$inc": {"version": 1},
+            },
+        )
+        task, response = self.get_task(task_id="TASK0", etag=etag)
+        assert response.status_code == 200
+        assert task["logs"] == [{"logs": []}]
+        assert finished_task_cache.get(key=("TASK0", "BASIC")) is not None
@@ -0,0 +1,137 @@
+"""Unit tests for asynchronous middlewares."""
+
+import asyncio
+from time import monotonic
+from typing import Optional
+import unittest
+
+import flask
+from flask import Flask
+from foca.models.config import Config
+import pytest
+
+from pro_tes.exceptions import InvalidMiddleware
+from pro_tes.middleware.abstract_middleware import AbstractMiddleware
+from pro_tes.middleware.async_middleware import (
+    AbstractAsyncMiddleware,
+    MiddlewareContext,
+)
+from pro_tes.middleware.middleware_handler import MiddlewareHandler
+from tests.unitTest.mock_data import get_mongo_config
+
+MODULE = "tests.unitTest.pro_tes.middleware.test_async_middleware"
+TES_URLS = ["https://a.tes", "https://b.tes"]
+
+
+class SlowAsyncMiddleware(AbstractAsyncMiddleware):
+    """Asynchronous middleware waiting for a lookup."""
+
+    async def apply(self, payload: dict, context: MiddlewareContext) -> dict:
+        """Set TES URLs after a delay."""
+        await asyncio.sleep(0.3)
+        payload["tes_urls"] = context.tes_urls
+        return payload
+
+
+class SlowTagMiddleware(AbstractAsyncMiddleware):
+    """Asynchronous middleware setting a tag after a delay."""
+
+    async def apply(self, payload: dict, context: MiddlewareContext) -> dict:
+        """Set tag after a delay."""
+        await asyncio.sleep(0.3)
+        payload["tags"] = {**(payload.get("tags") or {}), "slow": "yes"}
+        return payload
+
+
+class NameMiddleware(AbstractMiddleware):
+    """Synchronous middleware changing the task name."""
+
+    def apply_middleware(self, request: flask.Request) -> flask.Request:
+        """Set task name."""
+        request.json["name"] = "renamed"
+        return request
+
+
+class HeaderMiddleware(AbstractMiddleware):
+    """Synchronous middleware reading request headers."""
+
+    def apply_middleware(self, request: flask.Request) -> flask.Request:
+        """Set task description from request header."""
+        request.json["description"] = request.headers.get("X-Team")
+        return request
+
+
+class TestAsyncMiddleware(unittest.TestCase):
+    """Test application of asynchronous and parallel middlewares."""
+
+    app = Flask(__name__)
+
+    def setUp(self):
+        """Set up the test environment."""
+        self.app.config.foca = Config(
+            db=get_mongo_config(),
+            tes={"service_list": TES_URLS},
+        )
+
+    def apply_middlewares(
+        self,
+        chain: list,
+        payload: dict,
+        headers: Optional[dict] = None,
+    ) -> dict:
+        """Apply middlewares and return payload."""
+        handler = MiddlewareHandler()
+        handler.set_config({"chain": chain})
+        with self.app.test_request_context(json=payload, headers=headers):
+            request = handler.apply_middlewares(request=flask.request)
+            return request.json
+
+    def test_async_middleware(self):
+        """Test that asynchronous middlewares are applied like others."""
+        payload = self.apply_middlewares(
+            chain=[f"{MODULE}.SlowAsyncMiddleware"], payload={"name": "task"}
+        )
+        assert payload == {"name": "task", "tes_urls": TES_URLS}
+
+    def test_parallel_middlewares(self):
+        """Test that independent middlewares are applied concurrently."""
+        start = monotonic()
+        payload = self.apply_middlewares(
+            chain=[
+                {
+                    "parallel": [
+                        f"{MODULE}.SlowAsyncMiddleware",
+                        f"{MODULE}.SlowTagMiddleware",
+                        f"{MODULE}.NameMiddleware",
+                    ]
+                }
+            ],
+            payload={"name": "task", "tags": {"a": "b"}},
+        )
+        assert monotonic() - start < 0.55
+        assert payload == {
+            "name": "renamed",
+            "tags": {"a": "b", "slow": "yes"},
+            "tes_urls": TES_URLS,
+        }
+
+    def test_parallel_sync_middleware_request(self):
+        """Test that synchronous middlewares get the incoming request."""
+        payload = self.apply_middlewares(
+            chain=[
+                {
+                    "parallel": [
+                        f"{MODULE}.HeaderMiddleware",
+                        f"{MODULE}.NameMiddleware",
+                    ]
+                }
+            ],
+            payload={"name": "task"},
+            headers={"X-Team": "genomics"},
+        )
+        assert payload == {"name": "renamed", "description": "genomics"}
+
+    def test_invalid_parallel_group(self):
+        """Test that malformed groups of parallel middlewares are rejected."""
+        with pytest.raises(InvalidMiddleware):
+            MiddlewareHandler().set_middlewares([{"parallel": []}])
@@ -0,0 +1,116 @@
+"""Unit tests for vectorized distance calculations."""
+
+import unittest
+
+from flask import Flask
+from foca.models.config import Config
+from ip2geotools.models import IpLocation
+import numpy as np
+import pytest
+
+from pro_tes.exceptions import MiddlewareException
+from pro_tes.plugins.middlewares.task_distribution.distance import (
+    TaskDistributionDistance,
+    TaskInput,
+    TesInstance,
+)
+
+# latitudes and longitudes of Helsinki, Brno and Athens
+HELSINKI = (60.1699, 24.9384)
+BRNO = (49.1951, 16.6068)
+ATHENS = (37.9838, 23.7275)
+
+# geodesic distances on the WGS-84 ellipsoid, in kilometers
+DISTANCE_HELSINKI_BRNO = 1332.2
+DISTANCE_HELSINKI_ATHENS = 2468.8
+
+
+def _location(latitude: float, longitude: float) -> IpLocation:
+    """Create IP location from coordinates."""
+    location = IpLocation(ip_address=None)
+    location.latitude = latitude
+    location.longitude = longitude
+    return location
+
+
+class TestDistanceMatrix(unittest.TestCase):
+    """Test vectorized distance matrix computation."""
+
+    app = Flask(__name__)
+
+    def setUp(self):
+        """Set up the test environment."""
+        self.app.config.foca = Config(
+            task_distribution={"distance": {"method": "lambert"}},
+        )
+
+    def test_get_distances_shape(self):
+        """Test that distances are returned as instance-by-input matrix."""
+        distances = TaskDistributionDistance._get_distances(
+            nodes=[_location(*HELSINKI), _location(*BRNO)],
+            leaves=[
+                _location(*HELSINKI),
+                _location(*BRNO),
+                _location(*ATHENS),
+            ],
+        )
+        assert distances.shape == (2, 3)
+        assert distances[0, 0] == 0.0
+        assert distances[1, 1] == 0.0
+        assert np.isclose(distances[0, 1], distances[1, 0])
+
+    def test_get_distances_lambert(self):
+        """Test that Lambert's formula approximates geodesic distances."""
+        distances = TaskDistributionDistance._get_distances(
+            nodes=[_location(*HELSINKI)],
+            leaves=[_location(*BRNO), _location(*ATHENS)],
+            method="lambert",
+        )
+        assert np.allclose(
+            distances[0],
+            [DISTANCE_HELSINKI_BRNO, DISTANCE_HELSINKI_ATHENS],
+            rtol=1e-3,
+        )
+
+    def test_get_distances_haversine(self):
+        """Test that haversine distances are close to geodesic distances."""
+        distances = TaskDistributionDistance._get_distances(
+            nodes=[_location(*HELSINKI)],
+            leaves=[_location(*BRNO), _location(*ATHENS)],
+            method="haversine",
+        )
+        assert np.allclose(
+            distances[0],
+            [DISTANCE_HELSINKI_BRNO, DISTANCE_HELSINKI_ATHENS],
+            rtol=1e-2,
+        )
+
+    def test_rank_tes_instances(self):
+        """Test that TES instances are ranked by total distance."""
+        middleware = TaskDistributionDistance()
+        middleware.task_summary.tes_instances = {
+            "https://athens.tes": TesInstance(location=_location(*ATHENS)),
+            "https://helsinki.tes": TesInstance(location=_location(*HELSINKI)),
+            "https://brno.tes": TesInstance(location=_location(*BRNO)),
+        }
+        middleware.task_summary.inputs = {
+            "ftp://helsinki.data/1": TaskInput(location=_location(*HELSINKI)),
+            "ftp://helsinki.data/2": TaskInput(location=_location(*HELSINKI)),
+            "ftp://brno.data/1": TaskInput(location=_location(*BRNO)),
+        }
+        with self.app.app_context():
+            middleware._set_distances()
+        assert middleware._rank_tes_instances() == [
+            "https://helsinki.tes",
+            "https://brno.tes",
+            "https://athens.tes",
+        ]
+
+    def test_unsupported_method(self):
+        """Test that an unsupported distance method raises an exception."""
+        self.app.config.foca = Config(
+            task_distribution={"distance": {"method": "manhattan"}},
+        )
+        with self.app.app_context():
+            with pytest.raises(MiddlewareException):
+                TaskDistributionDistance._get_distance_method()
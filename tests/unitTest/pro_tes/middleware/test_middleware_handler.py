@@ -0,0 +1,201 @@
+"""Unit tests for the middleware handler."""
+
+from time import sleep
+import unittest
+
+import flask
+from flask import Flask
+import pytest
+
+from pro_tes.exceptions import MiddlewareException
+from pro_tes.middleware.abstract_middleware import AbstractMiddleware
+from pro_tes.middleware.middleware_handler import MiddlewareHandler
+from pro_tes.utils.metrics import metrics
+
+MODULE = "tests.unitTest.pro_tes.middleware.test_middleware_handler"
+
+
+class SlowMiddleware(AbstractMiddleware):
+    """Middleware that takes a while to be applied."""
+
+    def apply_middleware(self, request: flask.Request) -> flask.Request:
+        """Set TES URLs after a delay."""
+        sleep(0.5)
+        request.json["tes_urls"] = ["https://slow.tes"]
+        return request
+
+
+class FastMiddleware(AbstractMiddleware):
+    """Middleware that is applied instantly."""
+
+    def apply_middleware(self, request: flask.Request) -> flask.Request:
+        """Set TES URLs."""
+        request.json["tes_urls"] = ["https://fast.tes"]
+        return request
+
+
+class FallbackMiddleware(AbstractMiddleware):
+    """Middleware that takes a short while to be applied."""
+
+    def apply_middleware(self, request: flask.Request) -> flask.Request:
+        """Set TES URLs after a short delay."""
+        sleep(0.02)
+        request.json["tes_urls"] = ["https://fallback.tes"]
+        return request
+
+
+class FailingMiddleware(AbstractMiddleware):
+    """Middleware that cannot be applied."""
+
+    def apply_middleware(self, request: flask.Request) -> flask.Request:
+        """Raise exception."""
+        raise ValueError("failed")
+
+
+class TestMiddlewareHandler(unittest.TestCase):
+    """Test application of middlewares with time budgets."""
+
+    app = Flask(__name__)
+
+    def setUp(self):
+        """Set up the test environment."""
+        metrics.reset()
+
+    def test_set_config_list(self):
+        """Test that a plain list of middleware paths is accepted."""
+        handler = MiddlewareHandler()
+        handler.set_config([f"{MODULE}.FastMiddleware"])
+        assert handler.middlewares == [[FastMiddleware]]
+        assert handler.timeout_chain is None
+
+    def test_uses(self):
+        """Test that alternatives and parallel middlewares are found."""
+        handler = MiddlewareHandler()
+        handler.set_config(
+            [
+                [f"{MODULE}.SlowMiddleware", f"{MODULE}.FastMiddleware"],
+                {"parallel": [f"{MODULE}.FallbackMiddleware"]},
+            ]
+        )
+        assert handler.uses(middleware=FastMiddleware)
+        assert handler.uses(middleware=FallbackMiddleware)
+        assert not handler.uses(middleware=FailingMiddleware)
+
+    def test_apply_middlewares_without_timeouts(self):
+        """Test that middlewares without time budgets are applied."""
+        handler = MiddlewareHandler()
+        handler.set_config(
+            {
+                "chain": [
+                    [f"{MODULE}.SlowMiddleware", f"{MODULE}.FastMiddleware"]
+                ]
+            }
+        )
+        with self.app.test_request_context(json={"name": "task"}):
+            request = handler.apply_middlewares(request=flask.request)
+            assert request.json["tes_urls"] == ["https://slow.tes"]
+        histogram = metrics.get_histogram(
+            "middleware_duration_seconds", stage="SlowMiddleware"
+        )
+        assert histogram is not None
+        assert histogram.count == 1
+        assert histogram.sum >= 0.5
+
+    def test_apply_middlewares_timeout_fallback(self):
+        """Test that a middleware exceeding its budget is abandoned."""
+        handler = MiddlewareHandler()
+        handler.set_config(
+            {
+                "chain": [
+                    [f"{MODULE}.SlowMiddleware", f"{MODULE}.FastMiddleware"]
+                ],
+                "timeouts": {
+                    "default": 5,
+                    "middlewares": {f"{MODULE}.SlowMiddleware": 0.05},
+                },
+            }
+        )
+        with self.app.test_request_context(json={"name": "task"}):
+            request = handler.apply_middlewares(request=flask.request)
+            assert request.json == {
+                "name": "task",
+                "tes_urls": ["https://fast.tes"],
+            }
+            sleep(0.6)
+            assert request.json["tes_urls"] == ["https://fast.tes"]
+        assert metrics.get_counter(
+            "middleware_timeouts_total", middleware="SlowMiddleware"
+        )
+        assert metrics.get_counter(
+            "middleware_applications_total", middleware="FastMiddleware"
+        )
+
+    def test_apply_middlewares_chain_timeout(self):
+        """Test that only last alternatives are tried when budget is spent."""
+        handler = MiddlewareHandler()
+        handler.set_config(
+            {
+                "chain": [
+                    [f"{MODULE}.SlowMiddleware", f"{MODULE}.FastMiddleware"],
+                    [f"{MODULE}.SlowMiddleware", f"{MODULE}.FastMiddleware"],
+                ],
+                "timeouts": {"chain": 0.05},
+            }
+        )
+        with self.app.test_request_context(json={}):
+            request = handler.apply_middlewares(request=flask.request)
+            assert request.json["tes_urls"] == ["https://fast.tes"]
+        assert metrics.get_counter("middleware_chain_timeouts_total") == 1
+        assert (
+            metrics.get_counter(
+                "middleware_timeouts_total", middleware="SlowMiddleware"
+            )
+            == 1
+        )
+
+    def test_apply_middlewares_chain_timeout_fallback(self):
+        """Test that fallbacks are applied after the budget is spent."""
+        handler = MiddlewareHandler()
+        handler.set_config(
+            {
+                "chain": [
+                    [
+                        f"{MODULE}.SlowMiddleware",
+                        f"{MODULE}.FastMiddleware",
+                        f"{MODULE}.FallbackMiddleware",
+                    ],
+                    [f"{MODULE}.FallbackMiddleware"],
+                ],
+                "timeouts": {"chain": 0.05},
+            }
+        )
+        with self.app.test_request_context(json={}):
+            request = handler.apply_middlewares(request=flask.request)
+            assert request.json["tes_urls"] == ["https://fallback.tes"]
+        assert metrics.get_counter("middleware_chain_timeouts_total") == 1
+        assert (
+            metrics.get_counter(
+                "middleware_applications_total",
+                middleware="FallbackMiddleware",
+            )
+            == 2
+        )
+        assert not metrics.get_counter(
+            "middleware_applications_total", middleware="FastMiddleware"
+        )
+
+    def test_apply_middlewares_failure(self):
+        """Test that an exception is raised if no middleware applies."""
+        handler = MiddlewareHandler()
+        handler.set_config(
+            {
+                "chain": [[f"{MODULE}.FailingMiddleware"]],
+                "timeouts": {"default": 1},
+            }
+        )
+        with self.app.test_request_context(json={}):
+            with pytest.raises(MiddlewareException):
+                handler.apply_middlewares(request=flask.request)
+        assert metrics.get_counter(
+            "middleware_failures_total", middleware="FailingMiddleware"
+        )
@@ -0,0 +1,100 @@
+"""Unit tests for resource-fit middleware."""
+
+import unittest
+from unittest.mock import MagicMock, patch
+
+import flask
+from flask import Flask
+from foca.models.config import Config
+import mongomock
+
+from pro_tes.plugins.middlewares.task_distribution.resource_fit import (
+    TaskDistributionResourceFit,
+    get_fit_score,
+)
+from pro_tes.utils.service_info import TesServiceInfoCache
+from tests.unitTest.mock_data import get_mongo_config
+
+TES_LARGE = "https://large.tes"
+TES_SMALL = "https://small.tes"
+TES_SPOT = "https://spot.tes"
+TES_UNKNOWN = "https://unknown.tes"
+
+
+class TestResourceFitMiddleware(unittest.TestCase):
+    """Test resource-fit task distribution."""
+
+    app = Flask(__name__)
+
+    def setUp(self):
+        """Set up the test environment."""
+        self.app.config.foca = Config(
+            db=get_mongo_config(),
+            tes={
+                "service_list": [TES_LARGE, TES_SMALL, TES_SPOT, TES_UNKNOWN],
+                "resources": {
+                    TES_SMALL: {"cpu_cores": 4, "ram_gb": 8},
+                    TES_SPOT: {"ram_gb": 1024, "preemptible": True},
+                },
+            },
+        )
+        self.app.config.foca.db.dbs["taskStore"].collections[
+            "tes_service_info"
+        ].client = mongomock.MongoClient().db.tes_service_info
+        response = MagicMock()
+        response.json.return_value = {
+            "name": "large",
+            "resources": {"cpu_cores": 64, "ram_gb": 512},
+        }
+        with self.app.app_context(), patch(
+            "pro_tes.utils.service_info.requests.get",
+            side_effect=lambda url, **kwargs: (
+                response
+                if url.startswith(TES_LARGE)
+                else MagicMock(json=MagicMock(return_value={"name": "other"}))
+            ),
+        ):
+            TesServiceInfoCache().refresh()
+
+    def test_fit_score(self):
+        """Test scoring of requested resources against limits."""
+        limits = {"cpu_cores": 8, "ram_gb": 16, "zones": ["a", "b"]}
+        assert get_fit_score({"cpu_cores": 2, "ram_gb": 8}, limits) == 0.5
+        assert get_fit_score({"ram_gb": 32}, limits) is None
+        assert get_fit_score({"zones": ["c"]}, limits) is None
+        assert get_fit_score({"zones": ["b", "c"]}, limits) == 0
+        assert (
+            get_fit_score({"preemptible": False}, {"preemptible": True})
+            is None
+        )
+
+    def test_filter_and_rank_best_fit(self):
+        """Test that TES instances are filtered and ranked best fit first."""
+        with self.app.test_request_context(
+            json={"resources": {"ram_gb": 4, "preemptible": False}}
+        ):
+            request = TaskDistributionResourceFit().apply_middleware(
+                request=flask.request
+            )
+            assert request.json["tes_urls"] == [
+                TES_SMALL,
+                TES_LARGE,
+                TES_UNKNOWN,
+            ]
+
+    def test_preserve_ranking(self):
+        """Test that rankings of preceding middlewares are preserved."""
+        with self.app.test_request_context(
+            json={
+                "resources": {"ram_gb": 64},
+                "tes_urls": [TES_UNKNOWN, TES_SMALL, TES_SPOT, TES_LARGE],
+            }
+        ):
+            request = TaskDistributionResourceFit().apply_middleware(
+                request=flask.request
+            )
+            assert request.json["tes_urls"] == [
+                TES_SPOT,
+                TES_LARGE,
+                TES_UNKNOWN,
+            ]
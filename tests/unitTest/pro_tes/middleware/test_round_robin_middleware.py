@@ -0,0 +1,109 @@
+"""Unit tests for weighted round-robin and power-of-two-choices middlewares."""
+
+from collections import Counter
+import random
+import unittest
+
+import flask
+from flask import Flask
+from foca.models.config import Config
+import mongomock
+
+from pro_tes.plugins.middlewares.task_distribution.round_robin import (
+    TaskDistributionWeightedRoundRobin,
+    get_schedule,
+)
+from pro_tes.plugins.middlewares.task_distribution.two_choices import (
+    TaskDistributionPowerOfTwoChoices,
+)
+from tests.unitTest.mock_data import get_mongo_config
+
+TES_A = "https://a.tes"
+TES_B = "https://b.tes"
+TES_C = "https://c.tes"
+
+
+class TestWeightedRoundRobinMiddleware(unittest.TestCase):
+    """Test smooth weighted round-robin task distribution."""
+
+    app = Flask(__name__)
+
+    def setUp(self):
+        """Set up the test environment."""
+        self.app.config.foca = Config(
+            db=get_mongo_config(),
+            tes={
+                "service_list": [TES_A, TES_B, TES_C],
+                "weights": {TES_A: 50, TES_B: 10},
+                "capacities": {TES_C: 10},
+            },
+        )
+        self.app.config.foca.db.dbs["taskStore"].collections[
+            "counters"
+        ].client = mongomock.MongoClient().db.counters
+
+    def test_schedule(self):
+        """Test that selections are interleaved smoothly."""
+        assert get_schedule(weights=(("a", 5), ("b", 1), ("c", 1))) == tuple(
+            "aabacaa"
+        )
+        assert get_schedule(weights=(("a", 20), ("b", 10))) == tuple("aba")
+        assert get_schedule(weights=()) == ()
+
+    def test_apply_middleware(self):
+        """Test that TES instances are selected in proportion to weights."""
+        selected: Counter = Counter()
+        with self.app.test_request_context(json={"name": "task"}):
+            for _ in range(14):
+                request = (
+                    TaskDistributionWeightedRoundRobin().apply_middleware(
+                        request=flask.request
+                    )
+                )
+                selected[request.json["tes_urls"][0]] += 1
+            assert request.json["tes_urls"][1:] == [TES_B, TES_C]
+        assert selected == {TES_A: 10, TES_B: 2, TES_C: 2}
+
+
+class TestPowerOfTwoChoicesMiddleware(unittest.TestCase):
+    """Test power-of-two-choices task distribution."""
+
+    app = Flask(__name__)
+
+    def setUp(self):
+        """Set up the test environment."""
+        self.app.config.foca = Config(
+            db=get_mongo_config(),
+            tes={
+                "service_list": [TES_A, TES_B, TES_C],
+                "default_capacity": 1,
+            },
+        )
+        collection = mongomock.MongoClient().db.tasks
+        self.app.config.foca.db.dbs["taskStore"].collections[
+            "tasks"
+        ].client = collection
+        collection.database["tes_load"].insert_many(
+            [
+                {"host": TES_A, "in_flight": 5},
+                {"host": TES_B, "in_flight": 3},
+            ]
+        )
+
+    def test_apply_middleware(self):
+        """Test that the less utilized of two sampled instances is chosen."""
+        random.seed(0)
+        selected: Counter = Counter()
+        with self.app.test_request_context(json={"name": "task"}):
+            for _ in range(30):
+                request = TaskDistributionPowerOfTwoChoices().apply_middleware(
+                    request=flask.request
+                )
+                assert sorted(request.json["tes_urls"]) == [
+                    TES_A,
+                    TES_B,
+                    TES_C,
+                ]
+                selected[request.json["tes_urls"][0]] += 1
+        assert TES_A not in selected
+        assert selected[TES_C] > selected[TES_B]
@@ -0,0 +1,96 @@
+"""Unit tests for weighted scoring middleware."""
+
+from math import inf
+import unittest
+from unittest.mock import patch
+
+import flask
+from flask import Flask
+from foca.models.config import Config
+import mongomock
+import pytest
+
+from pro_tes.exceptions import MiddlewareException
+from pro_tes.plugins.middlewares.task_distribution.scoring import (
+    LoadScorer,
+    TaskDistributionScoring,
+    get_weights,
+    normalize,
+)
+from pro_tes.utils.sticky import StickyRoutes
+from tests.unitTest.mock_data import get_mongo_config
+
+TES_A = "https://a.tes"
+TES_B = "https://b.tes"
+TES_C = "https://c.tes"
+
+
+def test_normalize():
+    """Test min-max normalization of costs."""
+    assert normalize({TES_A: 2, TES_B: 4, TES_C: None}) == {
+        TES_A: 0,
+        TES_B: 1,
+        TES_C: 0.5,
+    }
+    assert normalize({TES_A: 3, TES_B: inf}) == {TES_A: 0, TES_B: inf}
+
+
+class TestScoringMiddleware(unittest.TestCase):
+    """Test weighted scoring task distribution."""
+
+    app = Flask(__name__)
+
+    def setUp(self):
+        """Set up the test environment."""
+        self.app.config.foca = Config(
+            db=get_mongo_config(),
+            tes={
+                "service_list": [TES_A, TES_B, TES_C],
+                "default_capacity": 2,
+                "resources": {TES_C: {"ram_gb": 1}},
+            },
+            task_distribution={
+                "scoring": {
+                    "weights": {"resource_fit": 1, "load": 1, "sticky": 2},
+                },
+            },
+        )
+        client = mongomock.MongoClient()
+        collections = self.app.config.foca.db.dbs["taskStore"].collections
+        for name in ["tasks", "sticky_routes", "tes_service_info"]:
+            collections[name].client = client.db[name]
+        client.db.tes_load.insert_one({"host": TES_A, "in_flight": 1})
+        with self.app.app_context():
+            StickyRoutes.from_config().remember(
+                tags={"WORKFLOW_ID": "wf1"}, host=TES_A
+            )
+
+    def apply_middleware(self, payload: dict) -> list[str]:
+        """Apply middleware and return selected TES instances."""
+        with self.app.test_request_context(json=payload):
+            request = TaskDistributionScoring().apply_middleware(
+                request=flask.request
+            )
+            return request.json["tes_urls"]
+
+    def test_weighted_ranking(self):
+        """Test that scores are combined and infeasible instances removed."""
+        payload: dict = {"resources": {"ram_gb": 4}}
+        assert self.apply_middleware(payload) == [TES_B, TES_A]
+        payload["tags"] = {"WORKFLOW_ID": "wf1"}
+        assert self.apply_middleware(payload) == [TES_A, TES_B]
+
+    def test_failing_scorer_ignored(self):
+        """Test that failing scorers are ignored."""
+        with patch.object(LoadScorer, "get_costs", side_effect=ValueError):
+            tes_urls = self.apply_middleware({"tags": {"WORKFLOW_ID": "wf1"}})
+        assert tes_urls[0] == TES_A
+        assert set(tes_urls) == {TES_A, TES_B, TES_C}
+
+    def test_unknown_scorer(self):
+        """Test that unknown scorers are rejected."""
+        self.app.config.foca.task_distribution["scoring"]["weights"] = {
+            "unknown": 1
+        }
+        with self.app.app_context(), pytest.raises(MiddlewareException):
+            get_weights()
@@ -0,0 +1,93 @@
+"""Unit tests for sticky middleware."""
+
+import unittest
+
+import flask
+from flask import Flask
+from foca.models.config import Config
+import mongomock
+
+from pro_tes.plugins.middlewares.task_distribution.sticky import (
+    TaskDistributionSticky,
+)
+from pro_tes.utils.sticky import StickyRoutes
+from tests.unitTest.mock_data import get_mongo_config
+
+TES_A = "https://a.tes"
+TES_B = "https://b.tes"
+TES_C = "https://c.tes"
+
+
+class TestStickyRoutes(unittest.TestCase):
+    """Test remembering routes per tag value."""
+
+    def setUp(self):
+        """Set up the test environment."""
+        self.routes = StickyRoutes(
+            collection=mongomock.MongoClient().db.sticky_routes,
+            max_entries=2,
+        )
+
+    def test_remember_recall(self):
+        """Test that routes are remembered and evicted."""
+        assert self.routes.recall(tags={"WORKFLOW_ID": "wf1"}) is None
+        self.routes.remember(tags={"WORKFLOW_ID": "wf1"}, host=TES_A)
+        self.routes.remember(tags={"WORKFLOW_ID": "wf1"}, host=TES_B)
+        self.routes.remember(tags={"OTHER": "x"}, host=TES_C)
+        assert self.routes.recall(tags={"WORKFLOW_ID": "wf1"}) == TES_B
+        assert self.routes.recall(tags=None) is None
+        self.routes.remember(tags={"WORKFLOW_ID": "wf2"}, host=TES_A)
+        self.routes.remember(tags={"WORKFLOW_ID": "wf3"}, host=TES_A)
+        assert self.routes.collection.count_documents({}) == 2
+        assert self.routes.recall(tags={"WORKFLOW_ID": "wf1"}) is None
+
+
+class TestStickyMiddleware(unittest.TestCase):
+    """Test sticky task distribution."""
+
+    app = Flask(__name__)
+
+    def setUp(self):
+        """Set up the test environment."""
+        self.app.config.foca = Config(
+            db=get_mongo_config(),
+            tes={
+                "service_list": [TES_A, TES_B, TES_C],
+                "default_capacity": 2,
+            },
+        )
+        client = mongomock.MongoClient()
+        collections = self.app.config.foca.db.dbs["taskStore"].collections
+        collections["tasks"].client = client.db.tasks
+        collections["sticky_routes"].client = client.db.sticky_routes
+        client.db.tes_load.insert_one({"host": TES_C, "in_flight": 2})
+        with self.app.app_context():
+            routes = StickyRoutes.from_config()
+        routes.remember(tags={"WORKFLOW_ID": "wf1"}, host=TES_B)
+        routes.remember(tags={"WORKFLOW_ID": "wf2"}, host=TES_C)
+
+    def apply_middleware(self, payload: dict) -> list[str]:
+        """Apply middleware and return selected TES instances."""
+        with self.app.test_request_context(json=payload):
+            request = TaskDistributionSticky().apply_middleware(
+                request=flask.request
+            )
+            return request.json["tes_urls"]
+
+    def test_pinned_first(self):
+        """Test that the remembered TES instance is moved to the front."""
+        assert self.apply_middleware(
+            {"tags": {"WORKFLOW_ID": "wf1"}, "tes_urls": [TES_A, TES_C, TES_B]}
+        ) == [TES_B, TES_A, TES_C]
+
+    def test_pinned_unavailable(self):
+        """Test that preceding rankings are kept for unavailable instances."""
+        assert self.apply_middleware(
+            {"tags": {"WORKFLOW_ID": "wf1"}, "tes_urls": [TES_C, TES_A]}
+        ) == [TES_C, TES_A]
+
+    def test_pinned_overloaded(self):
+        """Test that overloaded TES instances are not kept."""
+        assert self.apply_middleware(
+            {"tags": {"WORKFLOW_ID": "wf2"}, "tes_urls": [TES_A, TES_C]}
+        ) == [TES_A, TES_C]
@@ -0,0 +1,87 @@
+"""Unit tests for storage affinity-based middleware."""
+
+import unittest
+
+import flask
+from flask import Flask
+from foca.models.config import Config
+import mongomock
+
+from pro_tes.plugins.middlewares.task_distribution.storage import (
+    TaskDistributionStorage,
+    get_affinity,
+)
+from tests.unitTest.mock_data import get_mongo_config
+
+TES_AWS = "https://aws.tes"
+TES_GCP = "https://gcp.tes"
+TES_LOCAL = "https://local.tes"
+
+TASK = {
+    "inputs": [
+        {"url": "s3://bucket/data/sample.bam", "path": "/data/sample.bam"},
+        {"url": "s3://bucket/ref/genome.fa", "path": "/data/genome.fa"},
+        {"content": "inline", "path": "/data/config.txt"},
+    ],
+    "outputs": [{"url": "gs://other/out.vcf", "path": "/data/out.vcf"}],
+}
+
+
+class TestStorageMiddleware(unittest.TestCase):
+    """Test storage affinity-based task distribution."""
+
+    app = Flask(__name__)
+
+    def setUp(self):
+        """Set up the test environment."""
+        self.app.config.foca = Config(
+            db=get_mongo_config(),
+            tes={
+                "service_list": [TES_AWS, TES_GCP, TES_LOCAL],
+                "storage": {TES_LOCAL: ["file:///data"]},
+            },
+        )
+        collection = mongomock.MongoClient().db.tes_service_info
+        self.app.config.foca.db.dbs["taskStore"].collections[
+            "tes_service_info"
+        ].client = collection
+        collection.insert_many(
+            [
+                {
+                    "url": TES_AWS,
+                    "service_info": {"storage": ["s3://bucket/data"]},
+                },
+                {
+                    "url": TES_GCP,
+                    "service_info": {"storage": ["gs://storage"]},
+                },
+                {
+                    "url": TES_LOCAL,
+                    "service_info": {"storage": ["s3://bucket"]},
+                },
+            ]
+        )
+
+    def test_affinity(self):
+        """Test that only the strongest match per URL is counted."""
+        assert get_affinity(
+            urls=[
+                "s3://bucket/data/sample.bam",
+                "s3://bucket/ref/genome.fa",
+                "s3://elsewhere/x",
+                "ftp://host/x",
+            ],
+            storage=["s3://bucket/data", "s3://bucket/ref/"],
+        ) == (2, 0, 1)
+        assert get_affinity(
+            urls=["file:///data/x", "file:///tmp/x"],
+            storage=["file:///data/"],
+        ) == (1, 1, 0)
+
+    def test_apply_middleware(self):
+        """Test that TES instances are ranked by storage affinity."""
+        with self.app.test_request_context(json=TASK):
+            request = TaskDistributionStorage().apply_middleware(
+                request=flask.request
+            )
+            assert request.json["tes_urls"] == [TES_AWS, TES_GCP, TES_LOCAL]
@@ -0,0 +1,57 @@
+"""Unit tests for periodic background jobs."""
+
+from threading import Event
+
+from flask import Flask
+
+from pro_tes.utils.background import start_periodic_job
+
+app = Flask(__name__)
+
+
+def test_run_immediately_once():
+    """Test that a job without interval is run once if requested."""
+    called = Event()
+    job = start_periodic_job(
+        app=app,
+        func=called.set,
+        interval=0,
+        name="test",
+        run_immediately=True,
+    )
+    assert job is not None
+    job.join(timeout=5)
+    assert called.is_set()
+    assert not job.is_alive()
+
+
+def test_failures_do_not_stop_job():
+    """Test that a failing call does not stop the job."""
+    calls: list[int] = []
+
+    def func():
+        calls.append(1)
+        if len(calls) == 1:
+            raise RuntimeError("First call fails.")
+
+    job = start_periodic_job(
+        app=app,
+        func=func,
+        interval=0.01,
+        name="test",
+        run_immediately=True,
+    )
+    assert job is not None
+    for _ in range(500):
+        if len(calls) > 1:
+            break
+        job.stopped.wait(timeout=0.01)
+    job.stop()
+    assert len(calls) > 1
+
+
+def test_disabled():
+    """Test that no job is started without interval."""
+    assert (
+        start_periodic_job(app=app, func=print, interval=0, name="t") is None
+    )
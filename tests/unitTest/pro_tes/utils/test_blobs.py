@@ -0,0 +1,99 @@
+"""Unit tests for storage of large task fields."""
+
+import unittest
+
+import mongomock
+
+from pro_tes.ga4gh.tes.models import DbDocument
+from pro_tes.utils.blobs import TaskBlobStore
+
+LARGE = "x" * 100
+
+
+def get_document() -> DbDocument:
+    """Get task document with small and large fields."""
+    task = {
+        "executors": [{"image": "alpine", "command": ["echo"]}],
+        "inputs": [
+            {"path": "/small", "type": "FILE", "content": "small"},
+            {"path": "/large", "type": "FILE", "content": LARGE},
+        ],
+        "logs": [
+            {
+                "logs": [{"exit_code": 0, "stdout": LARGE, "stderr": ""}],
+                "outputs": [],
+                "system_logs": [LARGE[:60], LARGE[:60]],
+            }
+        ],
+    }
+    return DbDocument(task=task, task_original=task)
+
+
+class TestTaskBlobStore(unittest.TestCase):
+    """Test offloading and restoring of large task fields."""
+
+    def setUp(self):
+        """Set up the test environment."""
+        self.collection = mongomock.MongoClient().db.task_blobs
+        self.store = TaskBlobStore(collection=self.collection, min_size=100)
+
+    def test_offload_load(self):
+        """Test that large fields are offloaded and restored."""
+        document = get_document()
+        assert self.store.offload(document=document) == []
+        assert document.task.inputs[0].content == "small"
+        assert document.task.inputs[1].content is None
+        assert document.task.logs[0].logs[0].stdout is None
+        assert document.task.logs[0].logs[0].stderr == ""
+        assert document.task.logs[0].system_logs is None
+        assert document.task_original.inputs[1].content is None
+        assert {reference.path for reference in document.blobs} == {
+            "task.inputs.1.content",
+            "task.logs.0.logs.0.stdout",
+            "task.logs.0.system_logs",
+            "task_original.inputs.1.content",
+            "task_original.logs.0.logs.0.stdout",
+            "task_original.logs.0.system_logs",
+        }
+        stored = document.dict()
+        self.store.load(documents=[stored])
+        assert "blobs" not in stored
+        assert stored["task"] == get_document().task.dict()
+        assert stored["task_original"]["inputs"][1]["content"] is None
+
+    def test_offload_replaced(self):
+        """Test that replaced blobs are reported and can be deleted."""
+        document = get_document()
+        self.store.offload(document=document)
+        document.task.logs[0].logs[0].stdout = LARGE * 2
+        replaced = self.store.offload(document=document)
+        assert len(replaced) == 1
+        assert len(document.blobs) == 6
+        self.store.delete(blob_ids=replaced)
+        assert self.collection.count_documents({}) == 6
+        stored = document.dict()
+        self.store.load(documents=[stored])
+        assert stored["task"]["logs"][0]["logs"][0]["stdout"] == LARGE * 2
+
+    def test_disabled(self):
+        """Test that no fields are offloaded if disabled."""
+        store = TaskBlobStore(collection=self.collection)
+        document = get_document()
+        assert store.offload(document=document) == []
+        assert document == get_document()
+        assert self.collection.count_documents({}) == 0
+
+    def test_compression(self):
+        """Test that blobs are compressed and decompressed transparently."""
+        store = TaskBlobStore(
+            collection=self.collection,
+            min_size=100,
+            compression={"codec": "zlib", "min_size": 0},
+        )
+        document = get_document()
+        store.offload(document=document)
+        blobs = list(self.collection.find())
+        assert {blob.get("codec") for blob in blobs} == {"zlib"}
+        stored = document.dict()
+        TaskBlobStore(collection=self.collection).load(documents=[stored])
+        assert stored["task"] == get_document().task.dict()
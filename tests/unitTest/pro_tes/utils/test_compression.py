@@ -0,0 +1,62 @@
+"""Unit tests for compression of log payloads."""
+
+from pathlib import Path
+import tempfile
+import unittest
+
+import pytest
+
+from pro_tes.utils.compression import LogCompressor, train_dictionary
+
+LOGS = "\n".join(
+    f"2024-03-01 12:00:{i % 60:02d} INFO step {i}" for i in range(200)
+)
+
+
+class TestLogCompressor(unittest.TestCase):
+    """Test compression and decompression of log payloads."""
+
+    def test_zlib(self):
+        """Test round trip of strings and lists of strings with zlib."""
+        compressor = LogCompressor(codec="zlib")
+        for value in [LOGS, [LOGS, LOGS]]:
+            data, codec = compressor.compress(value)
+            assert codec == "zlib"
+            assert len(data) < len(LOGS)
+            assert compressor.decompress(data=data, codec=codec) == value
+
+    def test_min_size(self):
+        """Test that small or incompressible payloads are kept as is."""
+        compressor = LogCompressor(codec="zlib", min_size=1024)
+        assert compressor.compress("small") == ("small", None)
+        assert compressor.decompress(data="small", codec=None) == "small"
+
+    def test_zstd(self):
+        """Test round trip with Zstandard."""
+        compressor = LogCompressor(codec="zstd")
+        data, codec = compressor.compress(LOGS)
+        assert codec == "zstd"
+        assert compressor.decompress(data=data, codec=codec) == LOGS
+
+    def test_invalid(self):
+        """Test that invalid codecs and payloads are rejected."""
+        with pytest.raises(ValueError):
+            LogCompressor(codec="lzma")
+        with pytest.raises(ValueError):
+            LogCompressor(codec="zlib").decompress(data=b"xyz", codec="zlib")
+
+    def test_dictionary(self):
+        """Test that dictionaries are used with Zstandard only."""
+        with pytest.raises(ValueError):
+            LogCompressor(codec="zlib", dictionary="dictionary")
+        samples = [
+            f"2024-03-01 12:00:{i % 60:02d} INFO step {i} of task {i * 7}"
+            for i in range(1000)
+        ]
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = Path(tmp_dir) / "logs.dict"
+            path.write_bytes(train_dictionary(samples=samples, size=4096))
+            compressor = LogCompressor(codec="zstd", dictionary=str(path))
+        data, codec = compressor.compress(samples[0])
+        assert codec == "zstd"
+        assert compressor.decompress(data=data, codec=codec) == samples[0]
@@ -0,0 +1,18 @@
+"""Unit tests for IP address resolution and geolocation."""
+
+from unittest.mock import patch
+
+from ip2geotools.errors import ServiceError  # type: ignore
+import pytest
+
+from pro_tes.utils.geolocation import get_ip_locations
+
+
+@patch(
+    "pro_tes.utils.geolocation.DbIpCity.get",
+    side_effect=ServiceError("Service unavailable."),
+)
+def test_get_ip_locations_service_error(_get):
+    """Test that errors of the geolocation service are raised as ValueError."""
+    with pytest.raises(ValueError):
+        get_ip_locations("1.2.3.4")
@@ -0,0 +1,81 @@
+"""Unit tests for health checks of TES instances."""
+
+import unittest
+from unittest.mock import MagicMock, patch
+
+import flask
+from flask import Flask
+from foca.models.config import Config
+import mongomock
+import requests
+
+from pro_tes.plugins.middlewares.task_distribution.random import (
+    TaskDistributionRandom,
+)
+from pro_tes.utils.health import TesHealth, probe_tes
+from pro_tes.utils.service_info import TesServiceInfoCache
+from tests.unitTest.mock_data import get_mongo_config
+
+TES_DOWN = "https://down.tes"
+TES_UP = "https://up.tes"
+
+
+def mock_get(url: str, **kwargs) -> MagicMock:
+    """Mock responses of healthy and unreachable TES instances."""
+    if url.startswith(TES_DOWN):
+        raise requests.ConnectionError("unreachable")
+    response = MagicMock(status_code=401)
+    response.json.return_value = {"name": "up"}
+    return response
+
+
+class TestTesHealth(unittest.TestCase):
+    """Test probing and health of TES instances."""
+
+    app = Flask(__name__)
+
+    def setUp(self):
+        """Set up the test environment."""
+        self.app.config.foca = Config(
+            db=get_mongo_config(),
+            tes={
+                "service_list": [TES_DOWN, TES_UP],
+                "health": {"failure_threshold": 2},
+            },
+        )
+        client = mongomock.MongoClient()
+        collections = self.app.config.foca.db.dbs["taskStore"].collections
+        for name in ["tes_health", "tes_service_info", "tes_latencies"]:
+            collections[name].client = client.db[name]
+
+    @patch("pro_tes.utils.health.requests.get", side_effect=mock_get)
+    def test_probe(self, _):
+        """Test that TES instances are unhealthy after repeated failures."""
+        result = probe_tes(url=TES_UP, timeout=1)
+        assert result.healthy
+        assert set(result.latencies) == {"get_service_info", "list_tasks"}
+        assert not probe_tes(url=TES_DOWN, timeout=1).healthy
+        with self.app.app_context():
+            health = TesHealth()
+            health.probe()
+            assert not health.get_unhealthy(tes_urls=[TES_DOWN, TES_UP])
+            health.probe()
+            assert health.get_unhealthy(tes_urls=[TES_DOWN, TES_UP]) == {
+                TES_DOWN
+            }
+            assert health.filter_healthy(tes_urls=[TES_DOWN]) == [TES_DOWN]
+            assert TesServiceInfoCache().get(tes_urls=[TES_DOWN, TES_UP]) == {
+                TES_UP: {"name": "up"}
+            }
+
+    @patch("pro_tes.utils.health.requests.get", side_effect=mock_get)
+    def test_middleware_excludes_unhealthy(self, _):
+        """Test that distribution middlewares exclude unhealthy instances."""
+        with self.app.app_context():
+            for _ in range(2):
+                TesHealth().probe()
+        with self.app.test_request_context(json={"name": "task"}):
+            request = TaskDistributionRandom().apply_middleware(
+                request=flask.request
+            )
+            assert request.json["tes_urls"] == [TES_UP]
@@ -0,0 +1,105 @@
+"""Unit tests for historical queue times and runtimes of tasks."""
+
+import unittest
+
+import flask
+from flask import Flask
+from foca.models.config import Config
+import mongomock
+
+from pro_tes.plugins.middlewares.task_distribution.history import (
+    TaskDistributionHistory,
+)
+from pro_tes.utils.history import (
+    DurationStats,
+    TesHistory,
+    get_task_signature,
+)
+from tests.unitTest.mock_data import get_mongo_config
+
+TES_BUSY = "https://busy.tes"
+TES_FAST = "https://fast.tes"
+TES_NEW = "https://new.tes"
+
+TASK = {"executors": [{"image": "ubuntu", "command": ["ls"]}]}
+TASK_OTHER = {"executors": [{"image": "alpine", "command": ["ls"]}]}
+
+
+class TestTesHistory(unittest.TestCase):
+    """Test recording and summarizing queue times and runtimes."""
+
+    def setUp(self):
+        """Set up the test environment."""
+        self.history = TesHistory(
+            collection=mongomock.MongoClient().db.tes_history
+        )
+
+    def test_duration_stats(self):
+        """Test statistics of bucketed durations."""
+        stats = DurationStats(
+            count=4, total=40.0, buckets={"0": 1, "2": 2, "5": 1}
+        )
+        assert stats.get("mean") == 10.0
+        assert stats.get("p50") == 8.0
+        assert stats.get("p90") == 64.0
+        assert DurationStats().get("mean") is None
+
+    def test_task_signature(self):
+        """Test that signatures depend on container images only."""
+        assert get_task_signature(task=TASK) == get_task_signature(
+            task={"executors": [{"image": "ubuntu", "command": ["pwd"]}]}
+        )
+        assert get_task_signature(task=TASK) != get_task_signature(
+            task=TASK_OTHER
+        )
+        assert get_task_signature(task={"executors": []}) is None
+
+    def test_expected_completion(self):
+        """Test that task runtimes are used once enough are available."""
+        signature = get_task_signature(task=TASK)
+        self.history.record_queue_time(host=TES_FAST, seconds=10)
+        self.history.record_runtime(host=TES_FAST, seconds=100)
+        expected = self.history.get_expected_completion(
+            hosts=[TES_FAST, TES_NEW], signature=signature, min_samples=2
+        )
+        assert expected == {TES_FAST: 110.0, TES_NEW: None}
+        for _ in range(2):
+            self.history.record_runtime(
+                host=TES_FAST, seconds=40, signature=signature
+            )
+        expected = self.history.get_expected_completion(
+            hosts=[TES_FAST], signature=signature, min_samples=2
+        )
+        assert expected[TES_FAST] == 50.0
+
+
+class TestHistoryMiddleware(unittest.TestCase):
+    """Test history-based task distribution."""
+
+    app = Flask(__name__)
+
+    def setUp(self):
+        """Set up the test environment."""
+        self.app.config.foca = Config(
+            db=get_mongo_config(),
+            tes={"service_list": [TES_BUSY, TES_FAST, TES_NEW]},
+            task_distribution={"history": {"min_samples": 1}},
+        )
+        collection = mongomock.MongoClient().db.tes_history
+        self.app.config.foca.db.dbs["taskStore"].collections[
+            "tes_history"
+        ].client = collection
+        history = TesHistory(collection=collection)
+        signature = get_task_signature(task=TASK)
+        history.record_queue_time(host=TES_BUSY, seconds=600)
+        history.record_runtime(host=TES_BUSY, seconds=60, signature=signature)
+        history.record_queue_time(host=TES_FAST, seconds=5)
+        history.record_runtime(host=TES_FAST, seconds=60, signature=signature)
+
+    def test_apply_middleware(self):
+        """Test that TES instances are ranked by expected completion."""
+        with self.app.test_request_context(json=TASK):
+            request = TaskDistributionHistory().apply_middleware(
+                request=flask.request
+            )
+            assert request.json["tes_urls"] == [TES_NEW, TES_FAST, TES_BUSY]
@@ -0,0 +1,36 @@
+"""Unit tests for managed database indexes."""
+
+import mongomock
+
+from pro_tes.utils.indexes import (
+    TASKS_INDEXES,
+    TES_LOAD_INDEXES,
+    ensure_indexes,
+)
+
+
+def test_migrate_indexes():
+    """Test that legacy indexes are replaced by managed indexes."""
+    collection = mongomock.MongoClient().db.tasks
+    collection.create_index(
+        [("task_id", 1), ("worker_id", 1)], unique=True, sparse=True
+    )
+    collection.create_index([("worker_id", 1)], name="worker_id", unique=True)
+    ensure_indexes(collection=collection, indexes=TASKS_INDEXES)
+    info = collection.index_information()
+    assert set(info) == {"_id_"} | {
+        index.document["name"] for index in TASKS_INDEXES
+    }
+    assert not info["worker_id"].get("unique")
+    assert info["task_id"]["unique"]
+
+
+def test_foca_indexes_kept():
+    """Test that indexes formerly created via FOCA config are kept."""
+    collection = mongomock.MongoClient().db.tes_load
+    collection.create_index([("host", 1)], unique=True)
+    ensure_indexes(collection=collection, indexes=TES_LOAD_INDEXES)
+    ensure_indexes(collection=collection, indexes=TES_LOAD_INDEXES)
+    info = collection.index_information()
+    assert set(info) == {"_id_", "host_1"}
+    assert info["host_1"]["unique"]
@@ -0,0 +1,139 @@
+"""Unit tests for latency tracking of calls to TES instances."""
+
+import unittest
+from unittest.mock import MagicMock
+
+import flask
+from flask import Flask
+from foca.models.config import Config
+import mongomock
+import pytest
+
+from pro_tes.plugins.middlewares.task_distribution.latency import (
+    TaskDistributionLatency,
+)
+from pro_tes.utils.latency import (
+    TesLatency,
+    TrackedTesClient,
+    create_tes_client,
+)
+from tests.unitTest.mock_data import get_mongo_config
+
+TES_FAST = "https://fast.tes"
+TES_SLOW = "https://slow.tes"
+TES_FLAKY = "https://flaky.tes"
+TES_NEW = "https://new.tes"
+
+
+class TestTesLatency(unittest.TestCase):
+    """Test recording and summarizing latencies."""
+
+    def setUp(self):
+        """Set up the test environment."""
+        self.latency = TesLatency(
+            collection=mongomock.MongoClient().db.tes_latencies,
+            window=3,
+        )
+
+    def test_summarize(self):
+        """Test computation of latency statistics."""
+        stats = TesLatency.summarize(
+            samples=[
+                {"t": 1.0, "ok": True},
+                {"t": 2.0, "ok": True},
+                {"t": 3.0, "ok": False},
+            ],
+            alpha=0.5,
+        )
+        assert stats.count == 3
+        assert stats.ewma == 2.25
+        assert stats.p50 == 2.0
+        assert stats.error_rate == pytest.approx(1 / 3)
+
+    def test_record_window(self):
+        """Test that only the latest samples are kept."""
+        for seconds in [1.0, 2.0, 3.0, 4.0]:
+            self.latency.record(
+                host=TES_FAST, operation="get_task", seconds=seconds
+            )
+        self.latency.record(host=TES_FAST, operation="create_task", seconds=9)
+        stats = self.latency.get_stats(hosts=[TES_FAST, TES_NEW])
+        assert stats[TES_FAST].count == 3
+        assert stats[TES_FAST].p50 == 4.0
+        assert stats[TES_NEW].count == 0
+        stats = self.latency.get_stats(hosts=[TES_FAST], operation="get_task")
+        assert stats[TES_FAST].p50 == 3.0
+
+    def test_tracked_client(self):
+        """Test that calls of wrapped clients are recorded."""
+        client = MagicMock()
+        client.get_task.side_effect = ValueError
+        client.url = TES_FAST
+        tracked = TrackedTesClient(
+            client=client, host=TES_FAST, latency=self.latency
+        )
+        tracked.get_service_info()
+        with pytest.raises(ValueError):
+            tracked.get_task("task_id")
+        assert tracked.url == TES_FAST
+        stats = self.latency.get_stats(hosts=[TES_FAST])
+        assert stats[TES_FAST].count == 2
+        assert stats[TES_FAST].error_rate == 0.5
+
+    def test_create_tes_client(self):
+        """Test that created clients are wrapped."""
+        client = create_tes_client(
+            url=f"{TES_FAST}/ga4gh/tes/v1",
+            host=TES_FAST,
+            latency=self.latency,
+            user="user",
+            password="password",
+        )
+        assert isinstance(client, TrackedTesClient)
+        assert client.host == TES_FAST
+        assert client.client.user == "user"
+        assert client.client.timeout == 5
+
+
+class TestLatencyMiddleware(unittest.TestCase):
+    """Test latency-aware task distribution."""
+
+    app = Flask(__name__)
+
+    def setUp(self):
+        """Set up the test environment."""
+        self.app.config.foca = Config(
+            db=get_mongo_config(),
+            tes={"service_list": [TES_FAST, TES_SLOW, TES_FLAKY, TES_NEW]},
+            task_distribution={"latency": {"statistic": "p50"}},
+        )
+        collection = mongomock.MongoClient().db.tes_latencies
+        self.app.config.foca.db.dbs["taskStore"].collections[
+            "tes_latencies"
+        ].client = collection
+        latency = TesLatency(collection=collection)
+        for host, seconds, success in [
+            (TES_FAST, 0.1, True),
+            (TES_SLOW, 1.0, True),
+            (TES_FLAKY, 0.1, True),
+            (TES_FLAKY, 0.1, False),
+        ]:
+            latency.record(
+                host=host,
+                operation="get_task",
+                seconds=seconds,
+                success=success,
+            )
+
+    def test_apply_middleware(self):
+        """Test that TES instances are ranked by latency scores."""
+        with self.app.test_request_context(json={"name": "task"}):
+            request = TaskDistributionLatency().apply_middleware(
+                request=flask.request
+            )
+            assert request.json["tes_urls"] == [
+                TES_NEW,
+                TES_FAST,
+                TES_FLAKY,
+                TES_SLOW,
+            ]
@@ -0,0 +1,131 @@
+"""Unit tests for in-flight task counters."""
+
+import unittest
+
+import flask
+from flask import Flask
+from foca.models.config import Config
+import mongomock
+
+from pro_tes.plugins.middlewares.task_distribution.load import (
+    TaskDistributionLoad,
+)
+from pro_tes.utils.db import DbDocumentConnector
+from pro_tes.utils.indexes import TES_LOAD_INDEXES, ensure_indexes
+from pro_tes.utils.load import TesLoad
+from tests.unitTest.mock_data import get_mongo_config
+
+TES_BUSY = "https://busy.tes"
+TES_IDLE = "https://idle.tes"
+TES_LARGE = "https://large.tes"
+
+
+class TestTesLoad(unittest.TestCase):
+    """Test counting of in-flight tasks."""
+
+    def setUp(self):
+        """Set up the test environment."""
+        self.collection = mongomock.MongoClient().db.tasks
+        for worker_id, host in [("a", TES_BUSY), ("b", TES_BUSY)]:
+            self.collection.insert_one(
+                {
+                    "worker_id": worker_id,
+                    "task": {"state": "QUEUED"},
+                    "tes_endpoint": {"host": host},
+                }
+            )
+        self.load = TesLoad(collection=self.collection)
+
+    def test_acquire_release(self):
+        """Test that tasks are counted and released exactly once."""
+        assert self.load.acquire(worker_id="a", host=TES_BUSY)
+        assert not self.load.acquire(worker_id="a", host=TES_BUSY)
+        assert self.load.acquire(worker_id="b", host=TES_BUSY)
+        assert self.load.get_in_flight([TES_BUSY, TES_IDLE]) == {
+            TES_BUSY: 2,
+            TES_IDLE: 0,
+        }
+        assert self.load.release(worker_id="a")
+        assert not self.load.release(worker_id="a")
+        assert self.load.get_in_flight([TES_BUSY]) == {TES_BUSY: 1}
+
+    def test_release_on_terminal_state(self):
+        """Test that tasks are released when reaching a terminal state."""
+        self.load.acquire(worker_id="a", host=TES_BUSY)
+        connector = DbDocumentConnector(
+            collection=self.collection, worker_id="a"
+        )
+        connector.update_task_state(state="RUNNING")
+        assert self.load.get_in_flight([TES_BUSY]) == {TES_BUSY: 1}
+        connector.update_task_state(state="COMPLETE")
+        connector.update_task_state(state="CANCELED")
+        assert self.load.get_in_flight([TES_BUSY]) == {TES_BUSY: 0}
+
+    def test_reserve_quota(self):
+        """Test that reservations never exceed quotas."""
+        ensure_indexes(collection=self.load.counters, indexes=TES_LOAD_INDEXES)
+        assert self.load.reserve(host=TES_BUSY, quota=2)
+        assert self.load.reserve(host=TES_BUSY, quota=2)
+        assert not self.load.reserve(host=TES_BUSY, quota=2)
+        assert not self.load.reserve(host=TES_IDLE, quota=0)
+        assert self.load.reserve(host=TES_IDLE)
+        self.load.cancel_reservation(host=TES_BUSY)
+        assert self.load.acquire(worker_id="a", host=TES_BUSY, reserved=True)
+        assert self.load.reserve(host=TES_BUSY, quota=2)
+        assert not self.load.acquire(
+            worker_id="a", host=TES_BUSY, reserved=True
+        )
+        assert self.load.get_in_flight([TES_BUSY, TES_IDLE]) == {
+            TES_BUSY: 1,
+            TES_IDLE: 1,
+        }
+        self.load.release(worker_id="a")
+        assert self.load.reserve(host=TES_BUSY, quota=2)
+
+    def test_rebuild(self):
+        """Test that counters are recomputed from task documents."""
+        self.load.acquire(worker_id="a", host=TES_BUSY)
+        self.load.counters.update_one(
+            {"host": TES_BUSY}, {"$set": {"in_flight": 42}}
+        )
+        self.load.counters.insert_one({"host": TES_IDLE, "in_flight": 3})
+        self.load.rebuild()
+        assert self.load.get_in_flight([TES_BUSY, TES_IDLE]) == {
+            TES_BUSY: 1,
+            TES_IDLE: 0,
+        }
+
+
+class TestLoadMiddleware(unittest.TestCase):
+    """Test load-aware task distribution."""
+
+    app = Flask(__name__)
+
+    def setUp(self):
+        """Set up the test environment."""
+        self.app.config.foca = Config(
+            db=get_mongo_config(),
+            tes={
+                "service_list": [TES_BUSY, TES_IDLE, TES_LARGE],
+                "capacities": {TES_LARGE: 100},
+                "default_capacity": 2,
+            },
+        )
+        collection = mongomock.MongoClient().db.tasks
+        self.app.config.foca.db.dbs["taskStore"].collections[
+            "tasks"
+        ].client = collection
+        collection.database["tes_load"].insert_many(
+            [
+                {"host": TES_BUSY, "in_flight": 2},
+                {"host": TES_IDLE, "in_flight": 1},
+                {"host": TES_LARGE, "in_flight": 10},
+            ]
+        )
+
+    def test_apply_middleware(self):
+        """Test that TES instances are ranked by utilization."""
+        with self.app.test_request_context(json={"name": "task"}):
+            middleware = TaskDistributionLoad()
+            request = middleware.apply_middleware(request=flask.request)
+            assert request.json["tes_urls"] == [TES_LARGE, TES_IDLE, TES_BUSY]
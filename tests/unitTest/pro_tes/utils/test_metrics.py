@@ -0,0 +1,78 @@
+"""Unit tests for the metrics registry."""
+
+from flask import Flask
+import pytest
+
+from pro_tes.utils.metrics import (
+    get_metrics,
+    metrics,
+    MetricsRegistry,
+    StageTimer,
+)
+
+
+def test_histogram():
+    """Test that observed values are bucketed per label set."""
+    registry = MetricsRegistry()
+    registry.observe("duration", 0.003, stage="a")
+    registry.observe("duration", 20, stage="a")
+    registry.observe("duration", 0.003, stage="b")
+    histogram = registry.get_histogram("duration", stage="a")
+    assert histogram is not None
+    assert histogram.count == 2
+    assert histogram.sum == pytest.approx(20.003)
+    assert histogram.counts[1] == 1
+    assert histogram.counts[-1] == 1
+    assert registry.get_histogram("duration", stage="c") is None
+    assert len(registry.snapshot()["duration"]) == 2
+    registry.reset()
+    assert registry.get_histogram("duration", stage="a") is None
+
+
+def test_stage_timer():
+    """Test that stages are timed, also if they fail."""
+    registry = MetricsRegistry()
+    timer = StageTimer("duration", registry=registry, operation="test")
+    with timer.stage("first"):
+        pass
+    with pytest.raises(ValueError), timer.stage("second"):
+        raise ValueError
+    with timer.stage("first"):
+        pass
+    assert list(timer.durations) == ["first", "second"]
+    assert (
+        registry.get_histogram(
+            "duration", stage="first", operation="test"
+        ).count
+        == 2
+    )
+    assert str(timer).startswith("first=")
+
+
+def test_to_prometheus():
+    """Test that metrics are rendered in Prometheus text format."""
+    registry = MetricsRegistry()
+    registry.increment("failures_total", scorer='a"b')
+    registry.observe("duration", 0.003, stage="a")
+    registry.observe("duration", 20, stage="a")
+    lines = registry.to_prometheus().splitlines()
+    assert "# TYPE failures_total counter" in lines
+    assert 'failures_total{scorer="a\\"b"} 1.0' in lines
+    assert "# TYPE duration histogram" in lines
+    assert 'duration_bucket{stage="a",le="0.001"} 0' in lines
+    assert 'duration_bucket{stage="a",le="0.005"} 1' in lines
+    assert 'duration_bucket{stage="a",le="+Inf"} 2' in lines
+    assert 'duration_count{stage="a"} 2' in lines
+
+
+def test_get_metrics():
+    """Test that metrics of the registry are served."""
+    app = Flask(__name__)
+    app.add_url_rule("/metrics", view_func=get_metrics)
+    metrics.reset()
+    metrics.increment("tasks_archived_total", value=2)
+    response = app.test_client().get("/metrics")
+    assert response.status_code == 200
+    assert response.content_type.startswith("text/plain; version=0.0.4")
+    assert "tasks_archived_total 2" in response.get_data(as_text=True)
+    metrics.reset()
@@ -0,0 +1,109 @@
+"""Unit tests for migrations of database documents."""
+
+from datetime import datetime, timezone
+import unittest
+
+import mongomock
+
+from pro_tes.utils.migrations import migrate_tag_list, migrate_timestamps
+from pro_tes.utils.timestamps import LEGACY_FORMAT
+
+TIMESTAMP = datetime(2024, 3, 1, 12, 30)
+
+
+class TestMigrateTagList(unittest.TestCase):
+    """Test adding tag lists to task documents."""
+
+    def setUp(self):
+        """Set up the test environment."""
+        self.collection = mongomock.MongoClient().db.tasks
+        self.collection.insert_many(
+            [
+                {"task": {"id": "A", "tags": {"project": "x", "flag": ""}}},
+                {"task": {"id": "B", "tags": None}},
+                {"task": {"id": "C"}, "tag_list": []},
+            ]
+        )
+
+    def test_migrate_tag_list(self):
+        """Test that documents lacking tag lists are updated only."""
+        assert migrate_tag_list(collection=self.collection) == 2
+        tag_lists = {
+            doc["task"]["id"]: doc["tag_list"]
+            for doc in self.collection.find()
+        }
+        assert tag_lists == {
+            "A": [
+                {"key": "project", "value": "x"},
+                {"key": "flag", "value": ""},
+            ],
+            "B": [],
+            "C": [],
+        }
+        assert migrate_tag_list(collection=self.collection) == 0
+
+
+class TestMigrateTimestamps(unittest.TestCase):
+    """Test converting task timestamps to dates."""
+
+    def setUp(self):
+        """Set up the test environment."""
+        self.collection = mongomock.MongoClient().db.tasks
+        legacy = (
+            TIMESTAMP.replace(tzinfo=timezone.utc)
+            .astimezone()
+            .strftime(LEGACY_FORMAT)
+        )
+        self.collection.insert_many(
+            [
+                {
+                    "task": {
+                        "id": "A",
+                        "creation_time": "2024-03-01T12:30:00Z",
+                        "logs": [
+                            {
+                                "start_time": legacy,
+                                "end_time": "invalid",
+                                "logs": [
+                                    {"start_time": "2024-03-01T13:30:00+01:00"}
+                                ],
+                            }
+                        ],
+                    },
+                    "task_original": {
+                        "creation_time": "2024-03-01T12:30:00Z",
+                    },
+                },
+                {
+                    "task": {
+                        "id": "B",
+                        "creation_time": TIMESTAMP,
+                        "logs": [{"start_time": TIMESTAMP, "end_time": None}],
+                    }
+                },
+            ]
+        )
+
+    def test_migrate_timestamps(self):
+        """Test that string timestamps are converted to dates."""
+        assert migrate_timestamps(collection=self.collection) == 1
+        task = self.collection.find_one({"task.id": "A"})["task"]
+        assert task["creation_time"] == TIMESTAMP
+        assert task["logs"][0]["start_time"] == TIMESTAMP
+        assert task["logs"][0]["end_time"] is None
+        assert task["logs"][0]["logs"][0]["start_time"] == TIMESTAMP
+        task_original = self.collection.find_one({"task.id": "A"})[
+            "task_original"
+        ]
+        assert task_original["creation_time"] == TIMESTAMP
+        assert "logs" not in task_original
+
+    def test_migrate_timestamps_once(self):
+        """Test that completed migrations are skipped."""
+        migrate_timestamps(collection=self.collection)
+        self.collection.insert_one(
+            {"task": {"id": "C", "creation_time": "2024-03-01T12:30:00Z"}}
+        )
+        assert migrate_timestamps(collection=self.collection) == 0
+        task = self.collection.find_one({"task.id": "C"})["task"]
+        assert task["creation_time"] == "2024-03-01T12:30:00Z"
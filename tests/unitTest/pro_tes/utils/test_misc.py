@@ -0,0 +1,27 @@
+"""Unit tests for miscellaneous utilities."""
+
+import mongomock
+
+from pro_tes.utils.misc import map_concurrently, upsert_by_field
+
+
+def test_map_concurrently():
+    """Test that return values are mapped to the respective items."""
+    assert map_concurrently(
+        func=lambda item: item * 2, items=[1, 2, 3], max_workers=2
+    ) == {1: 2, 2: 4, 3: 6}
+
+
+def test_upsert_by_field():
+    """Test that documents are identified by the given field."""
+    collection = mongomock.MongoClient().db.collection
+    upsert_by_field(
+        collection=collection, field="url", value="a", fields={"x": 1}
+    )
+    upsert_by_field(
+        collection=collection, field="url", value="a", fields={"x": 2}
+    )
+    document = collection.find_one({"url": "a"}, {"_id": False})
+    assert collection.count_documents({}) == 1
+    assert document["x"] == 2
+    assert "updated_at" in document
@@ -0,0 +1,77 @@
+"""Unit tests for task list pagination utilities."""
+
+import unittest
+
+from bson.objectid import ObjectId  # type: ignore
+import mongomock
+import pytest
+
+from pro_tes.exceptions import BadRequest
+from pro_tes.utils.pagination import (
+    decode_page_token,
+    encode_page_token,
+    get_filter_hash,
+    get_task_count,
+    task_count_cache,
+)
+
+
+class TestPagination(unittest.TestCase):
+    """Test page tokens and task counts."""
+
+    def setUp(self):
+        """Set up the test environment."""
+        task_count_cache.clear()
+
+    def test_filter_hash(self):
+        """Test that equivalent filters have the same hash."""
+        assert get_filter_hash({"user_id": None, "task.state": "RUNNING"}) == (
+            get_filter_hash({"task.state": "RUNNING", "user_id": None})
+        )
+        assert get_filter_hash({"user_id": None}) != get_filter_hash(
+            {"user_id": "user"}
+        )
+
+    def test_page_token(self):
+        """Test that page tokens are opaque and bound to filters."""
+        last_id = ObjectId()
+        filter_hash = get_filter_hash({"user_id": None})
+        token = encode_page_token(last_id=last_id, filter_hash=filter_hash)
+        assert str(last_id) not in token
+        assert (
+            decode_page_token(page_token=token, filter_hash=filter_hash)
+            == last_id
+        )
+        with pytest.raises(BadRequest):
+            decode_page_token(
+                page_token=token,
+                filter_hash=get_filter_hash({"user_id": "user"}),
+            )
+        for invalid in [str(last_id), "invalid", "a.b.c", "%%%"]:
+            with pytest.raises(BadRequest):
+                decode_page_token(page_token=invalid, filter_hash=filter_hash)
+
+    def test_task_count(self):
+        """Test that task counts are capped and cached."""
+        collection = mongomock.MongoClient().db.tasks
+        collection.insert_many([{"user_id": None} for _ in range(5)])
+        filter_dict = {"user_id": None}
+        filter_hash = get_filter_hash(filter_dict)
+        assert (
+            get_task_count(
+                collection=collection,
+                filter_dict=filter_dict,
+                filter_hash=filter_hash,
+                limit=3,
+            )
+            == 3
+        )
+        collection.delete_many({})
+        assert (
+            get_task_count(
+                collection=collection,
+                filter_dict=filter_dict,
+                filter_hash=filter_hash,
+            )
+            == 3
+        )
@@ -0,0 +1,98 @@
+"""Unit tests for retention of finished tasks."""
+
+from datetime import timedelta
+import unittest
+
+from bson.objectid import ObjectId  # type: ignore
+import mongomock
+
+from pro_tes.utils.retention import TaskArchiver
+from pro_tes.utils.timestamps import now
+
+DAY = 86400
+
+
+def _get_document(task_id: str, state: str, age: float, **kwargs) -> dict:
+    """Create task document of a given age, in seconds."""
+    return {
+        "_id": ObjectId.from_datetime(now() - timedelta(seconds=age)),
+        "task": {"id": task_id, "state": state},
+        **kwargs,
+    }
+
+
+class TestTaskArchiver(unittest.TestCase):
+    """Test moving finished tasks to the archive."""
+
+    def setUp(self):
+        """Set up the test environment."""
+        database = mongomock.MongoClient().db
+        self.collection = database.tasks
+        self.archive = database.tasks_archive
+        self.blobs = database.task_blobs
+        self.blobs.insert_one({"_id": "blob"})
+        self.collection.insert_many(
+            [
+                _get_document(
+                    "old",
+                    "COMPLETE",
+                    2 * DAY,
+                    blobs=[{"path": "x", "id": "blob"}],
+                ),
+                _get_document("old_error", "EXECUTOR_ERROR", 2 * DAY + 1),
+                _get_document("old_running", "RUNNING", 2 * DAY + 2),
+                _get_document(
+                    "old_in_flight", "CANCELED", 2 * DAY + 3, in_flight=True
+                ),
+                _get_document(
+                    "old_unfinalized", "CANCELED", 2 * DAY + 4, finalized=False
+                ),
+                _get_document("new", "COMPLETE", 60),
+            ]
+        )
+        self.archiver = TaskArchiver(
+            collection=self.collection,
+            archive=self.archive,
+            blobs=self.blobs,
+            max_age=DAY,
+            batch_size=1,
+        )
+
+    def test_run(self):
+        """Test that only old, finished tasks are archived."""
+        assert self.archiver.run() == 2
+        archived = {doc["task"]["id"] for doc in self.archive.find()}
+        assert archived == {"old", "old_error"}
+        remaining = {doc["task"]["id"] for doc in self.collection.find()}
+        assert remaining == {
+            "old_running",
+            "old_in_flight",
+            "old_unfinalized",
+            "new",
+        }
+        assert all("archived_at" in doc for doc in self.archive.find())
+        assert "archived_at" in self.blobs.find_one({"_id": "blob"})
+
+    def test_run_interrupted(self):
+        """Test that tasks already in the archive are not archived again."""
+        self.archive.insert_one(self.collection.find_one({"task.id": "old"}))
+        assert self.archiver.run() == 2
+        assert self.archive.count_documents({"task.id": "old"}) == 1
+        assert self.collection.count_documents({"task.id": "old"}) == 0
+        assert self.archiver.run() == 0
+
+    def test_run_disabled(self):
+        """Test that no tasks are archived if no maximum age is set."""
+        self.archiver.max_age = None
+        assert self.archiver.run() == 0
+        assert self.collection.count_documents({}) == 6
+
+    def test_ensure_indexes(self):
+        """Test that archived tasks expire only if a TTL is set."""
+        self.archiver.ensure_indexes()
+        assert "archived_at" not in self.archive.index_information()
+        self.archiver.ttl = DAY
+        self.archiver.ensure_indexes()
+        for collection in (self.archive, self.blobs):
+            index = collection.index_information()["archived_at"]
+            assert index["expireAfterSeconds"] == DAY
@@ -0,0 +1,90 @@
+"""Unit tests for the routing decision cache."""
+
+import unittest
+from unittest.mock import patch
+
+from flask import Flask
+from foca.models.config import Config
+import mongomock
+
+from pro_tes.plugins.middlewares.task_distribution.distance import (
+    TaskDistributionDistance,
+)
+from pro_tes.utils.geolocation import create_ip_location
+from pro_tes.utils.routing_cache import (
+    RoutingCache,
+    bump_routing_epoch,
+    get_routing_epoch,
+    routing_cache,
+)
+from tests.unitTest.mock_data import get_mongo_config
+
+MODULE = "pro_tes.plugins.middlewares.task_distribution.distance"
+TES_URLS = ["https://helsinki.tes", "https://athens.tes"]
+
+
+def test_lru_ttl_epoch():
+    """Test eviction of least recently used, expired and stale entries."""
+    cache = RoutingCache(max_entries=2, ttl=60)
+    cache.set(key="a", value=1, epoch=0)
+    cache.set(key="b", value=2, epoch=0)
+    assert cache.get(key="a", epoch=0) == 1
+    cache.set(key="c", value=3, epoch=0)
+    assert cache.get(key="b", epoch=0) is None
+    assert cache.get(key="a", epoch=0) == 1
+    with patch("pro_tes.utils.cache.monotonic", return_value=1e12):
+        assert cache.get(key="a", epoch=0) is None
+    assert cache.get(key="c", epoch=1) is None
+    assert len(cache) == 0
+
+
+class TestDistanceCache(unittest.TestCase):
+    """Test caching of distance statistics."""
+
+    app = Flask(__name__)
+
+    def setUp(self):
+        """Set up the test environment."""
+        self.app.config.foca = Config(
+            db=get_mongo_config(),
+            tes={"service_list": TES_URLS},
+            task_distribution={"distance": {"method": "haversine"}},
+        )
+        client = mongomock.MongoClient()
+        collections = self.app.config.foca.db.dbs["taskStore"].collections
+        for name in ["counters", "tes_topology"]:
+            collections[name].client = client.db[name]
+        for url, (latitude, longitude) in zip(
+            TES_URLS, [(60.1699, 24.9384), (37.9838, 23.7275)]
+        ):
+            client.db.tes_topology.insert_one(
+                {"url": url, "latitude": latitude, "longitude": longitude}
+            )
+        routing_cache.clear()
+
+    @patch(
+        f"{MODULE}.get_ip_locations",
+        return_value={"1.2.3.4": create_ip_location(60.2, 24.9)},
+    )
+    @patch(f"{MODULE}.get_ips")
+    def test_cached_by_input_hosts(self, get_ips, _):
+        """Test that inputs on the same hosts reuse cached distances."""
+        get_ips.side_effect = lambda *uris: {uri: "1.2.3.4" for uri in uris}
+
+        def get_ranking(path: str) -> list[str]:
+            """Get ranking for a task with a single input."""
+            middleware = TaskDistributionDistance()
+            middleware.get_stats(
+                tes_urls=TES_URLS,
+                task={"inputs": [{"url": f"https://helsinki.data/{path}"}]},
+            )
+            return middleware._rank_tes_instances()
+
+        with self.app.app_context():
+            assert get_ranking("a.txt") == TES_URLS
+            assert get_ranking("b.txt") == TES_URLS
+            assert get_ips.call_count == 1
+            bump_routing_epoch()
+            assert get_routing_epoch() == 1
+            assert get_ranking("c.txt") == TES_URLS
+            assert get_ips.call_count == 2
@@ -0,0 +1,77 @@
+"""Unit tests for task timestamp utilities."""
+
+from datetime import datetime, timedelta, timezone
+import unittest
+
+import pytest
+
+from pro_tes.utils.timestamps import (
+    LEGACY_FORMAT,
+    now,
+    render_task_timestamps,
+    to_datetime,
+    to_rfc3339,
+)
+
+TIMESTAMP = datetime(2024, 3, 1, 12, 30, tzinfo=timezone.utc)
+
+
+class TestTimestamps(unittest.TestCase):
+    """Test conversion of task timestamps."""
+
+    def test_now(self):
+        """Test that current time is in UTC with millisecond precision."""
+        timestamp = now()
+        assert timestamp.tzinfo == timezone.utc
+        assert timestamp.microsecond % 1000 == 0
+
+    def test_to_datetime(self):
+        """Test conversion of timestamps of different formats."""
+        assert to_datetime(None) is None
+        assert to_datetime("2024-03-01T12:30:00Z") == TIMESTAMP
+        assert to_datetime("2024-03-01T07:30:00-05:00") == TIMESTAMP
+        assert to_datetime(TIMESTAMP.replace(tzinfo=None)) == TIMESTAMP
+        legacy = TIMESTAMP.astimezone().strftime(LEGACY_FORMAT)
+        assert to_datetime(legacy) == TIMESTAMP
+        with pytest.raises(ValueError):
+            to_datetime("not a timestamp")
+
+    def test_to_rfc3339(self):
+        """Test rendering of timestamps."""
+        assert to_rfc3339(None) is None
+        assert to_rfc3339(TIMESTAMP) == "2024-03-01T12:30:00Z"
+        assert (
+            to_rfc3339(
+                TIMESTAMP.astimezone(timezone(timedelta(hours=2)))
+                + timedelta(milliseconds=5)
+            )
+            == "2024-03-01T12:30:00.005000Z"
+        )
+
+    def test_render_task_timestamps(self):
+        """Test rendering of all timestamps of a task."""
+        stored = TIMESTAMP.replace(tzinfo=None)
+        task = {
+            "id": "TASK",
+            "creation_time": stored,
+            "logs": [
+                {
+                    "start_time": stored,
+                    "end_time": None,
+                    "logs": [{"start_time": stored, "exit_code": 0}],
+                }
+            ],
+        }
+        assert render_task_timestamps(task=task) == {
+            "id": "TASK",
+            "creation_time": "2024-03-01T12:30:00Z",
+            "logs": [
+                {
+                    "start_time": "2024-03-01T12:30:00Z",
+                    "end_time": None,
+                    "logs": [
+                        {"start_time": "2024-03-01T12:30:00Z", "exit_code": 0}
+                    ],
+                }
+            ],
+        }
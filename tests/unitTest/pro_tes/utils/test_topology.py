@@ -0,0 +1,79 @@
+"""Unit tests for the shared TES topology table."""
+
+import unittest
+from unittest.mock import patch
+
+from flask import Flask
+from foca.models.config import Config
+import mongomock
+
+from pro_tes.utils.geolocation import create_ip_location
+from pro_tes.utils.topology import TesTopology
+from tests.unitTest.mock_data import get_mongo_config
+
+TES_URL_STATIC = "https://static.tes"
+TES_URL_LOOKUP = "https://lookup.tes"
+TES_URL_UNRESOLVED = "https://unresolved.tes"
+
+
+class TestTesTopology(unittest.TestCase):
+    """Test computation and retrieval of TES instance locations."""
+
+    app = Flask(__name__)
+
+    def setUp(self):
+        """Set up the test environment."""
+        self.app.config.foca = Config(
+            db=get_mongo_config(),
+            tes={
+                "service_list": [
+                    TES_URL_STATIC,
+                    TES_URL_LOOKUP,
+                    TES_URL_UNRESOLVED,
+                ],
+                "locations": {
+                    TES_URL_STATIC: {"latitude": 60.17, "longitude": 24.94},
+                },
+            },
+        )
+        self.app.config.foca.db.dbs["taskStore"].collections[
+            "tes_topology"
+        ].client = mongomock.MongoClient().db.tes_topology
+
+    @staticmethod
+    def _get_ips(*args):
+        """Resolve all URIs but the unresolvable one."""
+        if TES_URL_UNRESOLVED in args:
+            raise ValueError("unresolvable")
+        return {uri: "1.2.3.4" for uri in args}
+
+    def test_refresh(self):
+        """Test that static and looked-up locations are stored."""
+        with self.app.app_context(), patch(
+            "pro_tes.utils.topology.get_ips", side_effect=self._get_ips
+        ), patch(
+            "pro_tes.utils.topology.get_ip_locations",
+            return_value={"1.2.3.4": create_ip_location(49.2, 16.6)},
+        ):
+            topology = TesTopology()
+            topology.refresh()
+            locations = topology.get_locations(
+                [TES_URL_STATIC, TES_URL_LOOKUP, TES_URL_UNRESOLVED]
+            )
+        assert set(locations) == {TES_URL_STATIC, TES_URL_LOOKUP}
+        assert locations[TES_URL_STATIC].latitude == 60.17
+        assert locations[TES_URL_LOOKUP].longitude == 16.6
+        assert locations[TES_URL_LOOKUP].ip_address == "1.2.3.4"
+
+    def test_refresh_removes_unconfigured(self):
+        """Test that TES instances no longer configured are removed."""
+        with self.app.app_context():
+            topology = TesTopology()
+            topology.db_client.insert_one(
+                {"url": "https://old.tes", "latitude": 0, "longitude": 0}
+            )
+            self.app.config.foca.tes["service_list"] = [TES_URL_STATIC]
+            topology.refresh()
+            assert [doc["url"] for doc in topology.db_client.find()] == [
+                TES_URL_STATIC
+            ]